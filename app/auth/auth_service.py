@@ -1,7 +1,17 @@
 from fastapi import HTTPException
-from app.crud.users import create_user, verify_user
-from app.crud.users import update_last_login
-from app.utils.security import create_access_token
+from app.crud.users import create_user, verify_user, get_active_user_profile
+from app.crud.users import last_login_buffer
+from app.auth.revocation import revocation_list
+from app.core.settings import (
+    STATELESS_AUTH,
+    STATELESS_ACCESS_TOKEN_EXPIRE_MINUTES,
+    REFRESH_TOKEN_EXPIRE_DAYS,
+)
+from app.utils.security import (
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+)
 
 
 async def register_user(data):
@@ -9,23 +19,74 @@ async def register_user(data):
     return user
 
 
+def _issue_tokens(user: dict) -> dict:
+    claims = {
+        "user_id": user["id"],
+        "role": user["role"],
+        "tenant_id": user["tenantId"],
+        "student_id": user.get("studentId"),
+        "teacher_id": user.get("teacherId"),
+        "admin_id": user.get("adminId"),
+        "full_name": user.get("fullName"),
+    }
+
+    if not STATELESS_AUTH:
+        return {"access_token": create_access_token(claims), "token_type": "bearer"}
+
+    # Stateless mode: the claims are trusted as-is, so keep access tokens short-lived
+    return {
+        "access_token": create_access_token(
+            claims, expires_minutes=STATELESS_ACCESS_TOKEN_EXPIRE_MINUTES
+        ),
+        "refresh_token": create_refresh_token(user["id"], REFRESH_TOKEN_EXPIRE_DAYS),
+        "token_type": "bearer",
+    }
+
+
 async def login_user(email: str, password: str):
     user = await verify_user(email, password)
     if not user:
         raise HTTPException(status_code=400, detail="Invalid email or password")
 
-    await update_last_login(user["id"])
-
-    token = create_access_token(
-        {
-            "user_id": user["id"],
-            "role": user["role"],
-            "tenant_id": user["tenantId"],
-            "student_id": user.get("studentId"),
-            "teacher_id": user.get("teacherId"),
-            "admin_id": user.get("adminId"),
-            "full_name": user.get("fullName"),
-        }
-    )
-
-    return {"access_token": token, "token_type": "bearer", "user": user}
+    # Written in the background (coalesced per interval), off the login path
+    last_login_buffer.record(user["id"])
+
+    return {**_issue_tokens(user), "user": user}
+
+
+async def refresh_session(refresh_token: str):
+    payload = decode_token(refresh_token)
+    if payload.get("typ") != "refresh":
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    if await revocation_list.is_revoked(payload):
+        raise HTTPException(status_code=401, detail="Refresh token revoked")
+
+    # Refresh tokens are single use: revoking it is the gate, so of two
+    # concurrent refreshes with the same token only one gets new tokens
+    if not await revocation_list.consume_token(payload):
+        raise HTTPException(status_code=401, detail="Refresh token revoked")
+
+    # Re-derive the claims so role/tenant changes are picked up on refresh
+    user = await get_active_user_profile(payload["user_id"])
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found or inactive")
+
+    return {**_issue_tokens(user), "user": user}
+
+
+async def reissue_tokens(user_id) -> dict:
+    """Fresh tokens after revoke_user_tokens (password change), so the session in use survives it."""
+    user = await get_active_user_profile(str(user_id))
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found or inactive")
+    return _issue_tokens(user)
+
+
+async def logout_user(access_token: str, refresh_token: str = None):
+    await revocation_list.revoke_token(decode_token(access_token))
+
+    if refresh_token:
+        payload = decode_token(refresh_token)
+        if payload.get("typ") == "refresh":
+            await revocation_list.revoke_token(payload)
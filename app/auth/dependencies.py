@@ -1,5 +1,8 @@
 from fastapi import Depends
 from app.auth.router import oauth2_scheme
+from app.auth.principal_cache import principal_cache
+from app.auth.revocation import revocation_list
+from app.core.settings import STATELESS_AUTH
 from app.db.database import db
 from app.utils.security import decode_token
 from bson import ObjectId
@@ -9,6 +12,27 @@ from fastapi import HTTPException
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     payload = decode_token(token)
 
+    if payload.get("typ") == "refresh":
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    # Logout and password/status changes revoke tokens in both auth modes
+    if await revocation_list.is_revoked(payload):
+        raise HTTPException(status_code=401, detail="Token revoked")
+
+    # Stateless mode: trust the signed claims of short-lived access tokens
+    if STATELESS_AUTH and payload.get("typ") == "access" and "role" in payload:
+        return {
+            "user_id": payload["user_id"],
+            "role": payload["role"],
+            "tenant_id": payload.get("tenant_id"),
+        }
+
+    # Served from the per-worker principal cache whenever possible; profile and
+    # status updates invalidate the entry (see app/auth/principal_cache.py)
+    cached = principal_cache.get(payload["user_id"])
+    if cached:
+        return cached
+
     # Allow multiple valid statuses (active for teachers/admins, studying for students)
     user = await db.users.find_one(
         {"_id": ObjectId(payload["user_id"]), "status": {"$in": ["active", "studying"]}}
@@ -39,11 +63,14 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
             if role_doc:
                 tenant_id = role_doc.get("tenantId")
 
-    return {
+    principal = {
         "user_id": str(user["_id"]),
         "role": user["role"],
         "tenant_id": str(tenant_id) if tenant_id else None,
     }
+    principal_cache.set(principal["user_id"], principal)
+
+    return principal
 
 
 def require_role(*allowed_roles: str):
@@ -0,0 +1,91 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.settings import PRINCIPAL_CACHE_MAX_SIZE, PRINCIPAL_CACHE_TTL_SECONDS
+
+
+class PrincipalCache:
+    """
+    In-process LRU cache of authenticated principals keyed by user id.
+
+    Entries expire `ttl` seconds after they were stored and the least recently
+    used entry is evicted once `max_size` entries are held. Profile and status
+    updates must call `invalidate_principal` so changes apply immediately.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+
+        # counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, user_id: str) -> Optional[dict]:
+        entry = self._entries.get(user_id)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, principal = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        # Callers may mutate the principal, never hand out the cached dict itself
+        return dict(principal)
+
+    def set(self, user_id: str, principal: dict) -> None:
+        if not self.enabled:
+            return
+
+        self._entries[user_id] = (time.monotonic() + self.ttl, dict(principal))
+        self._entries.move_to_end(user_id)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_id: str) -> None:
+        if self._entries.pop(user_id, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "maxSize": self.max_size,
+            "ttlSeconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+principal_cache = PrincipalCache(
+    ttl=PRINCIPAL_CACHE_TTL_SECONDS, max_size=PRINCIPAL_CACHE_MAX_SIZE
+)
+
+
+def invalidate_principal(user_id) -> None:
+    """Drop the cached principal for a user (accepts str or ObjectId)."""
+    if user_id:
+        principal_cache.invalidate(str(user_id))
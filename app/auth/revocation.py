@@ -0,0 +1,216 @@
+import asyncio
+import hashlib
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.core.settings import (
+    REFRESH_TOKEN_EXPIRE_DAYS,
+    REVOCATION_BLOOM_CAPACITY,
+    REVOCATION_BLOOM_ERROR_RATE,
+    REVOCATION_REBUILD_SECONDS,
+    REVOCATION_SYNC_SECONDS,
+)
+from pymongo.errors import DuplicateKeyError
+
+from app.db.database import db
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys (double hashing on blake2b)."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class RevocationList:
+    """
+    Revoked tokens for stateless auth.
+
+    The deny list lives in the `revokedTokens` collection (entries expire with the
+    tokens they cover). Each worker keeps a Bloom filter of revoked token ids and
+    an exact map of per-user "not before" cut-offs, pulled incrementally every
+    REVOCATION_SYNC_SECONDS, so checking a token normally costs no database I/O.
+    Bloom positives are confirmed against the collection before rejecting.
+    """
+
+    def __init__(self):
+        self.collection = db.revokedTokens
+        self._bloom = BloomFilter(REVOCATION_BLOOM_CAPACITY, REVOCATION_BLOOM_ERROR_RATE)
+        self._user_not_before: dict[str, float] = {}
+        self._last_seen: Optional[datetime] = None
+        self._synced_at = 0.0
+        self._rebuilt_at = 0.0
+        self._loaded = False
+        # local revocations made while a rebuild reads the collection
+        self._replay: Optional[list] = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _add(entry: dict, bloom: BloomFilter, user_not_before: dict) -> None:
+        if entry.get("kind") == "user":
+            user_id = entry["userId"]
+            not_before = entry["notBefore"]
+            if not_before > user_not_before.get(user_id, 0):
+                user_not_before[user_id] = not_before
+        else:
+            bloom.add(entry["_id"])
+
+    @staticmethod
+    def _latest(last_seen: Optional[datetime], entry: dict) -> Optional[datetime]:
+        revoked_at = entry.get("revokedAt")
+        if revoked_at and (last_seen is None or revoked_at > last_seen):
+            return revoked_at
+        return last_seen
+
+    def _apply(self, entry: dict) -> None:
+        self._add(entry, self._bloom, self._user_not_before)
+        self._last_seen = self._latest(self._last_seen, entry)
+        if self._replay is not None:
+            self._replay.append(entry)
+
+    def _due(self) -> tuple:
+        now = time.monotonic()
+        rebuild_due = not self._loaded or now - self._rebuilt_at >= REVOCATION_REBUILD_SECONDS
+        sync_due = now - self._synced_at >= REVOCATION_SYNC_SECONDS
+        return rebuild_due, sync_due
+
+    async def refresh(self, force: bool = False) -> None:
+        rebuild_due, sync_due = self._due()
+        if not (force or rebuild_due or sync_due):
+            return
+        # Once loaded, callers keep checking the current list while another one
+        # refreshes it; before the first load they wait for it instead
+        if self._lock.locked() and self._loaded:
+            return
+
+        async with self._lock:
+            rebuild_due, sync_due = self._due()
+            rebuild_due = rebuild_due or force
+            if not (rebuild_due or sync_due):
+                return
+
+            query = {"expiresAt": {"$gt": datetime.utcnow()}}
+            if rebuild_due:
+                await self._rebuild(query)
+            else:
+                if self._last_seen is not None:
+                    # overlap one interval to tolerate clock skew between workers
+                    query["revokedAt"] = {
+                        "$gte": self._last_seen - timedelta(seconds=REVOCATION_SYNC_SECONDS)
+                    }
+                async for entry in self.collection.find(query):
+                    self._apply(entry)
+
+            self._synced_at = time.monotonic()
+            if rebuild_due:
+                self._rebuilt_at = self._synced_at
+
+    async def _rebuild(self, query: dict) -> None:
+        """Expired entries cannot be removed from a Bloom filter: build a new one and swap it in."""
+        bloom = BloomFilter(REVOCATION_BLOOM_CAPACITY, REVOCATION_BLOOM_ERROR_RATE)
+        user_not_before: dict[str, float] = {}
+        last_seen = None
+
+        self._replay = []
+        try:
+            async for entry in self.collection.find(query):
+                self._add(entry, bloom, user_not_before)
+                last_seen = self._latest(last_seen, entry)
+            # revocations applied to the old list while the cursor was open
+            for entry in self._replay:
+                self._add(entry, bloom, user_not_before)
+                last_seen = self._latest(last_seen, entry)
+            self._bloom, self._user_not_before, self._last_seen = bloom, user_not_before, last_seen
+            self._loaded = True
+        finally:
+            self._replay = None
+
+    async def is_revoked(self, payload: dict) -> bool:
+        await self.refresh()
+
+        not_before = self._user_not_before.get(payload.get("user_id"))
+        if not_before is not None and payload.get("iat", 0) < not_before:
+            return True
+
+        key = f"jti:{payload.get('jti')}"
+        if payload.get("jti") and key in self._bloom:
+            return await self.collection.find_one({"_id": key}, {"_id": 1}) is not None
+
+        return False
+
+    async def revoke_token(self, payload: dict) -> None:
+        """Revoke a single access/refresh token until it would have expired anyway."""
+        if not payload.get("jti"):
+            return
+
+        entry = {
+            "_id": f"jti:{payload['jti']}",
+            "kind": "token",
+            "userId": payload.get("user_id"),
+            "revokedAt": datetime.utcnow(),
+            "expiresAt": datetime.utcfromtimestamp(payload["exp"]),
+        }
+        await self.collection.replace_one({"_id": entry["_id"]}, entry, upsert=True)
+        self._apply(entry)
+
+    async def consume_token(self, payload: dict) -> bool:
+        """Revoke a single-use token, atomically: False if it was already revoked."""
+        if not payload.get("jti"):
+            return False
+
+        entry = {
+            "_id": f"jti:{payload['jti']}",
+            "kind": "token",
+            "userId": payload.get("user_id"),
+            "revokedAt": datetime.utcnow(),
+            "expiresAt": datetime.utcfromtimestamp(payload["exp"]),
+        }
+        try:
+            await self.collection.insert_one(entry)
+        except DuplicateKeyError:
+            return False
+        self._apply(entry)
+        return True
+
+    async def revoke_user(self, user_id) -> None:
+        """Revoke every token issued to a user up to now."""
+        user_id = str(user_id)
+        now = datetime.utcnow()
+        entry = {
+            "_id": f"user:{user_id}",
+            "kind": "user",
+            "userId": user_id,
+            "notBefore": time.time(),
+            "revokedAt": now,
+            # nothing issued before notBefore outlives the longest token lifetime
+            "expiresAt": now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        }
+        await self.collection.replace_one({"_id": entry["_id"]}, entry, upsert=True)
+        self._apply(entry)
+
+
+revocation_list = RevocationList()
+
+
+async def revoke_user_tokens(user_id) -> None:
+    """Called on password/status changes and deletes so stateless tokens stop working."""
+    if user_id:
+        await revocation_list.revoke_user(user_id)
@@ -1 +1,136 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str):
+    value = os.getenv(name, "").strip()
+    return int(value) if value else None
+
+
 TENANT_ID = "691eaf8f6a01d7ff35403568"
+
+
+# ------------------ Auth: Principal Cache ------------------
+# Authenticated principals (user_id, role, tenant_id) are cached per worker so
+# most requests authenticate without touching Mongo. Set TTL or size to 0 to disable.
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))
+
+
+# ------------------ Auth: Stateless Mode ------------------
+# When enabled, access tokens are short-lived and their signed claims are trusted
+# as-is (no user lookup). Sessions are extended through POST /auth/refresh and
+# cut short through the revocation list (see app/auth/revocation.py).
+STATELESS_AUTH = _env_bool("STATELESS_AUTH", False)
+STATELESS_ACCESS_TOKEN_EXPIRE_MINUTES = int(
+    os.getenv("STATELESS_ACCESS_TOKEN_EXPIRE_MINUTES", "15")
+)
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+
+# Revocation list: Bloom filter in memory, deny list persisted in Mongo
+REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", "30"))
+REVOCATION_REBUILD_SECONDS = float(os.getenv("REVOCATION_REBUILD_SECONDS", "3600"))
+REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.001"))
+
+
+# ------------------ Password Hashing ------------------
+# bcrypt runs on a dedicated thread pool (the C extension releases the GIL) so it
+# never blocks the event loop. Requests beyond the pending limit get a 503.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+# Bulk imports hash on their own pool so a large upload cannot starve logins
+PASSWORD_BULK_HASH_WORKERS = int(os.getenv("PASSWORD_BULK_HASH_WORKERS", str(PASSWORD_HASH_WORKERS)))
+
+
+# ------------------ Login ------------------
+# lastLogin timestamps are buffered and written in one bulk_write per interval
+LAST_LOGIN_FLUSH_SECONDS = float(os.getenv("LAST_LOGIN_FLUSH_SECONDS", "5"))
+
+
+# ------------------ Database ------------------
+# Connection pool (unset values fall back to the URI options / driver defaults)
+MONGO_MAX_POOL_SIZE = _env_int("MONGO_MAX_POOL_SIZE")
+MONGO_MIN_POOL_SIZE = _env_int("MONGO_MIN_POOL_SIZE")
+MONGO_MAX_IDLE_TIME_MS = _env_int("MONGO_MAX_IDLE_TIME_MS")
+MONGO_WAIT_QUEUE_TIMEOUT_MS = _env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS")
+MONGO_SERVER_SELECTION_TIMEOUT_MS = _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS")
+# Comma separated, in order of preference, e.g. "zstd,snappy" (needs zstandard / python-snappy)
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "").strip()
+# primary, primaryPreferred, secondary, secondaryPreferred or nearest
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "").strip()
+# Write concern: w is a node count or "majority"
+MONGO_WRITE_CONCERN_W = os.getenv("MONGO_WRITE_CONCERN_W", "").strip()
+MONGO_WRITE_CONCERN_JOURNAL = os.getenv("MONGO_WRITE_CONCERN_JOURNAL", "").strip()
+MONGO_WRITE_CONCERN_TIMEOUT_MS = _env_int("MONGO_WRITE_CONCERN_TIMEOUT_MS")
+
+# Create missing indexes from the registry in app/db/indexes.py on startup
+ENSURE_INDEXES_ON_STARTUP = _env_bool("ENSURE_INDEXES_ON_STARTUP", True)
+
+# Command monitoring (app/db/monitoring.py): per-route Mongo command counts,
+# durations and reply sizes. A budget > 0 flags requests issuing more commands;
+# QUERY_BUDGET_MODE is "log" or "raise" (for tests).
+QUERY_MONITORING = _env_bool("QUERY_MONITORING", False)
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "0"))
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "log").strip().lower()
+
+
+# ------------------ Pagination ------------------
+# Key for signing list cursors (app/utils/pagination.py); defaults to the JWT secret
+PAGINATION_CURSOR_SECRET = os.getenv("PAGINATION_CURSOR_SECRET") or os.getenv("JWT_SECRET", "secret123")
+
+
+# ------------------ Response Cache ------------------
+# Course catalogue/detail responses (app/utils/cache.py). TTL 0 disables the cache.
+# Backend is "memory" (per-worker LRU) or "module.path:factory" for an external store.
+COURSE_CACHE_TTL_SECONDS = float(os.getenv("COURSE_CACHE_TTL_SECONDS", "300"))
+COURSE_CACHE_MAX_SIZE = int(os.getenv("COURSE_CACHE_MAX_SIZE", "5000"))
+COURSE_CACHE_BACKEND = os.getenv("COURSE_CACHE_BACKEND", "memory").strip()
+# Longest time a worker may serve entries another worker has already invalidated
+CACHE_VERSION_MAX_STALENESS_SECONDS = float(os.getenv("CACHE_VERSION_MAX_STALENESS_SECONDS", "2"))
+
+
+# ------------------ Courses ------------------
+# Run enrolment writes (student + course counter) in a multi-document
+# transaction. Requires a replica set or sharded cluster.
+ENROLLMENT_TRANSACTIONS = _env_bool("ENROLLMENT_TRANSACTIONS", False)
+# total_mode=estimated on course lists counts matches only up to this many
+COURSE_TOTAL_ESTIMATE_CAP = int(os.getenv("COURSE_TOTAL_ESTIMATE_CAP", "1000"))
+# Course search: "tokens" uses the indexed searchTokens field (app/utils/search.py),
+# "regex" the old unanchored regex scan (e.g. until the backfill has run)
+COURSE_SEARCH_ENGINE = os.getenv("COURSE_SEARCH_ENGINE", "tokens").strip().lower()
+
+
+# ------------------ Students ------------------
+# Bulk import (POST /admin/students/import) validates, de-duplicates, hashes
+# and inserts the upload this many rows at a time.
+STUDENT_IMPORT_CHUNK_SIZE = int(os.getenv("STUDENT_IMPORT_CHUNK_SIZE", "500"))
+
+
+# ------------------ Rewards ------------------
+# Course-completion rewards (points, badges, certificates) are queued in the
+# `rewardOutbox` collection and applied by background workers in batches.
+# REWARD_WORKERS=0 leaves processing to another process.
+REWARD_WORKERS = int(os.getenv("REWARD_WORKERS", "2"))
+REWARD_BATCH_SIZE = int(os.getenv("REWARD_BATCH_SIZE", "100"))
+REWARD_POLL_SECONDS = float(os.getenv("REWARD_POLL_SECONDS", "2"))
+REWARD_MAX_ATTEMPTS = int(os.getenv("REWARD_MAX_ATTEMPTS", "8"))
+# A claimed batch not finished within this time (worker died) is picked up again
+REWARD_LOCK_SECONDS = float(os.getenv("REWARD_LOCK_SECONDS", "60"))
+# Processed events are kept this long (TTL index) for auditing
+REWARD_RETENTION_DAYS = float(os.getenv("REWARD_RETENTION_DAYS", "7"))
+
+
+# ------------------ Leaderboards ------------------
+# Standings are kept in memory per worker (app/crud/leaderboards.py). Points
+# changed by other workers show up within LEADERBOARD_SYNC_SECONDS; a full
+# rebuild (dropping deleted students, refreshing names) runs at most every
+# LEADERBOARD_REBUILD_SECONDS and is shared through a snapshot collection.
+LEADERBOARD_SYNC_SECONDS = float(os.getenv("LEADERBOARD_SYNC_SECONDS", "2"))
+LEADERBOARD_REBUILD_SECONDS = float(os.getenv("LEADERBOARD_REBUILD_SECONDS", "900"))
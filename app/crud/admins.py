@@ -5,7 +5,9 @@ from bson import ObjectId
 from datetime import datetime
 
 from app.utils.exceptions import not_found, forbidden, bad_request
-from app.utils.security import hash_password, verify_password
+from app.utils.security import hash_password_async, verify_password_async
+from app.auth.principal_cache import invalidate_principal
+from app.auth.revocation import revoke_user_tokens
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -132,7 +134,7 @@ async def create_admin(admin: AdminCreate):
     if admin.password != admin.confirmPassword:
         raise ValueError("Passwords do not match")
 
-    hashed_password = hash_password(admin.password)
+    hashed_password = await hash_password_async(admin.password)
     full_name = f"{admin.firstName} {admin.lastName}"
 
     # 1. Create USER document
@@ -218,20 +220,24 @@ async def create_admin_profile(user_id: str, tenant_id: str = None):
 # ------------------ Dashboard Functions (Lazy Imports & Serialization) ------------------
 
 
-async def get_all_courses():
-    courses_cursor = db.courses.find({})
-    courses = []
-    async for course in courses_cursor:
-        teacher_name = ""
-        teacher_id = course.get("teacherId")
-        try:
-            teacher_doc = await db.teachers.find_one({"_id": ObjectId(teacher_id)})
-            if teacher_doc:
-                teacher_name = teacher_doc.get("fullName", "")
-        except:
-            pass
-        courses.append(serialize_course(course, teacher_name))
-    return courses
+async def get_all_courses(page: int = 1, limit: int = 100, sort: str = None):
+    """One page of courses across tenants with the instructor name, plus the total."""
+    from app.crud.dashboards.admin_dashboard import COURSE_SORTS, parse_sort_param
+
+    sort_path, direction = parse_sort_param(sort, COURSE_SORTS)
+    cursor = (
+        db.courses.find({}, {"title": 1, "courseCode": 1, "status": 1, "instructor": 1})
+        .sort(list({sort_path: direction, "_id": direction}.items()))
+        .skip((page - 1) * limit)
+        .limit(limit)
+    )
+
+    total = await db.courses.count_documents({})
+    courses = [
+        serialize_course(course, (course.get("instructor") or {}).get("fullName", ""))
+        async for course in cursor
+    ]
+    return total, courses
 
 
 async def get_all_teachers():
@@ -294,6 +300,9 @@ async def update_admin_profile(admin_id: str, data: AdminUpdateProfile):
 
     if user_id:
         await users_collection.update_one({"_id": user_id}, {"$set": update_data})
+        invalidate_principal(user_id)
+        if "status" in update_data:
+            await revoke_user_tokens(user_id)
 
     await db.admins.update_one(
         {"_id": ObjectId(admin_id)}, {"$set": {"updatedAt": datetime.utcnow()}}
@@ -357,7 +366,7 @@ async def update_admin_profile(admin_id: str, data: AdminUpdateProfile):
 from datetime import datetime
 from bson import ObjectId
 from app.utils.exceptions import not_found, bad_request
-from app.utils.security import hash_password, verify_password
+from app.utils.security import hash_password_async, verify_password_async
 from app.db.database import users_collection, db
 
 
@@ -374,11 +383,11 @@ async def change_admin_me_password(
         not_found("User")
 
     # 2. Verify old password
-    if not verify_password(old_password, user["password"]):
+    if not await verify_password_async(old_password, user["password"]):
         bad_request("Old password is incorrect")
 
     # 3. Prevent password reuse
-    if verify_password(new_password, user["password"]):
+    if await verify_password_async(new_password, user["password"]):
         bad_request("New password must be different from old password")
 
     # 4. Update password in USERS collection
@@ -386,12 +395,14 @@ async def change_admin_me_password(
         {"_id": user["_id"]},
         {
             "$set": {
-                "password": hash_password(new_password),
+                "password": await hash_password_async(new_password),
                 "updatedAt": datetime.utcnow(),
             }
         },
     )
 
+    await revoke_user_tokens(user["_id"])
+
     # 5. Touch ADMIN profile timestamp (if profile exists)
     await db.admins.update_one(
         {"userId": user["_id"]},
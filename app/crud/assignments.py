@@ -3,6 +3,7 @@ from bson import ObjectId
 from bson.errors import InvalidId
 from fastapi import HTTPException
 from app.db.database import db
+from app.utils.pagination import apply_cursor, page_with_cursor, sort_keys
 
 
 # ---------------------------
@@ -104,7 +105,12 @@ async def get_all_assignments(
     order: int = -1,
     page: int = 1,
     limit: int = 10,
+    cursor: str = None,
 ) -> dict:
+    """
+    One page of assignments. `nextCursor` resumes after the last result; with a
+    `cursor`, `page` is ignored and the page starts right after it (no skip).
+    """
     query = {}
 
     # Search filter
@@ -133,11 +139,19 @@ async def get_all_assignments(
         if to_date:
             query["uploadedAt"]["$lte"] = to_date
 
-    # Pagination
-    skip = max(page - 1, 0) * limit
-    cursor = db.assignments.find(query).sort(sort_by, order).skip(skip).limit(limit)
+    # Pagination: keyset after a cursor, offset otherwise
+    keys = sort_keys(sort_by, order)
+    skip = 0 if cursor else max(page - 1, 0) * limit
+    docs = await (
+        db.assignments.find(apply_cursor(query, keys, cursor))
+        .sort(keys)
+        .skip(skip)
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
+    )
+    docs, next_cursor = page_with_cursor(docs, limit, keys, query)
 
-    results = [await serialize_assignment(a) async for a in cursor]
+    results = [await serialize_assignment(a) for a in docs]
 
     total = await db.assignments.count_documents(query)
 
@@ -147,6 +161,7 @@ async def get_all_assignments(
         "total": total,
         "totalPages": (total + limit - 1) // limit,
         "results": results,
+        "nextCursor": next_cursor,
     }
 
 
@@ -1,9 +1,134 @@
 
+import re
 from bson import ObjectId
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from app.db.database import get_courses_collection, get_students_collection, db, users_collection
+from contextlib import asynccontextmanager
+from pymongo import UpdateOne
+from app.core.settings import (
+    COURSE_CACHE_BACKEND,
+    COURSE_CACHE_MAX_SIZE,
+    COURSE_CACHE_TTL_SECONDS,
+    COURSE_SEARCH_ENGINE,
+    COURSE_TOTAL_ESTIMATE_CAP,
+    ENROLLMENT_TRANSACTIONS,
+)
+from app.db.database import get_courses_collection, get_students_collection, client, db, users_collection
 from app.schemas.courses import CourseCreate, CourseUpdate
+from app.utils.cache import ResponseCache, load_backend, version_stamps
+from app.utils.etag import make_etag
+from app.utils.pagination import SortKeys, decode_cursor, encode_cursor, keyset_filter
+from app.utils.search import (
+    SEARCH_FIELDS,
+    course_search_fields,
+    query_terms,
+    search_match,
+    search_score,
+    strip_search_fields,
+)
+
+COURSE_TOTAL_MODES = ("exact", "estimated", "none")
+
+
+# ------------------ Response Cache ------------------
+# Serialized catalogue (get_all_courses) and detail (get_course_by_id) results,
+# per tenant. Every write to a course must call invalidate_course_cache.
+
+course_cache = ResponseCache(
+    "courses",
+    load_backend(COURSE_CACHE_BACKEND, COURSE_CACHE_MAX_SIZE) if COURSE_CACHE_TTL_SECONDS > 0 else None,
+    COURSE_CACHE_TTL_SECONDS,
+    version_stamps,
+)
+
+
+async def invalidate_course_cache(tenant_id, course_id=None, lists: bool = True) -> None:
+    """Drop cached lists of the tenant and, with `course_id`, that course's detail."""
+    await course_cache.invalidate(
+        str(ObjectId(tenant_id)), str(ObjectId(course_id)) if course_id else None, lists
+    )
+
+
+# ------------------ Instructor Projection ------------------
+# Courses carry `instructor: {teacherId, fullName}` so reads never join
+# teachers/users. It is written on create/update_course, refreshed by
+# propagate_instructor_name when a teacher is renamed, and backfilled by
+# app/db/migrations/backfill_course_instructors.py.
+
+async def build_instructor(teacher_id: ObjectId, teacher: Optional[dict] = None) -> dict:
+    if teacher is None:
+        teacher = await db.teachers.find_one({"_id": teacher_id}, {"userId": 1})
+    user = None
+    if teacher and teacher.get("userId"):
+        user = await users_collection.find_one({"_id": teacher["userId"]}, {"fullName": 1})
+    return {"teacherId": teacher_id, "fullName": (user or {}).get("fullName", "")}
+
+
+async def propagate_instructor_name(teacher_id: ObjectId, full_name: str) -> int:
+    """Copy a teacher's new name onto their courses. Returns the number of courses changed."""
+    result = await db.courses.update_many(
+        {"teacherId": teacher_id, "instructor.fullName": {"$ne": full_name}},
+        {"$set": {"instructor": {"teacherId": teacher_id, "fullName": full_name}}},
+    )
+    if result.modified_count:
+        for tenant_id in await db.courses.distinct("tenantId", {"teacherId": teacher_id}):
+            await course_cache.invalidate_tenant(str(tenant_id))
+    return result.modified_count
+
+
+def regex_search_query(search: str) -> list:
+    """The original unanchored regex search (COURSE_SEARCH_ENGINE=regex): a scan of every tenant course."""
+    pattern = {"$regex": re.escape(search), "$options": "i"}
+    return [{field: pattern} for field in SEARCH_FIELDS]
+
+
+def serialize_instructor(course: dict) -> dict:
+    instructor = course.get("instructor") or {}
+    if isinstance(instructor.get("teacherId"), ObjectId):
+        course["instructor"] = {**instructor, "teacherId": str(instructor["teacherId"])}
+    course["instructorName"] = instructor.get("fullName") or "Instructor"
+    return course
+
+
+# ------------------ Lesson Index ------------------
+# Courses carry `totalLessons` and `lessonIndex: [{id, title}]` (every lesson in
+# module/lesson order) so progress paths never load the modules. Both are
+# rewritten whenever modules change (create/update_course, reorder_*), filled
+# in lazily by ensure_lesson_index, and backfilled by
+# app/db/migrations/backfill_course_lesson_index.py.
+
+def lesson_index_fields(modules: Optional[list]) -> dict:
+    index = []
+    for module in modules or []:
+        for lesson in module.get("lessons") or []:
+            # Normalize lesson ID extraction to match how it's saved (usually 'id' from frontend)
+            lesson_id = str(lesson.get("id") or lesson.get("_id") or "")
+            index.append({"id": lesson_id, "title": lesson.get("title")})
+    return {"totalLessons": len(index), "lessonIndex": index}
+
+
+async def ensure_lesson_index(course: dict) -> dict:
+    """`course` (a projection with _id and totalLessons) with the index fields, computing and storing them if missing."""
+    if "totalLessons" in course:
+        return course
+    full = await db.courses.find_one({"_id": course["_id"]}, {"modules": 1}) or {}
+    fields = lesson_index_fields(full.get("modules"))
+    await db.courses.update_one({"_id": course["_id"]}, {"$set": fields})
+    return {**course, **fields}
+
+
+# ------------------ Enrolment Transactions ------------------
+
+@asynccontextmanager
+async def enrollment_session():
+    """A session inside a transaction when ENROLLMENT_TRANSACTIONS is on, else None."""
+    if not ENROLLMENT_TRANSACTIONS:
+        yield None
+        return
+    async with await client.start_session() as session:
+        async with session.start_transaction():
+            yield session
+
 
 class CourseCRUD:
    
@@ -101,6 +226,9 @@ class CourseCRUD:
         #  Store both IDs as ObjectId (teacherId was string before)
         course_dict["tenantId"] = tenant_id
         course_dict["teacherId"] = teacher_id
+        course_dict["instructor"] = await build_instructor(teacher_id, teacher)
+        course_dict.update(course_search_fields(course_dict))
+        course_dict.update(lesson_index_fields(course_dict.get("modules")))
         
         # Add timestamps
         course_dict["createdAt"] = datetime.utcnow()
@@ -120,49 +248,94 @@ class CourseCRUD:
             }
         )
         
+        await invalidate_course_cache(tenant_id)
+        
         # Convert ObjectIds to strings for response
         course_dict["_id"] = str(course_id)
         course_dict["tenantId"] = str(tenant_id)
         course_dict["teacherId"] = str(teacher_id)
+        serialize_instructor(course_dict)
+        strip_search_fields(course_dict)
         
         return course_dict
 
-    def _get_enriched_courses_pipeline(self, query: Dict[str, Any], skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+    # Stable page order; served by the (tenantId, _id) index when there is no other filter
+    COURSE_SORT = {"_id": 1}
+    # Search tokens are only needed inside queries, never in responses
+    COURSE_PROJECTION = {"searchTokens": 0, "titleTokens": 0}
+
+    def _get_courses_pipeline(
+        self,
+        query: Dict[str, Any],
+        skip: int = 0,
+        limit: int = 100,
+        score: Optional[dict] = None,
+        after: Optional[dict] = None
+    ) -> List[Dict[str, Any]]:
         """
-        Creates a centralized aggregation pipeline for enriching course data with 
-        instructor names from the users collection.
+        Filter, sort and page courses. Instructor names are stored on the course
+        (`instructor` sub-document), so this is a single-collection index scan.
+        With a search `score`, results are ranked by it (best first).
         """
         return [
-            {"$match": query},
-            {"$addFields": {
-                "teacherId": {"$toObjectId": "$teacherId"}
-            }},
+            *self._match_and_sort_stages(query, score, after),
             {"$skip": skip},
             {"$limit": limit},
-            {
-                "$lookup": {
-                    "from": "teachers",
-                    "localField": "teacherId",
-                    "foreignField": "_id",
-                    "as": "teacher_info"
-                }
-            },
-            {"$unwind": {"path": "$teacher_info", "preserveNullAndEmptyArrays": True}},
-            {
-                "$lookup": {
-                    "from": "users",
-                    "localField": "teacher_info.userId",
-                    "foreignField": "_id",
-                    "as": "user_info"
-                }
-            },
-            {"$unwind": {"path": "$user_info", "preserveNullAndEmptyArrays": True}},
-            {
-                "$addFields": {
-                    "instructorName": {"$ifNull": ["$user_info.fullName", "Instructor"]}
-                }
-            },
-            {"$project": {"teacher_info": 0, "user_info": 0}}
+            {"$project": self.COURSE_PROJECTION}
+        ]
+
+    def _sort_keys(self, score: Optional[dict]) -> SortKeys:
+        keys = list(self.COURSE_SORT.items())
+        return keys if score is None else [("searchScore", -1), *keys]
+
+    def _match_and_sort_stages(
+        self, query: Dict[str, Any], score: Optional[dict], after: Optional[dict] = None
+    ) -> List[Dict[str, Any]]:
+        """`after` is a keyset filter (rows past a cursor); with a score it can only apply once the score exists."""
+        sort = dict(self._sort_keys(score))
+        if score is None:
+            if after is not None:
+                query = {**query, "$and": [*query.get("$and", []), after]}
+            return [{"$match": query}, {"$sort": sort}]
+
+        stages = [{"$match": query}, {"$addFields": {"searchScore": score}}]
+        if after is not None:
+            stages.append({"$match": after})
+        stages.append({"$sort": sort})
+        return stages
+
+    def _get_courses_page_pipeline(
+        self,
+        query: Dict[str, Any],
+        skip: int,
+        limit: int,
+        total_mode: str,
+        score: Optional[dict] = None,
+        after: Optional[dict] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Page and total in one round trip.
+
+        total_mode:
+        - "exact": $facet with the page and a full $count of the matches
+        - "estimated": $facet with a count that stops at COURSE_TOTAL_ESTIMATE_CAP
+        - "none": no count; one extra row is fetched so callers know if more exist
+
+        $match and $sort stay outside the $facet: stages inside a facet cannot use indexes.
+        """
+        if total_mode == "none":
+            return self._get_courses_pipeline(query, skip, limit + 1, score, after)
+
+        count_stages = [{"$count": "n"}]
+        if total_mode == "estimated":
+            count_stages.insert(0, {"$limit": COURSE_TOTAL_ESTIMATE_CAP})
+
+        return [
+            *self._match_and_sort_stages(query, score, after),
+            {"$facet": {
+                "courses": [{"$skip": skip}, {"$limit": limit}, {"$project": self.COURSE_PROJECTION}],
+                "total": count_stages
+            }}
         ]
 
     def _serialize_course(self, course: Dict[str, Any]) -> Dict[str, Any]:
@@ -172,6 +345,9 @@ class CourseCRUD:
         
         if "teacherId" in course and isinstance(course["teacherId"], ObjectId):
             course["teacherId"] = str(course["teacherId"])
+        
+        serialize_instructor(course)
+        strip_search_fields(course)
             
         # Ensure thumbnailUrl is None if empty string to allow frontend fallback
         if not course.get("thumbnailUrl"):
@@ -186,18 +362,66 @@ class CourseCRUD:
         """
         if not ObjectId.is_valid(course_id) or not ObjectId.is_valid(tenantId):
             return {"success": False, "message": "Invalid ID format", "course": None}
-            
-        query = {"_id": ObjectId(course_id), "tenantId": ObjectId(tenantId)}
-        pipeline = self._get_enriched_courses_pipeline(query, 0, 1)
         
-        results = await self.collection.aggregate(pipeline).to_list(length=1)
-        if not results:
+        cache_key, cached = await course_cache.lookup(str(ObjectId(tenantId)), item_id=str(ObjectId(course_id)))
+        if cached is not None:
+            return cached
+            
+        course = await self.collection.find_one(
+            {"_id": ObjectId(course_id), "tenantId": ObjectId(tenantId)},
+            self.COURSE_PROJECTION
+        )
+        if not course:
             return {"success": False, "message": "Course not found", "course": None}
             
-        course = self._serialize_course(results[0])
-        return {"success": True, "message": "Course found", "course": course}
+        course = self._serialize_course(course)
+        # the ETag is computed once per cache fill, not per conditional request
+        result = {"success": True, "message": "Course found", "course": course, "etag": make_etag(course)}
+        await course_cache.store(cache_key, result)
+        return result
 
     async def get_all_courses(
+        self,
+        tenantId: str,
+        teacher_id: Optional[str] = None,
+        status: Optional[str] = None,
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        total_mode: str = "exact",
+        cursor: Optional[str] = None
+    ) -> dict:
+        """
+        Cached catalogue read: see _find_courses. Results are keyed by every
+        filter and paging parameter and dropped by invalidate_course_cache.
+        `etag` covers the page and its paging metadata.
+        """
+        params = {
+            "teacher_id": teacher_id,
+            "status": status,
+            "category": category,
+            "search": search,
+            "skip": skip,
+            "limit": limit,
+            "total_mode": total_mode,
+            "cursor": cursor,
+        }
+        cache_key = None
+        if ObjectId.is_valid(tenantId):
+            cache_key, cached = await course_cache.lookup(str(ObjectId(tenantId)), params)
+            if cached is not None:
+                return cached
+        
+        result = await self._find_courses(tenantId, **params)
+        if result["success"]:
+            result["etag"] = make_etag(
+                [result["courses"], result["total"], result["hasMore"], result["nextCursor"]]
+            )
+            await course_cache.store(cache_key, result)
+        return result
+
+    async def _find_courses(
         self, 
         tenantId: str,
         teacher_id: Optional[str] = None,
@@ -205,16 +429,35 @@ class CourseCRUD:
         category: Optional[str] = None,
         search: Optional[str] = None,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        total_mode: str = "exact",
+        cursor: Optional[str] = None
     ) -> dict:
         """
         Retrieves a list of courses filtered by tenant, teacher, status, etc.
-        Supports regex search on title, description, category, and course code.
+        Supports search on title, description, category, and course code
+        (prefix and stemmed word matches, ranked with title hits first;
+        see app/utils/search.py).
+        
+        The page and its total come back from a single aggregation; see
+        _get_courses_page_pipeline for the total modes.
+        
+        `nextCursor` resumes after the last course of the page. With a `cursor`,
+        `skip` is ignored and no total is counted (the first page has it), so deep
+        pages cost the same as the first.
         
         Returns:
             A dictionary with results, total count, and metadata.
         """
         
+        if total_mode not in COURSE_TOTAL_MODES:
+            return {
+                "success": False,
+                "message": f"Invalid total mode: {total_mode}",
+                "courses": [],
+                "total": 0
+            }
+        
         if not ObjectId.is_valid(tenantId):
             return {
                 "success": False,
@@ -248,23 +491,55 @@ class CourseCRUD:
             category = category.strip()
             query["category"] = {"$regex": f"^{category}$", "$options": "i"}
         
-        # Add broad text search across multiple fields
-        if search:
-            search = search.strip()
-            query["$or"] = [
-                {"title": {"$regex": search, "$options": "i"}},
-                {"description": {"$regex": search, "$options": "i"}},
-                {"category": {"$regex": search, "$options": "i"}},
-                {"courseCode": {"$regex": search, "$options": "i"}}
-            ]
+        # Search across title/description/category/courseCode
+        score = None
+        if search and search.strip():
+            if COURSE_SEARCH_ENGINE == "regex":
+                query["$or"] = regex_search_query(search.strip())
+            else:
+                terms = query_terms(search)
+                if not terms:
+                    # only stopwords/punctuation: nothing can match
+                    return {
+                        "success": True,
+                        "message": "Found 0 courses (total: 0)",
+                        "courses": [],
+                        "total": 0,
+                        "totalIsEstimate": False,
+                        "hasMore": False,
+                        "nextCursor": None,
+                        "skip": skip,
+                        "limit": limit
+                    }
+                query.update(search_match(terms))
+                score = search_score(terms)
+        
+        keys = self._sort_keys(score)
+        after = None
+        if cursor:
+            after = keyset_filter(keys, decode_cursor(cursor, keys, query))
+            skip, total_mode = 0, "none"
         
         try:
-            # Pipeline for aggregation with lookups
-            pipeline = self._get_enriched_courses_pipeline(query, skip, limit)
+            pipeline = self._get_courses_page_pipeline(query, skip, limit, total_mode, score, after)
+            results = await self.collection.aggregate(pipeline).to_list(length=None)
 
-            # Execute query
-            total = await self.collection.count_documents(query)
-            courses = await self.collection.aggregate(pipeline).to_list(length=limit)
+            total = None
+            has_more = False
+            if total_mode == "none":
+                has_more = len(results) > limit
+                courses = results[:limit]
+            else:
+                facet = results[0] if results else {"courses": [], "total": []}
+                courses = facet["courses"]
+                total = facet["total"][0]["n"] if facet["total"] else 0
+                if total_mode == "estimated" and total == COURSE_TOTAL_ESTIMATE_CAP:
+                    # past the cap the count says nothing; a full page means there may be more
+                    has_more = skip + len(courses) < total or len(courses) == limit
+                else:
+                    has_more = skip + len(courses) < total
+            
+            next_cursor = encode_cursor(courses[-1], keys, query) if has_more and courses else None
             
             # Serialize for response
             courses = [self._serialize_course(c) for c in courses]
@@ -274,6 +549,10 @@ class CourseCRUD:
                 "message": f"Found {len(courses)} courses (total: {total})",
                 "courses": courses,
                 "total": total,
+                # an estimated total at the cap means "at least this many"
+                "totalIsEstimate": total_mode == "estimated" and total == COURSE_TOTAL_ESTIMATE_CAP,
+                "hasMore": has_more,
+                "nextCursor": next_cursor,
                 "skip": skip,
                 "limit": limit
             }
@@ -323,12 +602,13 @@ class CourseCRUD:
         
         # If no valid updates after cleaning, just return current state
         if not cleaned_data:
-            return {
+            return serialize_instructor({
                 "_id": str(existing_course["_id"]),
                 "tenantId": str(existing_course["tenantId"]),
                 "teacherId": str(existing_course["teacherId"]),
-                **{k: v for k, v in existing_course.items() if k not in ["_id", "tenantId", "teacherId"]}
-            }
+                **{k: v for k, v in existing_course.items()
+                   if k not in ["_id", "tenantId", "teacherId", "searchTokens", "titleTokens"]}
+            })
         
         cleaned_data["updatedAt"] = datetime.utcnow()
         
@@ -337,6 +617,12 @@ class CourseCRUD:
             cleaned_data["tenantId"] = ObjectId(cleaned_data["tenantId"])
         if "teacherId" in cleaned_data and isinstance(cleaned_data["teacherId"], str):
             cleaned_data["teacherId"] = ObjectId(cleaned_data["teacherId"])
+        if "teacherId" in cleaned_data and str(cleaned_data["teacherId"]) != str(old_teacher_id):
+            cleaned_data["instructor"] = await build_instructor(cleaned_data["teacherId"])
+        if any(f in cleaned_data for f in SEARCH_FIELDS):
+            cleaned_data.update(course_search_fields({**existing_course, **cleaned_data}))
+        if "modules" in cleaned_data:
+            cleaned_data.update(lesson_index_fields(cleaned_data["modules"]))
         
         from pymongo import ReturnDocument
         
@@ -348,6 +634,8 @@ class CourseCRUD:
         )
         
         if result:
+            await invalidate_course_cache(tenantId, course_id)
+            
             # Synchronize teacher assignments if instructor changed
             new_teacher_id = cleaned_data.get("teacherId")
             if new_teacher_id and str(old_teacher_id) != str(new_teacher_id):
@@ -368,6 +656,8 @@ class CourseCRUD:
             
             if "teacherId" in result and isinstance(result["teacherId"], ObjectId):
                 result["teacherId"] = str(result["teacherId"])
+            serialize_instructor(result)
+            strip_search_fields(result)
             
         return result
 
@@ -429,6 +719,8 @@ class CourseCRUD:
     })
     
      if delete_result.deleted_count > 0:
+        await invalidate_course_cache(tenant_obj_id, course_obj_id)
+        
         #  Remove course from teacher's assignedCourses array
         if teacher_id:
             # Ensure teacher_id is ObjectId
@@ -467,17 +759,32 @@ class CourseCRUD:
         "message": "Failed to delete course"
     }
 
-    async def enroll_student(self, course_id: str, student_id: str, tenantId: str) -> dict:
-        """
-        Enrolls a student in a course.
-        Atomic operation that updates:
-        1. Student's enrolledCourses list.
-        2. Course's enrolledStudents counter (+1).
-        
-        Returns:
-            Success status and message.
-        """
-        
+    # ------------------ Enrolment ------------------
+    # A student's enrolledCourses entry and the course's enrolledStudents counter
+    # change together: the counter is only touched when the conditional update
+    # on the student actually modified it, so retries and concurrent requests
+    # cannot make it drift. With ENROLLMENT_TRANSACTIONS (replica set only) both
+    # writes also commit atomically.
+
+    async def _tenant_course(self, course_object_id: ObjectId, tenant_object_id: ObjectId, session=None) -> Optional[str]:
+        """None if the course belongs to the tenant, else the error message."""
+        course = await self.collection.find_one({"_id": course_object_id}, {"tenantId": 1}, session=session)
+        if not course:
+            return f"Course not found with ID: {course_object_id}"
+        if course.get("tenantId") != tenant_object_id:
+            return "Course found but belongs to different tenant"
+        return None
+
+    async def _student_error(self, student_object_id: ObjectId, tenant_object_id: ObjectId, enrolled_message: str, session=None) -> str:
+        """Why a conditional student update matched nothing (error path only)."""
+        student = await self.students_collection.find_one({"_id": student_object_id}, {"tenantId": 1}, session=session)
+        if not student:
+            return f"Student not found with ID: {student_object_id}"
+        if student.get("tenantId") != tenant_object_id:
+            return "Student found but belongs to different tenant"
+        return enrolled_message
+
+    async def _change_enrolment(self, course_id: str, student_id: str, tenantId: str, enroll: bool) -> dict:
         if not ObjectId.is_valid(course_id):
             return {"success": False, "message": f"Invalid course ID format: {course_id}"}
         
@@ -487,132 +794,136 @@ class CourseCRUD:
         if not ObjectId.is_valid(tenantId):
             return {"success": False, "message": f"Invalid tenant ID format: {tenantId}"}
         
+        course_object_id = ObjectId(course_id)
+        student_object_id = ObjectId(student_id)
         tenant_object_id = ObjectId(tenantId)
+        now = datetime.utcnow()
+        
+        if enroll:
+            student_filter = {"enrolledCourses": {"$ne": course_id}}
+            student_update = {"$addToSet": {"enrolledCourses": course_id}, "$set": {"updatedAt": now}}
+            conflict = "Student is already enrolled in this course"
+        else:
+            student_filter = {"enrolledCourses": course_id}
+            student_update = {"$pull": {"enrolledCourses": course_id}, "$set": {"updatedAt": now}}
+            conflict = "Student is not enrolled in this course"
+        
+        async with enrollment_session() as session:
+            error = await self._tenant_course(course_object_id, tenant_object_id, session)
+            if error:
+                return {"success": False, "message": error}
+            
+            # Only matches when the change is still needed
+            result = await self.students_collection.update_one(
+                {"_id": student_object_id, "tenantId": tenant_object_id, **student_filter},
+                student_update,
+                session=session
+            )
+            if result.modified_count == 0:
+                message = await self._student_error(student_object_id, tenant_object_id, conflict, session)
+                return {"success": False, "message": message}
+            
+            await self.collection.update_one(
+                {"_id": course_object_id, "tenantId": tenant_object_id},
+                {"$inc": {"enrolledStudents": 1 if enroll else -1}, "$set": {"updatedAt": now}},
+                session=session
+            )
         
-        # Verify course exists and belongs to tenant
-        course = await self.collection.find_one({
-            "_id": ObjectId(course_id),
-            "tenantId": tenant_object_id
-        })
-        
-        if not course:
-            course_exists = await self.collection.find_one({"_id": ObjectId(course_id)})
-            if course_exists:
-                return {"success": False, "message": "Course found but belongs to different tenant"}
-            return {"success": False, "message": f"Course not found with ID: {course_id}"}
-        
-        # Verify student exists and belongs to tenant
-        student = await self.students_collection.find_one({
-            "_id": ObjectId(student_id),
-            "tenantId": tenant_object_id
-        })
-        
-        if not student:
-            student_exists = await self.students_collection.find_one({"_id": ObjectId(student_id)})
-            if student_exists:
-                return {"success": False, "message": "Student found but belongs to different tenant"}
-            return {"success": False, "message": f"Student not found with ID: {student_id}"}
-        
-        # Prevention: Already enrolled check
-        enrolled_courses = student.get("enrolledCourses", [])
-        if course_id in enrolled_courses:
-            return {"success": False, "message": "Student is already enrolled in this course"}
-        
-        # Update 1: Student document
-        await self.students_collection.update_one(
-            {"_id": ObjectId(student_id), "tenantId": tenant_object_id},
-            {
-                "$addToSet": {"enrolledCourses": course_id},
-                "$set": {"updatedAt": datetime.utcnow()}
-            }
-        )
+        await invalidate_course_cache(tenant_object_id, course_object_id)
         
-        # Update 2: Course counter
-        await self.collection.update_one(
-            {"_id": ObjectId(course_id), "tenantId": tenant_object_id},
-            {
-                "$inc": {"enrolledStudents": 1},
-                "$set": {"updatedAt": datetime.utcnow()}
-            }
-        )
+        if enroll:
+            return {"success": True, "message": "Successfully enrolled in course"}
+        return {"success": True, "message": "Successfully unenrolled from course"}
+
+    async def enroll_student(self, course_id: str, student_id: str, tenantId: str) -> dict:
+        """
+        Enrolls a student in a course: a course check, a conditional $addToSet on
+        the student and, only if that added the course, $inc on the course counter.
         
-        return {"success": True, "message": "Successfully enrolled in course"}
+        Returns:
+            Success status and message.
+        """
+        return await self._change_enrolment(course_id, student_id, tenantId, enroll=True)
 
     async def unenroll_student(self, course_id: str, student_id: str, tenantId: str) -> dict:
         """
-        Unenroll a student from a course
+        Unenroll a student from a course: a course check, a conditional $pull on
+        the student and, only if that removed the course, a decrement of the
+        course counter.
+        """
+        return await self._change_enrolment(course_id, student_id, tenantId, enroll=False)
+
+    async def bulk_enroll_students(self, course_id: str, student_ids: List[str], tenantId: str) -> dict:
+        """
+        Enroll many students in one course (class onboarding) with a fixed number
+        of operations: course check, one read of the students, one unordered
+        bulk_write and one counter $inc by the number actually enrolled.
         
-        This function:
-        1. Validates that both course and student exist
-        2. Checks if student is actually enrolled
-        3. Removes course from student's enrolledCourses array
-        4. Decrements the course's enrolledStudents count
+        Returns counts plus the IDs that were skipped and why.
         """
-        # Validate course ID format
         if not ObjectId.is_valid(course_id):
             return {"success": False, "message": f"Invalid course ID format: {course_id}"}
         
-        # Validate student ID format
-        if not ObjectId.is_valid(student_id):
-            return {"success": False, "message": f"Invalid student ID format: {student_id}"}
-        
-        # Validate tenant ID format
         if not ObjectId.is_valid(tenantId):
             return {"success": False, "message": f"Invalid tenant ID format: {tenantId}"}
         
-        # Convert tenantId to ObjectId
+        course_object_id = ObjectId(course_id)
         tenant_object_id = ObjectId(tenantId)
+        requested = list(dict.fromkeys(student_ids))
+        invalid = [sid for sid in requested if not ObjectId.is_valid(sid)]
+        candidates = [ObjectId(sid) for sid in requested if ObjectId.is_valid(sid)]
+        now = datetime.utcnow()
+        
+        async with enrollment_session() as session:
+            error = await self._tenant_course(course_object_id, tenant_object_id, session)
+            if error:
+                return {"success": False, "message": error}
+            
+            students = await self.students_collection.aggregate(
+                [
+                    {"$match": {"_id": {"$in": candidates}, "tenantId": tenant_object_id}},
+                    {"$project": {"enrolled": {"$in": [course_id, {"$ifNull": ["$enrolledCourses", []]}]}}}
+                ],
+                session=session
+            ).to_list(length=None)
+            found = {s["_id"] for s in students}
+            already = {s["_id"] for s in students if s["enrolled"]}
+            to_enroll = [sid for sid in candidates if sid in found and sid not in already]
+            
+            enrolled = 0
+            if to_enroll:
+                result = await self.students_collection.bulk_write(
+                    [
+                        UpdateOne(
+                            {"_id": sid, "tenantId": tenant_object_id, "enrolledCourses": {"$ne": course_id}},
+                            {"$addToSet": {"enrolledCourses": course_id}, "$set": {"updatedAt": now}}
+                        )
+                        for sid in to_enroll
+                    ],
+                    ordered=False,
+                    session=session
+                )
+                # modified_count, not len(to_enroll): concurrent enrolments are not counted twice
+                enrolled = result.modified_count
+            
+            if enrolled:
+                await self.collection.update_one(
+                    {"_id": course_object_id, "tenantId": tenant_object_id},
+                    {"$inc": {"enrolledStudents": enrolled}, "$set": {"updatedAt": now}},
+                    session=session
+                )
         
-        # Check if course exists (with tenant isolation)
-        course = await self.collection.find_one({
-            "_id": ObjectId(course_id),
-            "tenantId": tenant_object_id
-        })
-        
-        if not course:
-            # Check if course exists in a different tenant
-            course_exists = await self.collection.find_one({"_id": ObjectId(course_id)})
-            if course_exists:
-                return {"success": False, "message": "Course found but belongs to different tenant"}
-            return {"success": False, "message": f"Course not found with ID: {course_id}"}
-        
-        # Check if student exists (with tenant isolation)
-        student = await self.students_collection.find_one({
-            "_id": ObjectId(student_id),
-            "tenantId": tenant_object_id
-        })
-        
-        if not student:
-            # Check if student exists in a different tenant
-            student_exists = await self.students_collection.find_one({"_id": ObjectId(student_id)})
-            if student_exists:
-                return {"success": False, "message": "Student found but belongs to different tenant"}
-            return {"success": False, "message": f"Student not found with ID: {student_id}"}
-        
-        # Check if student is actually enrolled in this course
-        enrolled_courses = student.get("enrolledCourses", [])
-        if course_id not in enrolled_courses:
-            return {"success": False, "message": "Student is not enrolled in this course"}
-        
-        # Remove course from student's enrolledCourses array
-        await self.students_collection.update_one(
-            {"_id": ObjectId(student_id), "tenantId": tenant_object_id},
-            {
-                "$pull": {"enrolledCourses": course_id},
-                "$set": {"updatedAt": datetime.utcnow()}
-            }
-        )
+        if enrolled:
+            await invalidate_course_cache(tenant_object_id, course_object_id)
         
-        # Decrement the course's enrolled student count by 1
-        await self.collection.update_one(
-            {"_id": ObjectId(course_id), "tenantId": tenant_object_id},
-            {
-                "$inc": {"enrolledStudents": -1},
-                "$set": {"updatedAt": datetime.utcnow()}
-            }
-        )
-        
-        return {"success": True, "message": "Successfully unenrolled from course"}
+        return {
+            "success": True,
+            "message": f"Enrolled {enrolled} of {len(requested)} students",
+            "enrolled": enrolled,
+            "alreadyEnrolled": [str(sid) for sid in candidates if sid in already],
+            "notFound": [str(sid) for sid in candidates if sid not in found],
+            "invalidIds": invalid
+        }
 
     async def get_student_courses(self, student_id: str, tenantId: str) -> dict:
         """
@@ -682,9 +993,7 @@ class CourseCRUD:
             }
         
         query = {"_id": {"$in": course_ids}}
-        pipeline = self._get_enriched_courses_pipeline(query, 0, 100)
-        
-        courses = await self.collection.aggregate(pipeline).to_list(length=100)
+        courses = await self.collection.find(query, self.COURSE_PROJECTION).sort(self.COURSE_SORT).to_list(length=100)
         
         # Determine the User ID to use for progress lookup (progress is keyed by Auth User ID)
         progress_user_id = str(student.get("userId") or student_id)
@@ -704,15 +1013,11 @@ class CourseCRUD:
             course_id_str = str(course["_id"])
             progress_doc = progress_map.get(course_id_str, {})
             
-            # Calculate total lessons across all modules
-            total_lessons = 0
-            all_lessons_list = []
-            modules = course.get("modules") or []
-            
-            for module in modules:
-                module_lessons = module.get("lessons") or []
-                total_lessons += len(module_lessons)
-                all_lessons_list.extend(module_lessons)
+            # Ordered lesson ids/titles, precomputed on write (see lesson_index_fields)
+            if "lessonIndex" not in course:
+                course.update(lesson_index_fields(course.get("modules")))
+            lesson_index = course.get("lessonIndex") or []
+            total_lessons = len(lesson_index)
             
             # Get completed lesson IDs (ensure they are strings for comparison)
             completed_ids = set(str(lid) for lid in progress_doc.get("completedLessons", []))
@@ -726,11 +1031,9 @@ class CourseCRUD:
                     next_lesson_title = "Course Finished! 🎉"
                 else:
                     # Find the first lesson that has NOT been completed
-                    for lesson in all_lessons_list:
-                        # Normalize lesson ID extraction to match how it's saved (usually 'id' from frontend)
-                        l_id = str(lesson.get("id") or lesson.get("_id") or "")
-                        if l_id and l_id not in completed_ids:
-                            next_lesson_title = lesson.get("title", "Next Lesson")
+                    for lesson in lesson_index:
+                        if lesson["id"] and lesson["id"] not in completed_ids:
+                            next_lesson_title = lesson.get("title") or "Next Lesson"
                             break
                     
                     if not next_lesson_title:
@@ -819,6 +1122,7 @@ class CourseCRUD:
             {
                 "$set": {
                     "modules": modules,
+                    **lesson_index_fields(modules),
                     "updatedAt": datetime.now()
                 }
             }
@@ -826,6 +1130,7 @@ class CourseCRUD:
         
         if update_result.modified_count == 0:
             return {"success": False, "message": "Failed to update course"}
+        await invalidate_course_cache(tenant_id, course_id)
         
         # Return updated course
         updated_course = await self.collection.find_one({"_id": ObjectId(course_id)})
@@ -885,6 +1190,7 @@ class CourseCRUD:
             {
                 "$set": {
                     "modules": reordered_modules,
+                    **lesson_index_fields(reordered_modules),
                     "updatedAt": datetime.now()
                 }
             }
@@ -892,6 +1198,7 @@ class CourseCRUD:
         
         if update_result.modified_count == 0:
             return {"success": False, "message": "Failed to update course"}
+        await invalidate_course_cache(tenant_id, course_id)
         
         # Return updated course
         updated_course = await self.collection.find_one({"_id": ObjectId(course_id)})
@@ -953,6 +1260,7 @@ class CourseCRUD:
         
         if update_result.modified_count == 0:
             return {"success": False, "message": "Failed to update course status"}
+        await invalidate_course_cache(tenant_id, course_id)
         
         # Return updated course
         updated_course = await self.collection.find_one({"_id": ObjectId(course_id)})
@@ -962,39 +1270,80 @@ class CourseCRUD:
             "course": self._serialize_course(updated_course)
         }
 
-    async def get_enrolled_students(self, course_id: str, tenantId: str) -> dict:
+    async def get_enrolled_students(
+        self,
+        course_id: str,
+        tenantId: str,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> dict:
         """
-        Get all students enrolled in a specific course.
-        
-        Returns student details including enrollment info.
+        Get students enrolled in a specific course, ordered by student id.
+
+        Students and their user names/emails come back from one aggregation.
+        Pass `limit` to page through large courses; `nextCursor` is the `after`
+        value for the next page (None on the last page).
         """
         # Validate IDs
         if not ObjectId.is_valid(course_id):
             return {"success": False, "message": "Invalid course ID format"}
         if not ObjectId.is_valid(tenantId):
             return {"success": False, "message": "Invalid tenant ID format"}
+        if after is not None and not ObjectId.is_valid(after):
+            return {"success": False, "message": "Invalid cursor format"}
         
         tenant_object_id = ObjectId(tenantId)
         
         # Verify course exists and belongs to tenant
-        course = await self.collection.find_one({
-            "_id": ObjectId(course_id),
-            "tenantId": tenant_object_id
-        })
+        course = await self.collection.find_one(
+            {"_id": ObjectId(course_id), "tenantId": tenant_object_id},
+            {"_id": 1},
+        )
         
         if not course:
             return {"success": False, "message": "Course not found or belongs to different tenant"}
         
-        # Find all students who have this course in their enrolledCourses array
-        cursor = self.students_collection.find({
+        # Students who have this course in their enrolledCourses array
+        match = {
             "tenantId": tenant_object_id,
             "enrolledCourses": course_id  # Course ID stored as string
-        })
+        }
+        if after:
+            match["_id"] = {"$gt": ObjectId(after)}
+
+        pipeline = [{"$match": match}, {"$sort": {"_id": 1}}]
+        if limit:
+            # one extra row tells us whether there is a next page
+            pipeline.append({"$limit": limit + 1})
+        pipeline.extend([
+            {"$lookup": {
+                "from": "users",
+                "localField": "userId",
+                "foreignField": "_id",
+                "pipeline": [{"$project": {"_id": 0, "fullName": 1, "email": 1}}],
+                "as": "user"
+            }},
+            {"$project": {
+                "createdAt": 1,
+                "fullName": 1,
+                "email": 1,
+                "user": {"$arrayElemAt": ["$user", 0]},
+                f"progress.{course_id}": 1,
+                f"lessonsCompleted.{course_id}": 1,
+                f"lastAccessed.{course_id}": 1,
+            }},
+        ])
+
+        docs = await self.students_collection.aggregate(pipeline).to_list(length=None)
+
+        next_cursor = None
+        if limit and len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = str(docs[-1]["_id"])
         
         students = []
-        async for student in cursor:
-            # Get user details for email and fullName
-            user = await self.users_collection.find_one({"_id": student.get("userId")})
+        for student in docs:
+            user = student.get("user")
             
             students.append({
                 "_id": str(student["_id"]),
@@ -1010,7 +1359,8 @@ class CourseCRUD:
         return {
             "success": True,
             "students": students,
-            "count": len(students)
+            "count": len(students),
+            "nextCursor": next_cursor
         }
 
 # Create a single instance
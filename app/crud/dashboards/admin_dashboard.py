@@ -1,6 +1,7 @@
+from typing import Optional
 from bson import ObjectId
+from fastapi import HTTPException
 from app.db.database import db
-from bson import ObjectId
 
 
 def convert_objectids(doc):
@@ -16,88 +17,209 @@ def convert_objectids(doc):
     return doc
 
 
-async def get_all_students(tenant_id: str):
-    students = []
+# ------------------ List Helpers ------------------
+
+# Joined user fields (only what the dashboard shows)
+USER_LOOKUP = {
+    "$lookup": {
+        "from": "users",
+        "localField": "userId",
+        "foreignField": "_id",
+        "pipeline": [{"$project": {"fullName": 1, "email": 1, "status": 1, "country": 1, "role": 1}}],
+        "as": "user",
+    }
+}
+
+# Output field -> expression, per list. `fields` selects a subset of these keys.
+STUDENT_FIELDS = {
+    "id": "$_id",
+    "fullName": {"$ifNull": ["$user.fullName", ""]},
+    "email": {"$ifNull": ["$user.email", ""]},
+    "status": {"$ifNull": ["$user.status", "active"]},
+    "country": {"$ifNull": ["$user.country", None]},
+    "enrolledCourses": {"$ifNull": ["$enrolledCourses", []]},
+    "completedCourses": {"$ifNull": ["$completedCourses", []]},
+    "tenantId": "$tenantId",
+    "userId": "$userId",
+}
+
+TEACHER_FIELDS = {
+    "id": "$_id",
+    "fullName": {"$ifNull": ["$user.fullName", ""]},
+    "email": {"$ifNull": ["$user.email", ""]},
+    "status": {"$ifNull": ["$user.status", "active"]},
+    "role": {"$ifNull": ["$user.role", "teacher"]},
+    "assignedCourses": {"$ifNull": ["$assignedCourses", []]},
+    "qualifications": {"$ifNull": ["$qualifications", []]},
+    "subjects": {"$ifNull": ["$subjects", []]},
+}
+
+COURSE_FIELDS = {
+    "id": "$_id",
+    "title": {"$ifNull": ["$title", ""]},
+    "courseCode": {"$ifNull": ["$courseCode", ""]},
+    "description": {"$ifNull": ["$description", ""]},
+    "category": {"$ifNull": ["$category", ""]},
+    "status": {"$ifNull": ["$status", ""]},
+    "duration": {"$ifNull": ["$duration", ""]},
+    "enrolledStudents": {"$ifNull": ["$enrolledStudents", 0]},
+    "teacherId": {"$ifNull": ["$teacherId", ""]},
+    "tenantId": {"$ifNull": ["$tenantId", ""]},
+}
+
+# Sort keys accepted by `sort` -> stored path. Paths under "user." need the join first.
+STUDENT_SORTS = {"createdAt": "createdAt", "fullName": "user.fullName", "email": "user.email"}
+TEACHER_SORTS = {"createdAt": "createdAt", "fullName": "user.fullName", "email": "user.email"}
+COURSE_SORTS = {
+    "createdAt": "createdAt",
+    "title": "title",
+    "status": "status",
+    "category": "category",
+    "enrolledStudents": "enrolledStudents",
+}
+
+
+def parse_sort_param(sort: Optional[str], allowed: dict):
+    if not sort:
+        return "_id", 1
+
+    direction = -1 if sort.startswith("-") else 1
+    field = sort.lstrip("-")
+    if field not in allowed:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid sort field '{field}'. Allowed: {', '.join(allowed)}",
+        )
+    return allowed[field], direction
 
-    if not tenant_id or not ObjectId.is_valid(tenant_id):
-        return []
 
-    tenant_oid = ObjectId(tenant_id)
-    async for s in db.students.find({"tenantId": tenant_oid}):
-        user = await db.users.find_one({"_id": ObjectId(s["userId"])})
+def parse_fields_param(fields: Optional[str], spec: dict) -> dict:
+    if not fields:
+        return spec
 
-        if not user:
-            continue
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in selected if f not in spec]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid fields {unknown}. Allowed: {', '.join(spec)}",
+        )
+    return {f: spec[f] for f in selected}
+
+
+async def _list_page(
+    collection,
+    match: dict,
+    lookups: list,
+    field_spec: dict,
+    sort_path: str,
+    direction: int,
+    page: int,
+    limit: int,
+    join_required: bool = False,
+):
+    """
+    One page of a dashboard list plus its total: a count and one aggregation.
+
+    Rows are sorted and sliced on the base collection before the joins run, so
+    only `limit` rows are joined, unless the sort key lives on a joined
+    document. `join_required` drops rows whose join found nothing; `total` is
+    an indexed count of the base rows and still includes them. Create and
+    delete write a profile and its user together, so only orphaned legacy rows
+    make a page come up short.
+    """
+    joins_first = sort_path.startswith("user.")
+    join_stages = []
+    for lookup in lookups:
+        join_stages.append(lookup)
+        join_stages.append(
+            {"$unwind": {"path": f"${lookup['$lookup']['as']}", "preserveNullAndEmptyArrays": not join_required}}
+        )
 
-        student_data = {
-            "id": s["_id"],
-            "fullName": user.get("fullName", ""),
-            "email": user.get("email", ""),
-            "status": user.get("status", "active"),
-            "country": user.get("country"),
-            "enrolledCourses": s.get("enrolledCourses", []),
-            "completedCourses": s.get("completedCourses", []),
-            "tenantId": s.get("tenantId"),
-            "userId": s.get("userId"),
-        }
+    pipeline = [{"$match": match}]
+    if joins_first:
+        pipeline.extend(join_stages)
+    # _id as tie-breaker keeps pages stable when the sort key repeats
+    pipeline.append({"$sort": {sort_path: direction, "_id": direction}})
+    pipeline.extend([{"$skip": (page - 1) * limit}, {"$limit": limit}])
+    if not joins_first:
+        pipeline.extend(join_stages)
+    pipeline.append({"$project": {"_id": 0, **field_spec}})
 
-        # Convert all ObjectId fields to strings
-        students.append(convert_objectids(student_data))
+    total = await collection.count_documents(match)
+    rows = await collection.aggregate(pipeline).to_list(length=limit)
+    return total, [convert_objectids(r) for r in rows]
 
-    return students
 
+# ------------------ Dashboard Lists ------------------
 
-async def get_all_teachers(tenant_id: str):
-    teachers = []
 
+async def get_all_students(
+    tenant_id: str,
+    page: int = 1,
+    limit: int = 100,
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
+):
     if not tenant_id or not ObjectId.is_valid(tenant_id):
-        return []
-
-    tenant_oid = ObjectId(tenant_id)
-    async for t in db.teachers.find({"tenantId": tenant_oid}):
-        user = await db.users.find_one({"_id": t["userId"]})
-
-        if not user:
-            continue
-
-        # Merge user data directly into teacher object
-        teachers.append(
-            {
-                "id": str(t["_id"]),
-                "fullName": user.get("fullName", ""),
-                "email": user.get("email", ""),
-                "status": user.get("status", "active"),
-                "role": user.get("role", "teacher"),
-                "assignedCourses": [str(c) for c in t.get("assignedCourses", [])],
-                "qualifications": t.get("qualifications", []),
-                "subjects": t.get("subjects", []),
-            }
-        )
-
-    return teachers
-
-
-async def get_all_courses(tenant_id: str):
-    courses = []
-
+        return 0, []
+
+    sort_path, direction = parse_sort_param(sort, STUDENT_SORTS)
+    return await _list_page(
+        db.students,
+        {"tenantId": ObjectId(tenant_id)},
+        [USER_LOOKUP],
+        parse_fields_param(fields, STUDENT_FIELDS),
+        sort_path,
+        direction,
+        page,
+        limit,
+        join_required=True,  # students without a user account are not listed
+    )
+
+
+async def get_all_teachers(
+    tenant_id: str,
+    page: int = 1,
+    limit: int = 100,
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
+):
     if not tenant_id or not ObjectId.is_valid(tenant_id):
-        return []
-
-    tenant_oid = ObjectId(tenant_id)
-    async for c in db.courses.find({"tenantId": tenant_oid}):
-        courses.append(
-            {
-                "id": str(c["_id"]),
-                "title": c.get("title", ""),
-                "courseCode": c.get("courseCode", ""),
-                "description": c.get("description", ""),
-                "category": c.get("category", ""),
-                "status": c.get("status", ""),
-                "duration": c.get("duration", ""),
-                "enrolledStudents": c.get("enrolledStudents", 0),
-                "teacherId": str(c.get("teacherId", "")),
-                "tenantId": str(c.get("tenantId", "")),
-            }
-        )
-
-    return courses
+        return 0, []
+
+    sort_path, direction = parse_sort_param(sort, TEACHER_SORTS)
+    return await _list_page(
+        db.teachers,
+        {"tenantId": ObjectId(tenant_id)},
+        [USER_LOOKUP],
+        parse_fields_param(fields, TEACHER_FIELDS),
+        sort_path,
+        direction,
+        page,
+        limit,
+        join_required=True,
+    )
+
+
+async def get_all_courses(
+    tenant_id: str,
+    page: int = 1,
+    limit: int = 100,
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    if not tenant_id or not ObjectId.is_valid(tenant_id):
+        return 0, []
+
+    sort_path, direction = parse_sort_param(sort, COURSE_SORTS)
+    return await _list_page(
+        db.courses,
+        {"tenantId": ObjectId(tenant_id)},
+        [],
+        parse_fields_param(fields, COURSE_FIELDS),
+        sort_path,
+        direction,
+        page,
+        limit,
+    )
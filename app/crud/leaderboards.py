@@ -0,0 +1,313 @@
+# app/crud/leaderboards.py
+"""
+Materialized leaderboards.
+
+Each scope (one tenant, or "global") is held in memory as a RankedList of
+(-points, studentId) keys plus each student's points and display name, so
+top-K, rank-of-student and page-around-me are O(log n) lookups instead of an
+aggregation over every performance document.
+
+Keeping them current:
+
+    this worker     add_points / delete_student update the loaded boards at once
+    other workers   every read older than LEADERBOARD_SYNC_SECONDS pulls only the
+                    performance documents whose `pointsUpdatedAt` moved since the
+                    last sync (indexed), and upserts them
+    full rebuild    at most every LEADERBOARD_REBUILD_SECONDS (drops deleted
+                    students, refreshes renamed ones); the result is saved to
+                    `leaderboardSnapshots` so other workers and restarts load it
+                    instead of scanning again
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ReplaceOne
+
+from app.core.settings import LEADERBOARD_REBUILD_SECONDS, LEADERBOARD_SYNC_SECONDS
+from app.db.database import db, student_performance_collection, users_collection
+from app.utils.ranking import RankedList
+
+logger = logging.getLogger(__name__)
+
+GLOBAL = "global"
+# Re-read changes this far behind the newest one seen, so writes that committed
+# out of timestamp order are not missed (re-applying a change is harmless)
+SYNC_OVERLAP = timedelta(seconds=30)
+SNAPSHOT_CHUNK_SIZE = 5000
+NAME_BATCH_SIZE = 1000
+
+ENTRY_PROJECTION = {"studentId": 1, "tenantId": 1, "userId": 1, "studentName": 1, "totalPoints": 1, "pointsUpdatedAt": 1}
+
+
+# ------------------ In-memory Board ------------------
+
+
+class Leaderboard:
+    """Standings of one scope, ordered by points (desc) then studentId."""
+
+    def __init__(self):
+        self._order = RankedList()
+        self._entries: Dict[str, tuple] = {}  # studentId -> (points, name)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, student_id: str) -> bool:
+        return student_id in self._entries
+
+    def upsert(self, student_id: str, points, name: Optional[str] = None) -> None:
+        points = points or 0
+        old = self._entries.get(student_id)
+        if old is not None:
+            if name is None:
+                name = old[1]
+            if old[0] != points:
+                self._order.remove((-old[0], student_id))
+                self._order.insert((-points, student_id))
+        else:
+            self._order.insert((-points, student_id))
+        self._entries[student_id] = (points, name or "")
+
+    def remove(self, student_id: str) -> None:
+        old = self._entries.pop(student_id, None)
+        if old is not None:
+            self._order.remove((-old[0], student_id))
+
+    def _rows(self, start: int, stop: int, me: Optional[str] = None) -> List[dict]:
+        rows = []
+        for rank, (_, student_id) in enumerate(self._order.slice(start, stop), start=start + 1):
+            points, name = self._entries[student_id]
+            row = {"studentName": name, "points": points, "rank": rank}
+            if me is not None:
+                row["isMe"] = student_id == me
+            rows.append(row)
+        return rows
+
+    def top(self, k: int) -> List[dict]:
+        return self._rows(0, k)
+
+    def page(self, offset: int, limit: int) -> List[dict]:
+        return self._rows(offset, offset + limit)
+
+    def all(self) -> List[dict]:
+        return self._rows(0, len(self))
+
+    def rank_of(self, student_id: str) -> Optional[int]:
+        """1-based rank, or None when the student is not on this board."""
+        entry = self._entries.get(student_id)
+        if entry is None:
+            return None
+        return self._order.rank((-entry[0], student_id)) + 1
+
+    def around(self, student_id: str, neighbours: int) -> Optional[List[dict]]:
+        """The student's row (isMe) with up to `neighbours` rows above and below."""
+        rank = self.rank_of(student_id)
+        if rank is None:
+            return None
+        return self._rows(max(rank - 1 - neighbours, 0), rank + neighbours, me=student_id)
+
+    def entries(self) -> List[list]:
+        """[[studentId, name, points], ...] in rank order (snapshot format)."""
+        return [[sid, self._entries[sid][1], self._entries[sid][0]] for _, sid in self._order]
+
+
+# ------------------ Store ------------------
+
+
+class LeaderboardStore:
+    def __init__(self, sync_seconds: float, rebuild_seconds: float):
+        self.sync_seconds = sync_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.snapshots = db.leaderboardSnapshots
+
+        self._boards: Dict[str, Leaderboard] = {}
+        self._synced_at: Dict[str, float] = {}
+        self._built_at: Dict[str, float] = {}
+        self._watermarks: Dict[str, datetime] = {}
+        self._locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    @staticmethod
+    def scope(tenant_id=None) -> str:
+        return f"tenant:{ObjectId(tenant_id)}" if tenant_id else GLOBAL
+
+    @staticmethod
+    def _filter(scope: str) -> dict:
+        return {} if scope == GLOBAL else {"tenantId": ObjectId(scope.split(":", 1)[1])}
+
+    async def board(self, tenant_id=None) -> Leaderboard:
+        """The scope's board, synced with other workers' changes if it is older than sync_seconds."""
+        scope = self.scope(tenant_id)
+        if scope in self._boards and time.monotonic() - self._synced_at[scope] < self.sync_seconds:
+            return self._boards[scope]
+
+        async with self._locks[scope]:
+            now = time.monotonic()
+            if scope not in self._boards or now - self._built_at[scope] >= self.rebuild_seconds:
+                await self._load(scope)
+            elif now - self._synced_at[scope] >= self.sync_seconds:
+                await self._sync(scope)
+        return self._boards[scope]
+
+    # ---- local writes ----
+
+    def record_points(self, student_id, tenant_id, total_points) -> None:
+        """Apply a points change made by this worker to the loaded boards."""
+        student_id = str(student_id)
+        for scope in (self.scope(tenant_id), GLOBAL):
+            board = self._boards.get(scope)
+            # students not on a board yet are added (with their name) by the next sync
+            if board is not None and student_id in board:
+                board.upsert(student_id, total_points)
+
+    def remove_student(self, student_id, tenant_id) -> None:
+        student_id = str(student_id)
+        for scope in (self.scope(tenant_id), GLOBAL):
+            board = self._boards.get(scope)
+            if board is not None:
+                board.remove(student_id)
+
+    # ---- loading ----
+
+    async def _names(self, docs: List[dict]) -> Dict[str, str]:
+        """studentId -> display name (users.fullName, else the stored studentName)."""
+        user_ids = [d["userId"] for d in docs if d.get("userId")]
+        names = {}
+        for i in range(0, len(user_ids), NAME_BATCH_SIZE):
+            async for u in users_collection.find({"_id": {"$in": user_ids[i:i + NAME_BATCH_SIZE]}}, {"fullName": 1}):
+                names[u["_id"]] = u.get("fullName")
+        return {str(d["studentId"]): names.get(d.get("userId")) or d.get("studentName") or "" for d in docs}
+
+    def _advance_watermark(self, scope: str, docs: List[dict]) -> None:
+        stamps = [d["pointsUpdatedAt"] for d in docs if d.get("pointsUpdatedAt")]
+        if stamps:
+            self._watermarks[scope] = max([self._watermarks[scope], *stamps])
+
+    def _publish(self, scope: str, board: Leaderboard, built_at: float) -> None:
+        """Serve `board` for the scope; readers never see it without its sync/build times."""
+        self._boards[scope] = board
+        self._synced_at[scope] = time.monotonic()
+        self._built_at[scope] = built_at
+
+    async def _load(self, scope: str) -> None:
+        snapshot = await self._load_snapshot(scope)
+        if snapshot is None:
+            await self._rebuild(scope)
+            return
+        board, taken_at = snapshot
+        await self._pull_changes(scope, board)
+        # the snapshot's data is as old as its takenAt, so its next rebuild is due that much sooner
+        age = (datetime.utcnow() - taken_at).total_seconds()
+        self._publish(scope, board, time.monotonic() - max(age, 0))
+
+    async def _rebuild(self, scope: str) -> None:
+        started = datetime.utcnow()
+        board = Leaderboard()
+        self._watermarks[scope] = started - SYNC_OVERLAP
+
+        batch = []
+        async for doc in student_performance_collection.find(self._filter(scope), ENTRY_PROJECTION):
+            batch.append(doc)
+            if len(batch) >= NAME_BATCH_SIZE:
+                await self._apply(scope, board, batch, refresh_names=True)
+                batch = []
+        await self._apply(scope, board, batch, refresh_names=True)
+
+        self._publish(scope, board, time.monotonic())
+        try:
+            await self._save_snapshot(scope, board)
+        except Exception:
+            # the board is still served from memory; other workers rebuild on their own
+            logger.exception("Failed to save leaderboard snapshot for %s", scope)
+
+    async def _apply(self, scope: str, board: Leaderboard, docs: List[dict], refresh_names: bool) -> None:
+        if not docs:
+            return
+        known = [] if refresh_names else [d for d in docs if str(d["studentId"]) in board]
+        new = docs if refresh_names else [d for d in docs if str(d["studentId"]) not in board]
+        names = await self._names(new) if new else {}
+        for doc in known:
+            board.upsert(str(doc["studentId"]), doc.get("totalPoints", 0))
+        for doc in new:
+            sid = str(doc["studentId"])
+            board.upsert(sid, doc.get("totalPoints", 0), names.get(sid, ""))
+        self._advance_watermark(scope, docs)
+
+    async def _pull_changes(self, scope: str, board: Leaderboard) -> None:
+        """Upsert into `board` the documents whose points changed since the watermark."""
+        since = self._watermarks[scope] - SYNC_OVERLAP
+        docs = await student_performance_collection.find(
+            {**self._filter(scope), "pointsUpdatedAt": {"$gte": since}}, ENTRY_PROJECTION
+        ).to_list(length=None)
+        await self._apply(scope, board, docs, refresh_names=False)
+
+    async def _sync(self, scope: str) -> None:
+        await self._pull_changes(scope, self._boards[scope])
+        self._synced_at[scope] = time.monotonic()
+
+    # ---- snapshots ----
+
+    async def _save_snapshot(self, scope: str, board: Leaderboard) -> None:
+        entries = board.entries()
+        chunks = [entries[i:i + SNAPSHOT_CHUNK_SIZE] for i in range(0, len(entries), SNAPSHOT_CHUNK_SIZE)] or [[]]
+        build = uuid.uuid4().hex
+        header = {
+            "scope": scope,
+            "build": build,
+            "chunks": len(chunks),
+            "takenAt": datetime.utcnow(),
+            "watermark": self._watermarks[scope],
+        }
+        await self.snapshots.bulk_write(
+            [
+                ReplaceOne({"_id": f"{scope}:{i}"}, {**header, "chunk": i, "entries": chunk}, upsert=True)
+                for i, chunk in enumerate(chunks)
+            ],
+            ordered=False,
+        )
+        await self.snapshots.delete_many({"scope": scope, "chunk": {"$gte": len(chunks)}})
+
+    async def _load_snapshot(self, scope: str) -> Optional[tuple]:
+        """(board, takenAt) of the saved board if it is complete and younger than rebuild_seconds, else None."""
+        try:
+            docs = await self.snapshots.find({"scope": scope}).sort("chunk", 1).to_list(length=None)
+        except Exception:
+            logger.exception("Failed to read leaderboard snapshot for %s", scope)
+            return None
+        if not docs:
+            return None
+
+        first = docs[0]
+        complete = len(docs) == first["chunks"] and all(d["build"] == first["build"] for d in docs)
+        fresh = datetime.utcnow() - first["takenAt"] < timedelta(seconds=self.rebuild_seconds)
+        if not (complete and fresh):
+            return None
+
+        board = Leaderboard()
+        for doc in docs:
+            for student_id, name, points in doc["entries"]:
+                board.upsert(student_id, points, name)
+        self._watermarks[scope] = first["watermark"]
+        return board, first["takenAt"]
+
+    def stats(self) -> dict:
+        """Per loaded scope: board size, seconds since the last sync / rebuild, and the sync watermark."""
+        now = time.monotonic()
+        return {
+            scope: {
+                "students": len(board),
+                "syncedSecondsAgo": round(now - self._synced_at[scope], 1),
+                "builtSecondsAgo": round(now - self._built_at[scope], 1),
+                "watermark": self._watermarks.get(scope),
+            }
+            for scope, board in self._boards.items()
+        }
+
+
+leaderboards = LeaderboardStore(LEADERBOARD_SYNC_SECONDS, LEADERBOARD_REBUILD_SECONDS)
@@ -5,6 +5,7 @@ from datetime import datetime
 
 from fastapi import HTTPException, status
 from app.db.database import db
+from app.utils.pagination import apply_cursor, page_with_cursor, sort_keys
 
 def _ensure_objectid(_id: str, name: str = "id"):
     if not ObjectId.is_valid(_id):
@@ -87,14 +88,17 @@ async def get_quizzes_filtered(
     search: Optional[str] = None,
     sort: Optional[str] = "createdAt",
     page: int = 1,
-    limit: int = 10
+    limit: int = 10,
+    cursor: Optional[str] = None
 ):
     """
     Fetch quizzes with:
     - Filtering by tenant / teacher / course
     - Text search on description
     - Sorting (ASC / DESC)
-    - Pagination
+    - Pagination: `page`, or a `cursor` from the previous page (keyset, no skip)
+
+    Returns (quizzes, next_cursor); next_cursor is None on the last page.
     """
 
     query: dict[str, Any] = {"isDeleted": False}
@@ -117,16 +121,21 @@ async def get_quizzes_filtered(
     sort_dir = -1 if sort.startswith("-") else 1
     sort_field = sort.lstrip("-")
 
+    keys = sort_keys(sort_field, sort_dir)
+    skip = 0 if cursor else (page - 1) * limit
+
     # Apply filtering, sorting, pagination
-    cursor = (
-        db.quizzes.find(query)
-        .sort(sort_field, sort_dir)
-        .skip((page - 1) * limit)
-        .limit(limit)
+    quizzes = await (
+        db.quizzes.find(apply_cursor(query, keys, cursor))
+        .sort(keys)
+        .skip(skip)
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
     )
+    quizzes, next_cursor = page_with_cursor(quizzes, limit, keys, query)
 
     # Convert to list of serialized quizzes
-    return [serialize_quiz(q) async for q in cursor]
+    return [serialize_quiz(q) for q in quizzes], next_cursor
 
 async def update_quiz(_id: str, teacherId: str, updates: dict):
     """
@@ -0,0 +1,164 @@
+# app/crud/rewards.py
+"""
+Course-completion rewards, applied asynchronously.
+
+mark_lesson_complete only queues a `courseCompleted` event in the
+`rewardOutbox` collection (app/utils/outbox.py); background workers apply the
+rewards of a whole batch of events in one ordered bulk_write on
+studentPerformance. Every operation is conditional, so re-running an event
+(retry, reclaimed batch, repeated enqueue) never grants a reward twice:
+
+    course stats     set on the existing entry, pushed only if there is none
+    bonus points     added together with the course entry's completionRewarded
+                     flag, only while that flag is unset
+    badges / certs   pushed only if the student has none for the course
+"""
+
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.core.settings import (
+    REWARD_BATCH_SIZE,
+    REWARD_LOCK_SECONDS,
+    REWARD_MAX_ATTEMPTS,
+    REWARD_POLL_SECONDS,
+    REWARD_RETENTION_DAYS,
+    REWARD_WORKERS,
+)
+from app.crud.student_performance import StudentPerformanceCRUD
+from app.db.database import db, student_performance_collection
+from app.utils.outbox import Outbox
+
+COURSE_COMPLETED = "courseCompleted"
+COMPLETION_POINTS = 100
+
+
+async def enqueue_course_completed(user_id: str, tenant_id: str, course_id: str, percentage: int, course: dict) -> None:
+    """Queue the rewards for a completed course (idempotent per student and course)."""
+    await reward_outbox.enqueue(
+        f"{COURSE_COMPLETED}:{user_id}:{course_id}",
+        COURSE_COMPLETED,
+        {
+            "userId": user_id,
+            "tenantId": ObjectId(tenant_id),
+            "courseId": course_id,
+            "courseName": course.get("title"),
+            "hasCertificate": bool(course.get("hasCertificate")),
+            "hasBadges": bool(course.get("hasBadges")),
+            "percentage": percentage,
+            "completedAt": datetime.utcnow(),
+        },
+    )
+
+
+def _completion_ops(student_id: ObjectId, payload: dict) -> list:
+    course_id = payload["courseId"]
+    percentage = payload["percentage"]
+    performance = {"studentId": student_id, "tenantId": payload["tenantId"]}
+    now = datetime.utcnow()
+    last_active = payload["completedAt"].isoformat()
+
+    ops = [
+        # 1. Course stats (update or insert)
+        UpdateOne(
+            {**performance, "courseStats.courseId": course_id},
+            {"$set": {
+                "courseStats.$.completionPercentage": percentage,
+                "courseStats.$.lastActive": last_active,
+            }},
+        ),
+        UpdateOne(
+            {**performance, "courseStats.courseId": {"$ne": course_id}},
+            {"$push": {"courseStats": {
+                "courseId": course_id,
+                "completionPercentage": percentage,
+                "lastActive": last_active,
+            }}},
+        ),
+    ]
+
+    if percentage == 100:
+        ops.append(UpdateOne(
+            {**performance, "badges.courseId": {"$ne": course_id}},
+            {"$push": {"badges": {
+                "courseId": course_id, "name": "Course Completer", "icon": "completion.png", "date": now,
+            }}},
+        ))
+
+    # 2. Completion bonus, once per course: flag the stats entry and add the
+    #    points (with level-ups) in the same pipeline update
+    ops.append(UpdateOne(
+        {**performance, "courseStats": {"$elemMatch": {"courseId": course_id, "completionRewarded": {"$ne": True}}}},
+        [
+            {"$set": {"courseStats": {"$map": {
+                "input": "$courseStats",
+                "in": {"$cond": [
+                    {"$eq": ["$$this.courseId", course_id]},
+                    {"$mergeObjects": ["$$this", {"completionRewarded": True}]},
+                    "$$this",
+                ]},
+            }}}},
+            *StudentPerformanceCRUD._points_pipeline(COMPLETION_POINTS),
+        ],
+    ))
+
+    # 3. Certificate / badge if the course offers them
+    if payload.get("hasCertificate"):
+        ops.append(UpdateOne(
+            {**performance, "certificates.courseId": {"$ne": course_id}},
+            {"$push": {"certificates": {
+                "courseId": course_id,
+                "courseName": payload.get("courseName"),
+                "issuedBy": "EduVerse AI",
+                "type": "Course Completion",
+                "date": now,
+            }}},
+        ))
+    if payload.get("hasBadges"):
+        ops.append(UpdateOne(
+            {**performance, "badges": {"$not": {"$elemMatch": {"courseId": course_id, "name": "Course Expert"}}}},
+            {"$push": {"badges": {
+                "courseId": course_id, "name": "Course Expert", "icon": "course_gold.png", "date": now,
+            }}},
+        ))
+
+    return ops
+
+
+async def apply_course_completions(events: list) -> None:
+    """Outbox handler: rewards for a batch of courseCompleted events."""
+    # Progress is keyed by the auth user id; performance by the student profile id
+    user_ids = list({ObjectId(e["payload"]["userId"]) for e in events})
+    student_ids = {
+        s["userId"]: s["_id"]
+        async for s in db.students.find({"userId": {"$in": user_ids}}, {"userId": 1})
+    }
+
+    ops = []
+    for event in events:
+        payload = event["payload"]
+        student_id = student_ids.get(ObjectId(payload["userId"]))
+        if student_id is None:
+            # no student profile, nothing to reward
+            continue
+        ops.extend(_completion_ops(student_id, payload))
+
+    if not ops:
+        return
+
+    # ordered: an event's stats entry must exist before its bonus is guarded on it
+    await student_performance_collection.bulk_write(ops, ordered=True)
+
+
+reward_outbox = Outbox(
+    db.rewardOutbox,
+    handlers={COURSE_COMPLETED: apply_course_completions},
+    workers=REWARD_WORKERS,
+    batch_size=REWARD_BATCH_SIZE,
+    poll_interval=REWARD_POLL_SECONDS,
+    lock_seconds=REWARD_LOCK_SECONDS,
+    max_attempts=REWARD_MAX_ATTEMPTS,
+    retention=timedelta(days=REWARD_RETENTION_DAYS),
+)
@@ -1,7 +1,27 @@
 from bson import ObjectId
 from datetime import datetime
+from pymongo import ReturnDocument
 from app.db.database import student_performance_collection
 from app.utils.mongo import fix_object_ids
+from app.crud.leaderboards import leaderboards
+
+
+# -----------------------------------------------------------
+# LEVEL THRESHOLDS
+# -----------------------------------------------------------
+def xp_needed_for(level: int) -> int:
+    raw = 300 * (1.5 ** (level - 1))
+    return int(round(raw / 50) * 50)
+
+
+# Levels beyond this keep accumulating xp at MAX_LEVEL (the thresholds grow
+# geometrically; level 60 alone needs ~7.4e12 xp)
+MAX_LEVEL = 60
+# LEVEL_XP[L - 1]: xp needed to go from level L to L + 1
+LEVEL_XP = [xp_needed_for(level) for level in range(1, MAX_LEVEL + 1)]
+# LEVEL_START_XP[L - 1]: xp accumulated since level 1 when level L is reached
+LEVEL_START_XP = [sum(LEVEL_XP[:i]) for i in range(MAX_LEVEL)]
+
 
 class StudentPerformanceCRUD:
 
@@ -32,6 +52,7 @@ class StudentPerformanceCRUD:
             "weeklyStudyTime": [],
             "courseStats": [],
 
+            "pointsUpdatedAt": datetime.utcnow(),
             "createdAt": datetime.utcnow()
         }
 
@@ -47,10 +68,6 @@ class StudentPerformanceCRUD:
         xp = data.get("xp", 0)
         level = data.get("level", 1)
 
-        def xp_needed_for(level):
-            raw = 300 * (1.5 ** (level - 1))
-            return int(round(raw / 50) * 50)
-
         xp_required = xp_needed_for(level)
 
         while xp >= xp_required:
@@ -63,6 +80,41 @@ class StudentPerformanceCRUD:
         data["xpToNextLevel"] = xp_required
         return data
 
+    @staticmethod
+    def _points_pipeline(points: int) -> list:
+        """
+        Update pipeline adding `points` and applying any level-ups server-side,
+        the same result as $inc followed by _update_level_system. Works on the
+        xp accumulated since level 1 (LEVEL_START_XP) instead of looping.
+        """
+        level = {"$min": [{"$ifNull": ["$level", 1]}, MAX_LEVEL]}
+        return [
+            {"$set": {
+                "totalPoints": {"$add": [{"$ifNull": ["$totalPoints", 0]}, points]},
+                "pointsThisWeek": {"$add": [{"$ifNull": ["$pointsThisWeek", 0]}, points]},
+                # leaderboards pick up changed documents by this (app/crud/leaderboards.py)
+                "pointsUpdatedAt": "$$NOW",
+                "level": level,
+                "_totalXp": {"$add": [
+                    {"$arrayElemAt": [{"$literal": LEVEL_START_XP}, {"$subtract": [level, 1]}]},
+                    {"$ifNull": ["$xp", 0]},
+                    points,
+                ]},
+            }},
+            # highest level whose start is reached; never below the current one
+            {"$set": {"level": {"$max": ["$level", {"$size": {"$filter": {
+                "input": {"$literal": LEVEL_START_XP},
+                "cond": {"$lte": ["$$this", "$_totalXp"]},
+            }}}]}}},
+            {"$set": {
+                "xp": {"$subtract": [
+                    "$_totalXp", {"$arrayElemAt": [{"$literal": LEVEL_START_XP}, {"$subtract": ["$level", 1]}]}
+                ]},
+                "xpToNextLevel": {"$arrayElemAt": [{"$literal": LEVEL_XP}, {"$subtract": ["$level", 1]}]},
+            }},
+            {"$project": {"_totalXp": 0}},
+        ]
+
     # -----------------------------------------------------------
     # GET PERFORMANCE BY STUDENT + TENANT
     # -----------------------------------------------------------
@@ -87,23 +139,19 @@ class StudentPerformanceCRUD:
     @staticmethod
     async def add_points(student_id: str, tenant_id: str, points: int):
 
-        await student_performance_collection.update_one(
-            {"studentId": ObjectId(student_id), "tenantId": ObjectId(tenant_id)},
-            {"$inc": {"totalPoints": points, "pointsThisWeek": points, "xp": points}}
-        )
-
-        updated = await StudentPerformanceCRUD.get_student_performance(student_id, tenant_id)
-        updated = StudentPerformanceCRUD._update_level_system(updated)
-
-        await student_performance_collection.update_one(
+        # one atomic update: concurrent awards can't lose a level-up
+        updated = await student_performance_collection.find_one_and_update(
             {"studentId": ObjectId(student_id), "tenantId": ObjectId(tenant_id)},
-            {"$set": {
-                "xp": updated["xp"],
-                "level": updated["level"],
-                "xpToNextLevel": updated["xpToNextLevel"]
-            }}
+            StudentPerformanceCRUD._points_pipeline(points),
+            return_document=ReturnDocument.AFTER,
         )
+        if not updated:
+            return None
+        leaderboards.record_points(student_id, tenant_id, updated["totalPoints"])
 
+        # same shape as get_student_performance (the route's response)
+        updated = fix_object_ids(updated)
+        updated["id"] = updated.get("_id")
         return updated
 
     # -----------------------------------------------------------
@@ -232,88 +280,40 @@ class StudentPerformanceCRUD:
         return await StudentPerformanceCRUD.get_student_performance(student_id, tenant_id)
 
     # -----------------------------------------------------------
-    # HELPER: Process Leaderboard with Lookup
-    # -----------------------------------------------------------
-    @staticmethod
-    async def _get_leaderboard(pipeline: list):
-        # Add lookup to pipeline
-        pipeline.extend([
-            {"$lookup": {
-                "from": "users",
-                "localField": "userId",
-                "foreignField": "_id",
-                "as": "user"
-            }},
-            {"$unwind": {"path": "$user", "preserveNullAndEmptyArrays": True}},
-            {"$sort": {"totalPoints": -1}}
-        ])
-        
-        cursor = student_performance_collection.aggregate(pipeline)
-        docs = await cursor.to_list(length=None)
-        
-        leaderboard = []
-        for d in docs:
-            user = d.get("user", {})
-            name = user.get("fullName") if user else d.get("studentName")
-            leaderboard.append({
-                "studentName": name,
-                "points": d.get("totalPoints", 0)
-            })
-            
-        leaderboard.sort(key=lambda x: -x["points"])
-        
-        # Limit to top 5 if needed? The functions will slice.
-        return leaderboard
-
-    # -----------------------------------------------------------
-    # CLEAN TENANT TOP 5 (rank, name, points)
+    # LEADERBOARDS (materialized, see app/crud/leaderboards.py)
     # -----------------------------------------------------------
     @staticmethod
     async def tenant_top5(tenant_id: str):
-        pipeline = [{"$match": {"tenantId": ObjectId(tenant_id)}}]
-        leaderboard = await StudentPerformanceCRUD._get_leaderboard(pipeline)
-        
-        top5 = leaderboard[:5]
-        for idx, item in enumerate(top5, start=1):
-            item["rank"] = idx
-        return top5
+        return (await leaderboards.board(tenant_id)).top(5)
 
-    # -----------------------------------------------------------
-    # CLEAN TENANT FULL LEADERBOARD
-    # -----------------------------------------------------------
     @staticmethod
     async def tenant_full(tenant_id: str):
-        pipeline = [{"$match": {"tenantId": ObjectId(tenant_id)}}]
-        leaderboard = await StudentPerformanceCRUD._get_leaderboard(pipeline)
-        
-        for idx, item in enumerate(leaderboard, start=1):
-            item["rank"] = idx
-        return leaderboard
+        return (await leaderboards.board(tenant_id)).all()
 
-    # -----------------------------------------------------------
-    # CLEAN GLOBAL TOP 5
-    # -----------------------------------------------------------
     @staticmethod
     async def global_top5():
-        pipeline = []
-        leaderboard = await StudentPerformanceCRUD._get_leaderboard(pipeline)
-        
-        top5 = leaderboard[:5]
-        for idx, item in enumerate(top5, start=1):
-            item["rank"] = idx
-        return top5
+        return (await leaderboards.board()).top(5)
 
-    # -----------------------------------------------------------
-    # CLEAN GLOBAL FULL LEADERBOARD
-    # -----------------------------------------------------------
     @staticmethod
     async def global_full():
-        pipeline = []
-        leaderboard = await StudentPerformanceCRUD._get_leaderboard(pipeline)
-        
-        for idx, item in enumerate(leaderboard, start=1):
-            item["rank"] = idx
-        return leaderboard
+        return (await leaderboards.board()).all()
+
+    @staticmethod
+    async def tenant_around(student_id: str, tenant_id: str, neighbours: int):
+        """A student's rank with `neighbours` rows either side; None if not on the board."""
+        if not ObjectId.is_valid(student_id):
+            return None
+        board = await leaderboards.board(tenant_id)
+        rows = board.around(str(ObjectId(student_id)), neighbours)
+        if rows is None:
+            return None
+        me = next(row for row in rows if row["isMe"])
+        return {
+            "rank": me["rank"],
+            "points": me["points"],
+            "total": len(board),
+            "leaderboard": rows,
+        }
 
     # -----------------------------------------------------------
     # GET PERFORMANCE FOR TEACHER'S STUDENTS
@@ -323,16 +323,16 @@ class StudentPerformanceCRUD:
         from app.db.database import courses_collection, students_collection
         
         try:
-            # 1. Get all course IDs for this teacher - Handle both string and ObjectId formats
+            # 1. Get all course IDs for this teacher (teacherId is stored as ObjectId,
+            #    see app/db/migrations/normalize_course_teacher_ids.py)
+            if not ObjectId.is_valid(teacher_id):
+                return []
             teacher_query = {
                 "tenantId": ObjectId(tenant_id),
-                "$or": [
-                    {"teacherId": teacher_id},
-                    {"teacherId": ObjectId(teacher_id) if ObjectId.is_valid(teacher_id) else None}
-                ]
+                "teacherId": ObjectId(teacher_id)
             }
             
-            teacher_courses = await courses_collection.find(teacher_query).to_list(length=None)
+            teacher_courses = await courses_collection.find(teacher_query, {"_id": 1}).to_list(length=None)
             course_ids = [str(c["_id"]) for c in teacher_courses]
             
             if not course_ids:
@@ -1,10 +1,16 @@
 from bson import ObjectId
 from datetime import datetime
+from pymongo import ReturnDocument, UpdateOne
 from typing import List, Optional
 from app.db.database import db
+from app.crud.courses import ensure_lesson_index
+from app.crud.rewards import enqueue_course_completed
 from app.schemas.student_progress import CourseProgress
 
 class ProgressCRUD:
+    # What completion needs from a course; never the modules
+    COURSE_PROJECTION = {"title": 1, "hasCertificate": 1, "hasBadges": 1, "totalLessons": 1}
+
     def __init__(self):
         self.collection = db.student_progress
 
@@ -36,6 +42,34 @@ class ProgressCRUD:
         progress["tenantId"] = str(progress["tenantId"])
         return progress
 
+    @staticmethod
+    def _completion_pipeline(lesson_ids: List[str], total_lessons: int, now: datetime) -> list:
+        """
+        Update pipeline appending `lesson_ids` to completedLessons (once each, in
+        order) and deriving progressPercentage / isCompleted from the result.
+        """
+        completed = {"$ifNull": ["$completedLessons", []]}
+        new_ids = {"$literal": list(dict.fromkeys(lesson_ids))}
+        return [
+            {"$set": {
+                "completedLessons": {"$concatArrays": [
+                    completed,
+                    {"$filter": {"input": new_ids, "cond": {"$not": [{"$in": ["$$this", completed]}]}}},
+                ]},
+                "lastAccessedAt": now,
+            }},
+            {"$set": {
+                "progressPercentage": {"$toInt": {"$trunc": {"$multiply": [
+                    {"$divide": [{"$size": "$completedLessons"}, total_lessons]}, 100
+                ]}}},
+            }},
+            {"$set": {"isCompleted": {"$gte": ["$progressPercentage", 100]}}},
+            # first completion time; kept if lessons are added to the course later
+            {"$set": {"completedAt": {"$ifNull": [
+                "$completedAt", {"$cond": ["$isCompleted", now, None]}
+            ]}}},
+        ]
+
     async def mark_lesson_complete(self, student_id: str, course_id: str, tenant_id: str, lesson_id: str) -> dict:
         """Mark a lesson as complete and update course percentage."""
         query = {
@@ -44,96 +78,100 @@ class ProgressCRUD:
             "tenantId": ObjectId(tenant_id)
         }
         
-        # 1. Get total lessons from course
-        course = await db.courses.find_one({"_id": ObjectId(course_id)})
+        # 1. Get total lessons from course (precomputed count, not the modules)
+        course = await db.courses.find_one(
+            {"_id": ObjectId(course_id)}, self.COURSE_PROJECTION
+        )
         if not course:
             raise ValueError("Course not found")
+        course = await ensure_lesson_index(course)
             
-        total_lessons = 0
-        for m in course.get("modules", []):
-            total_lessons += len(m.get("lessons", []))
+        total_lessons = course["totalLessons"]
             
         if total_lessons == 0:
             total_lessons = 1 # Prevent division by zero
             
-        # 2. Update completed lessons list
-        await self.collection.update_one(
-            query,
-            {
-                "$addToSet": {"completedLessons": lesson_id},
-                "$set": {"lastAccessedAt": datetime.utcnow()}
-            },
-            upsert=True
-        )
-        
-        # 3. Recalculate percentage
-        progress_doc = await self.collection.find_one(query)
-        completed_count = len(progress_doc.get("completedLessons", []))
-        percentage = int((completed_count / total_lessons) * 100)
-        
-        is_completed = (percentage >= 100)
-        
-        # 4. Save final state
-        await self.collection.update_one(
+        # 2. Add the lesson and recompute percentage/completion in one atomic update,
+        #    so concurrent clicks can't overwrite each other's percentage
+        progress_doc = await self.collection.find_one_and_update(
             query,
-            {
-                "$set": {
-                    "progressPercentage": percentage,
-                    "isCompleted": is_completed
-                }
-            }
+            self._completion_pipeline([lesson_id], total_lessons, datetime.utcnow()),
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
         )
+        percentage = progress_doc["progressPercentage"]
+        is_completed = progress_doc["isCompleted"]
         
-        # --- NEW: Reward System Integration ---
+        # 3. Rewards are applied in the background (app/crud/rewards.py); queueing
+        #    is idempotent per student and course, so repeated clicks are harmless
         if is_completed:
-            from app.crud.student_performance import StudentPerformanceCRUD
-            
-            # Find the internal student record to get studentId for performance
-            student_doc = await db.students.find_one({"userId": ObjectId(student_id)})
-            if student_doc:
-                internal_student_id = str(student_doc["_id"])
-                
-                # 1. Update performance record course stats
-                await StudentPerformanceCRUD.update_course_progress(
-                    internal_student_id, tenant_id, course_id, percentage, datetime.utcnow().isoformat()
-                )
-                
-                # 2. Award Points for completion
-                await StudentPerformanceCRUD.add_points(internal_student_id, tenant_id, 100) # Bonus for completion
-                
-                # 3. Award Certificate if course qualifies
-                if course.get("hasCertificate"):
-                    # Check if already awarded
-                    perf = await StudentPerformanceCRUD.get_student_performance(internal_student_id, tenant_id)
-                    already_has_cert = any(c.get("courseId") == course_id for c in perf.get("certificates", []))
-                    
-                    if not already_has_cert:
-                        await StudentPerformanceCRUD.add_certificate(internal_student_id, tenant_id, {
-                            "courseId": course_id,
-                            "courseName": course.get("title"),
-                            "issuedBy": "EduVerse AI",
-                            "type": "Course Completion"
-                        })
-                
-                # 4. Award Badge if course qualifies (Already partially handled in update_course_progress, but let's be explicit)
-                if course.get("hasBadges"):
-                    perf = await StudentPerformanceCRUD.get_student_performance(internal_student_id, tenant_id)
-                    already_has_badge = any(b.get("courseId") == course_id and b.get("name") == "Course Expert" for b in perf.get("badges", []))
-                    
-                    if not already_has_badge:
-                        await StudentPerformanceCRUD.add_badge(internal_student_id, tenant_id, {
-                            "courseId": course_id,
-                            "name": "Course Expert",
-                            "icon": "course_gold.png"
-                        })
+            await enqueue_course_completed(student_id, tenant_id, course_id, percentage, course)
 
         return {
             "courseId": course_id,
             "progressPercentage": percentage,
             "completedLessons": progress_doc.get("completedLessons", []),
             "isCompleted": is_completed,
-            "lastAccessedAt": datetime.utcnow()
+            "lastAccessedAt": progress_doc["lastAccessedAt"]
+        }
+
+    async def mark_lessons_complete(self, student_id: str, tenant_id: str, completions: List[tuple]) -> dict:
+        """
+        Apply many (course_id, lesson_id) completions at once: one progress update
+        per course (all of its lessons together) in a single bulk_write, and at
+        most one reward event per completed course.
+        """
+        lessons_by_course = {}
+        for course_id, lesson_id in completions:
+            lessons_by_course.setdefault(course_id, []).append(lesson_id)
+
+        errors = [
+            {"courseId": cid, "error": f"Invalid course ID format: {cid}"}
+            for cid in lessons_by_course if not ObjectId.is_valid(cid)
+        ]
+        course_ids = [cid for cid in lessons_by_course if ObjectId.is_valid(cid)]
+
+        courses = {
+            str(c["_id"]): c
+            async for c in db.courses.find(
+                {"_id": {"$in": [ObjectId(cid) for cid in course_ids]}}, self.COURSE_PROJECTION
+            )
         }
+        errors.extend({"courseId": cid, "error": "Course not found"} for cid in course_ids if cid not in courses)
+        course_ids = [cid for cid in course_ids if cid in courses]
+        if not course_ids:
+            return {"courses": [], "errors": errors}
+
+        now = datetime.utcnow()
+        updates = []
+        for cid in course_ids:
+            course = courses[cid] = await ensure_lesson_index(courses[cid])
+            updates.append(UpdateOne(
+                {"studentId": student_id, "courseId": cid, "tenantId": ObjectId(tenant_id)},
+                self._completion_pipeline(lessons_by_course[cid], course["totalLessons"] or 1, now),
+                upsert=True,
+            ))
+        await self.collection.bulk_write(updates, ordered=False)
+
+        progress_docs = await self.collection.find(
+            {"studentId": student_id, "tenantId": ObjectId(tenant_id), "courseId": {"$in": course_ids}}
+        ).to_list(length=None)
+
+        results = []
+        for doc in progress_docs:
+            if doc["isCompleted"]:
+                await enqueue_course_completed(
+                    student_id, tenant_id, doc["courseId"], doc["progressPercentage"], courses[doc["courseId"]]
+                )
+            results.append({
+                "courseId": doc["courseId"],
+                "progressPercentage": doc["progressPercentage"],
+                "completedLessons": doc.get("completedLessons", []),
+                "isCompleted": doc["isCompleted"],
+                "lastAccessedAt": doc["lastAccessedAt"],
+            })
+
+        return {"courses": results, "errors": errors}
 
     async def get_student_course_progress(self, student_id: str, tenant_id: str) -> List[dict]:
         """Get progress for all courses a student is enrolled in."""
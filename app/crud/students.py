@@ -1,12 +1,21 @@
+from collections import Counter
 from datetime import datetime
 from bson import ObjectId
 from fastapi import HTTPException
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
 from app.schemas.students import StudentCreate, StudentUpdate
 from app.utils.mongo import fix_object_ids
-from app.utils.security import hash_password
+from app.utils.security import hash_password_async, hash_passwords_async
+from app.utils.uploads import read_row_chunks
+from app.core.settings import STUDENT_IMPORT_CHUNK_SIZE
 from app.db.database import students_collection as COLLECTION
 from app.db.database import courses_collection, users_collection, db
 from app.db.database import student_performance_collection
+from app.auth.principal_cache import invalidate_principal
+from app.auth.revocation import revoke_user_tokens
+from app.crud.courses import course_cache
+from app.crud.leaderboards import leaderboards
 
 
 # ------------------ Helper: Merge User & Student Data ------------------ #
@@ -39,61 +48,40 @@ def merge_user_data(student_doc, user_doc):
     return merged
 
 
-# ---------------------------------------------------------------------------
-# Create Student (Multi-Tenant)
-# ---------------------------------------------------------------------------
-async def create_student(student: StudentCreate, tenant_id: str):
-    data = student.dict()
-
-    # Check if user exists
-    existing_user = await users_collection.find_one({"email": data["email"]})
-    if existing_user:
-        raise HTTPException(
-            status_code=400, detail="User with this email already exists"
-        )
-
-    # 0. Check if tenant exists
-    tenant = await db.tenants.find_one({"_id": ObjectId(tenant_id)})
-    if not tenant:
-        raise HTTPException(
-            status_code=404, detail=f"Tenant not found with ID: {tenant_id}"
-        )
-
-    # 1. Create USER document
+# ------------------ Helper: New Student Documents ------------------ #
+def _new_student_docs(data: dict, tenant_id: ObjectId, password_hash: str):
+    """User, student profile and performance documents for a new student (ids pre-assigned)."""
+    now = datetime.utcnow()
     user_doc = {
+        "_id": ObjectId(),
         "fullName": data["fullName"],
         "email": data["email"].lower(),
-        "password": hash_password(data["password"]),
+        "password": password_hash,
         "role": "student",
         "status": data.get("status", "active"),
         "profileImageURL": data.get("profileImageURL", ""),
         "contactNo": data.get("contactNo"),
         "country": data.get("country"),
-        "tenantId": ObjectId(data.get("tenantId") or tenant_id),
-        "createdAt": datetime.utcnow(),
-        "updatedAt": datetime.utcnow(),
+        "tenantId": tenant_id,
+        "createdAt": now,
+        "updatedAt": now,
         "lastLogin": None,
     }
 
-    user_result = await users_collection.insert_one(user_doc)
-    user_id = user_result.inserted_id
-
-    # 2. Create STUDENT document (Profile)
     student_doc = {
-        "userId": user_id,
-        "tenantId": ObjectId(tenant_id),
+        "_id": ObjectId(),
+        "userId": user_doc["_id"],
+        "tenantId": tenant_id,
         "enrolledCourses": [],
         "completedCourses": [],
-        "createdAt": datetime.utcnow(),
-        "updatedAt": datetime.utcnow(),
+        "createdAt": now,
+        "updatedAt": now,
     }
 
-    result = await COLLECTION.insert_one(student_doc)
-
     performance_doc = {
-        "tenantId": ObjectId(tenant_id),
-        "studentId": result.inserted_id,
-        "userId": user_id,
+        "tenantId": tenant_id,
+        "studentId": student_doc["_id"],
+        "userId": user_doc["_id"],
         "studentName": data["fullName"],
         "totalPoints": 0,
         "pointsThisWeek": 0,
@@ -104,10 +92,40 @@ async def create_student(student: StudentCreate, tenant_id: str):
         "certificates": [],
         "weeklyStudyTime": [],
         "courseStats": [],
-        "createdAt": datetime.utcnow(),
-        "updatedAt": datetime.utcnow(),
+        "pointsUpdatedAt": now,
+        "createdAt": now,
+        "updatedAt": now,
     }
 
+    return user_doc, student_doc, performance_doc
+
+
+# ---------------------------------------------------------------------------
+# Create Student (Multi-Tenant)
+# ---------------------------------------------------------------------------
+async def create_student(student: StudentCreate, tenant_id: str):
+    data = student.dict()
+
+    # Check if user exists
+    existing_user = await users_collection.find_one({"email": data["email"]})
+    if existing_user:
+        raise HTTPException(
+            status_code=400, detail="User with this email already exists"
+        )
+
+    # 0. Check if tenant exists
+    tenant = await db.tenants.find_one({"_id": ObjectId(tenant_id)})
+    if not tenant:
+        raise HTTPException(
+            status_code=404, detail=f"Tenant not found with ID: {tenant_id}"
+        )
+
+    user_doc, student_doc, performance_doc = _new_student_docs(
+        data, ObjectId(tenant_id), await hash_password_async(data["password"])
+    )
+
+    await users_collection.insert_one(user_doc)
+    result = await COLLECTION.insert_one(student_doc)
     await student_performance_collection.insert_one(performance_doc)
 
     new_student_combined = {
@@ -131,6 +149,133 @@ async def create_student(student: StudentCreate, tenant_id: str):
     return fix_object_ids(new_student_combined)
 
 
+# ---------------------------------------------------------------------------
+# Bulk Import (CSV / JSON lines)
+# ---------------------------------------------------------------------------
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, e['loc'])) or 'row'}: {e['msg']}" for e in error.errors()
+    )
+
+
+async def _insert_chunk(collection, docs: list) -> dict:
+    """insert_many(ordered=False); {position in docs: error message} for the rows that failed."""
+    if not docs:
+        return {}
+    try:
+        await collection.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        return {err["index"]: err.get("errmsg", "Insert failed") for err in e.details.get("writeErrors", [])}
+    return {}
+
+
+async def _import_chunk(tenant_id: ObjectId, rows: list, seen_emails: set) -> list:
+    report = []
+    pending = []  # (report entry, validated data)
+
+    for row_no, data, error in rows:
+        entry = {"row": row_no, "email": (data or {}).get("email"), "status": "invalid"}
+        report.append(entry)
+        if error:
+            entry["error"] = error
+            continue
+        try:
+            student = StudentCreate(**data)
+        except ValidationError as e:
+            entry["error"] = _validation_message(e)
+            continue
+
+        email = student.email.lower()
+        entry["email"] = email
+        if email in seen_emails:
+            entry["status"] = "duplicate"
+            entry["error"] = "Email appears earlier in this upload"
+            continue
+        seen_emails.add(email)
+        pending.append((entry, student.dict()))
+
+    if not pending:
+        return report
+
+    # One $in per chunk instead of a lookup per row
+    existing = {
+        u["email"]
+        async for u in users_collection.find(
+            {"email": {"$in": [entry["email"] for entry, _ in pending]}}, {"email": 1}
+        )
+    }
+    for entry, _ in pending:
+        if entry["email"] in existing:
+            entry["status"] = "duplicate"
+            entry["error"] = "User with this email already exists"
+    pending = [(entry, data) for entry, data in pending if entry["email"] not in existing]
+    if not pending:
+        return report
+
+    hashes = await hash_passwords_async([data["password"] for _, data in pending])
+    docs = [
+        _new_student_docs(data, tenant_id, password_hash)
+        for (_, data), password_hash in zip(pending, hashes)
+    ]
+
+    # users -> students -> performance; a row failing at one stage has its
+    # documents from the earlier stages removed again
+    stages = [users_collection, COLLECTION, student_performance_collection]
+    alive = list(range(len(pending)))
+    for stage, collection in enumerate(stages):
+        failed = await _insert_chunk(collection, [docs[i][stage] for i in alive])
+        if not failed:
+            continue
+
+        dropped = [alive[pos] for pos in failed]
+        for pos, message in failed.items():
+            entry = pending[alive[pos]][0]
+            entry["status"] = "failed"
+            entry["error"] = message
+        for earlier in range(stage):
+            await stages[earlier].delete_many(
+                {"_id": {"$in": [docs[i][earlier]["_id"] for i in dropped]}}
+            )
+        alive = [i for pos, i in enumerate(alive) if pos not in failed]
+
+    for i in alive:
+        entry = pending[i][0]
+        entry["status"] = "created"
+        entry["studentId"] = str(docs[i][1]["_id"])
+        entry["userId"] = str(docs[i][0]["_id"])
+
+    return report
+
+
+async def import_students(tenant_id: str, fileobj, fmt: str):
+    """
+    Create students from a CSV (header row) or JSON-lines upload with the
+    StudentCreate fields. Rows are processed in chunks of
+    STUDENT_IMPORT_CHUNK_SIZE and the import is not atomic: every row gets a
+    report entry with status created / duplicate / invalid / failed.
+    """
+    tenant = await db.tenants.find_one({"_id": ObjectId(tenant_id)}, {"_id": 1})
+    if not tenant:
+        raise HTTPException(
+            status_code=404, detail=f"Tenant not found with ID: {tenant_id}"
+        )
+
+    report = []
+    seen_emails = set()
+    async for rows in read_row_chunks(fileobj, fmt, STUDENT_IMPORT_CHUNK_SIZE):
+        report.extend(await _import_chunk(tenant["_id"], rows, seen_emails))
+
+    counts = Counter(entry["status"] for entry in report)
+    return {
+        "total": len(report),
+        "created": counts["created"],
+        "duplicates": counts["duplicate"],
+        "invalid": counts["invalid"],
+        "failed": counts["failed"],
+        "rows": report,
+    }
+
+
 # ---------------------------------------------------------------------------
 # Login (Email only — tenant irrelevant)
 # ---------------------------------------------------------------------------
@@ -238,6 +383,8 @@ async def delete_student(student_id: str, tenant_id: str):
             await courses_collection.update_one(
                 {"_id": ObjectId(course_id)}, {"$inc": {"enrolledStudents": -1}}
             )
+    if enrolled_courses:
+        await course_cache.invalidate_tenant(str(ObjectId(tenant_id)))
 
     # STEP 3 — Delete the student from the STUDENTS collection
     result = await COLLECTION.delete_one(
@@ -254,11 +401,15 @@ async def delete_student(student_id: str, tenant_id: str):
         await users_collection.delete_one(
             {"_id": ObjectId(user_id) if not isinstance(user_id, ObjectId) else user_id}
         )
+        invalidate_principal(user_id)
+        await revoke_user_tokens(user_id)
 
     # STEP 4 — Delete student performance document for this student + tenant
     await student_performance_collection.delete_one(
         {"studentId": ObjectId(student_id), "tenantId": ObjectId(tenant_id)}
     )
+    # other workers drop the entry at their next leaderboard rebuild
+    leaderboards.remove_student(student_id, tenant_id)
 
     return True
 
@@ -279,7 +430,7 @@ async def get_student_by_user(user_id: str):
 
 
 from app.utils.exceptions import not_found, bad_request
-from app.utils.security import hash_password, verify_password
+from app.utils.security import hash_password_async, verify_password_async
 
 # ---------------------------------------PROFILE FUnctions------------------------------------
 
@@ -343,6 +494,9 @@ async def update_student(student_id: str, tenantId: str, update: StudentUpdate):
 
     #  Update USERS collection
     await db.users.update_one({"_id": user_id}, {"$set": update_data})
+    invalidate_principal(user_id)
+    if "status" in update_data:
+        await revoke_user_tokens(user_id)
 
     #  Update STUDENT collection timestamp
     await COLLECTION.update_one(
@@ -375,11 +529,11 @@ async def change_student_me_password(
         not_found("User")
 
     # 2. Verify old password (same logic as login)
-    if not verify_password(old_password, user["password"]):
+    if not await verify_password_async(old_password, user["password"]):
         bad_request("Old password is incorrect")
 
     # 3. Prevent password reuse
-    if verify_password(new_password, user["password"]):
+    if await verify_password_async(new_password, user["password"]):
         bad_request("New password must be different from old password")
 
     # 4. Update password
@@ -387,11 +541,12 @@ async def change_student_me_password(
         {"_id": user["_id"]},
         {
             "$set": {
-                "password": hash_password(new_password),
+                "password": await hash_password_async(new_password),
                 "updatedAt": datetime.utcnow(),
             }
         },
     )
+    await revoke_user_tokens(user["_id"])
 
     return {
         "message": "Password updated successfully",
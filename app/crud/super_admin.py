@@ -2,6 +2,8 @@ from bson import ObjectId
 from datetime import datetime
 from app.db.database import db
 from app.crud.users import serialize_user
+from app.auth.principal_cache import invalidate_principal
+from app.auth.revocation import revoke_user_tokens
 
 
 def serialize_superadmin(user_doc):
@@ -38,6 +40,9 @@ async def update_superadmin(user_id: str, updates: dict):
         # Optional: check matched_count
         if result.matched_count == 0:
             return None
+        invalidate_principal(user_id)
+        if "status" in user_fields:
+            await revoke_user_tokens(user_id)
 
     # Fetch the updated document
     user = await db.users.find_one({"_id": ObjectId(user_id), "role": ROLE_NAME})
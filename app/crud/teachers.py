@@ -6,8 +6,11 @@ from app.schemas.teachers import TeacherCreate, TeacherUpdate, TeacherResponse
 from app.schemas.assignments import AssignmentCreate
 from app.schemas.quizzes import QuizCreate
 from app.crud.quizzes import serialize_quiz
-from app.utils.security import hash_password, verify_password
+from app.crud.courses import propagate_instructor_name
+from app.utils.security import hash_password_async, verify_password_async
 from app.utils.exceptions import not_found, bad_request
+from app.auth.principal_cache import invalidate_principal
+from app.auth.revocation import revoke_user_tokens
 
 # ------------------ Helpers ------------------
 
@@ -90,7 +93,7 @@ async def create_teacher(data: TeacherCreate):
     user_doc = {
         "fullName": d["fullName"],
         "email": d["email"].lower(),
-        "password": hash_password(d["password"]),
+        "password": await hash_password_async(d["password"]),
         "role": "teacher",
         "status": d.get("status", "active"),
         "profileImageURL": d.get("profileImageURL", ""),
@@ -201,6 +204,11 @@ async def update_teacher(id: str, updates: dict):
     if user_updates and user_id:
         user_updates["updatedAt"] = datetime.utcnow()
         await db.users.update_one({"_id": user_id}, {"$set": user_updates})
+        invalidate_principal(user_id)
+        if "status" in user_updates:
+            await revoke_user_tokens(user_id)
+        if "fullName" in user_updates:
+            await propagate_instructor_name(teacher["_id"], user_updates["fullName"])
 
     if teacher_updates:
         if "tenantId" in teacher_updates:
@@ -215,6 +223,9 @@ async def update_teacher(id: str, updates: dict):
         await db.teachers.update_one(
             {"_id": to_oid(id, "teacherId")}, {"$set": teacher_updates}
         )
+        # after the write, so a concurrent request cannot re-cache the old tenant
+        if "tenantId" in teacher_updates:
+            invalidate_principal(user_id)
 
     return await get_teacher(id)
 
@@ -234,6 +245,8 @@ async def delete_teacher(id: str):
         await users_collection.delete_one(
             {"_id": ObjectId(user_id) if not isinstance(user_id, ObjectId) else user_id}
         )
+        invalidate_principal(user_id)
+        await revoke_user_tokens(user_id)
 
     return result.deleted_count > 0
 
@@ -251,18 +264,15 @@ async def change_password(id: str, old_password: str, new_password: str):
     if not user:
         return None
 
-    from passlib.context import CryptContext
-
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-    if not pwd_context.verify(old_password, user.get("password", "")):
+    if not await verify_password_async(old_password, user.get("password", "")):
         return "INCORRECT"
 
-    hashed_new = hash_password(new_password)
+    hashed_new = await hash_password_async(new_password)
     await users_collection.update_one(
         {"_id": user_id},
         {"$set": {"password": hashed_new, "updatedAt": datetime.utcnow()}},
     )
+    await revoke_user_tokens(user_id)
     return True
 
 
@@ -439,11 +449,17 @@ async def update_teacher_profile(user_id: str, updates: dict):
     if user_updates:
         user_updates["updatedAt"] = datetime.utcnow()
         await users_collection.update_one({"_id": user_id}, {"$set": user_updates})
+        if "fullName" in user_updates:
+            await propagate_instructor_name(teacher["_id"], user_updates["fullName"])
 
     if teacher_updates:
         teacher_updates["updatedAt"] = datetime.utcnow()
         await db.teachers.update_one({"userId": user_id}, {"$set": teacher_updates})
 
+    invalidate_principal(user_id)
+    if "status" in user_updates:
+        await revoke_user_tokens(user_id)
+
     # Fetch fresh
     teacher = await db.teachers.find_one({"userId": user_id})
     user = await users_collection.find_one({"_id": user_id})
@@ -485,11 +501,11 @@ async def change_teacher_me_password(
         not_found("User")
 
     # 3. Verify old password
-    if not verify_password(old_password, user["password"]):
+    if not await verify_password_async(old_password, user["password"]):
         bad_request("Old password is incorrect")
 
     # 4. Prevent password reuse
-    if verify_password(new_password, user["password"]):
+    if await verify_password_async(new_password, user["password"]):
         bad_request("New password must be different from old password")
 
     # 5. Update password in users collection
@@ -497,12 +513,14 @@ async def change_teacher_me_password(
         {"_id": ObjectId(user_id)},
         {
             "$set": {
-                "password": hash_password(new_password),
+                "password": await hash_password_async(new_password),
                 "updatedAt": datetime.utcnow(),
             }
         },
     )
 
+    await revoke_user_tokens(user_id)
+
     # 6. Touch teacher profile timestamp
     await db.teachers.update_one(
         {"_id": teacher["_id"]},
@@ -3,6 +3,7 @@ from app.db.database import db
 from datetime import datetime
 from bson import ObjectId
 from typing import Optional, Any
+from app.utils.pagination import apply_cursor, page_with_cursor, sort_keys
 
 
 def _ensure_objectid(_id: str, name: str = "id"):
@@ -90,7 +91,12 @@ async def get_all_tenants(
     status: Optional[str] = None,
     search: Optional[str] = None,
     sort: Optional[str] = None,
+    cursor: Optional[str] = None,
 ):
+    """
+    One page of tenants and the cursor for the next page (None on the last).
+    With a `cursor`, `skip` is ignored and the page starts right after it.
+    """
 
     query: dict[str, Any] = {"isDeleted": False}
 
@@ -105,18 +111,22 @@ async def get_all_tenants(
             {"adminEmail": {"$regex": search, "$options": "i"}},
         ]
 
-    cursor = db.tenants.find(query)
-
-    # Sorting logic
+    # Sorting logic (_id breaks ties so pages and cursors are stable)
+    keys = sort_keys()
     if sort:
         direction = -1 if sort.startswith("-") else 1
-        field = sort.lstrip("-")
-        cursor = cursor.sort(field, direction)
-
-    # Pagination
-    tenants = await cursor.skip(skip).limit(limit).to_list(length=limit)
+        keys = sort_keys(sort.lstrip("-"), direction)
+
+    # Pagination: keyset after a cursor, offset otherwise
+    if cursor:
+        skip = 0
+    cursor_query = apply_cursor(query, keys, cursor)
+    tenants = await (
+        db.tenants.find(cursor_query).sort(keys).skip(skip).limit(limit + 1).to_list(length=limit + 1)
+    )
+    tenants, next_cursor = page_with_cursor(tenants, limit, keys, query)
 
-    return [serialize_tenant(t) for t in tenants]
+    return [serialize_tenant(t) for t in tenants], next_cursor
 
 
 # -------------------------
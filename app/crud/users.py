@@ -1,7 +1,13 @@
+import asyncio
+import logging
 from bson import ObjectId
 from datetime import datetime
+from pymongo import UpdateOne
+from app.core.settings import LAST_LOGIN_FLUSH_SECONDS
 from app.db.database import db
-from app.utils.security import hash_password, verify_password
+from app.utils.security import hash_password_async, verify_password_async
+
+logger = logging.getLogger(__name__)
 
 
 def serialize_user(u: dict):
@@ -30,7 +36,7 @@ async def get_user_by_email(email: str):
 
 async def create_user(data: dict):
     data["email"] = data["email"].lower()
-    data["password"] = hash_password(data["password"])
+    data["password"] = await hash_password_async(data["password"])
     data["createdAt"] = datetime.utcnow()
     data["updatedAt"] = datetime.utcnow()
     data["lastLogin"] = None
@@ -43,23 +49,92 @@ async def create_user(data: dict):
     return serialize_user(new_user)
 
 
+# Role-specific profile collections, joined in the same round trip as the user
+ROLE_PROFILE_COLLECTIONS = {"teacher": "teachers", "student": "students", "admin": "admins"}
+
+
+def _login_pipeline(match: dict) -> list:
+    """
+    Fetch a user together with its role profile (_id + tenantId) in one aggregation.
+
+    A user only has a profile in the collection matching its role, so the other
+    lookups are cheap index misses on `userId`.
+    """
+    pipeline = [{"$match": match}, {"$limit": 1}]
+
+    for role, collection in ROLE_PROFILE_COLLECTIONS.items():
+        pipeline.append(
+            {
+                "$lookup": {
+                    "from": collection,
+                    "localField": "_id",
+                    "foreignField": "userId",
+                    "as": f"{role}Profiles",
+                }
+            }
+        )
+
+    role_profiles = {
+        "$switch": {
+            "branches": [
+                {"case": {"$eq": ["$role", role]}, "then": f"${role}Profiles"}
+                for role in ROLE_PROFILE_COLLECTIONS
+            ],
+            "default": [],
+        }
+    }
+
+    pipeline.extend(
+        [
+            {
+                "$addFields": {
+                    "roleProfile": {
+                        "$let": {
+                            "vars": {"p": {"$arrayElemAt": [role_profiles, 0]}},
+                            "in": {
+                                "$cond": [
+                                    {"$ifNull": ["$$p", False]},
+                                    {"_id": "$$p._id", "tenantId": "$$p.tenantId"},
+                                    None,
+                                ]
+                            },
+                        }
+                    }
+                }
+            },
+            {"$project": {f"{role}Profiles": 0 for role in ROLE_PROFILE_COLLECTIONS}},
+        ]
+    )
+    return pipeline
+
+
+async def _find_login_user(match: dict):
+    results = await db.users.aggregate(_login_pipeline(match)).to_list(length=1)
+    return results[0] if results else None
+
+
 async def verify_user(email: str, password: str):
-    u = await get_user_by_email(email)
-    if not u or not verify_password(password, u["password"]):
+    u = await _find_login_user({"email": email.lower()})
+    if not u or not await verify_password_async(password, u["password"]):
+        return None
+
+    return attach_role_profile(u, u.pop("roleProfile", None))
+
+
+async def get_active_user_profile(user_id: str):
+    """Login-shaped user (with tenant and role ids) for an active user, used by token refresh."""
+    u = await _find_login_user(
+        {"_id": ObjectId(user_id), "status": {"$in": ["active", "studying"]}}
+    )
+    if not u:
         return None
 
-    # After verifying, fetch the role-specific doc to get the tenant_id and role-specific ID
-    user_id = u["_id"]
+    return attach_role_profile(u, u.pop("roleProfile", None))
+
+
+def attach_role_profile(u: dict, role_doc: dict = None):
     role = u["role"]
     tenant_id = u.get("tenantId")  # Start with tenantId from users collection
-    role_doc = None
-
-    if role == "teacher":
-        role_doc = await db.teachers.find_one({"userId": user_id})
-    elif role == "student":
-        role_doc = await db.students.find_one({"userId": user_id})
-    elif role == "admin":
-        role_doc = await db.admins.find_one({"userId": user_id})
 
     # If the role-specific document has a tenantId, it takes precedence
     if role_doc and role_doc.get("tenantId"):
@@ -81,3 +156,65 @@ async def update_last_login(user_id: str):
     await db.users.update_one(
         {"_id": ObjectId(user_id)}, {"$set": {"lastLogin": datetime.utcnow()}}
     )
+
+
+class LastLoginBuffer:
+    """
+    Coalesces `lastLogin` writes: logins only record the timestamp in memory and a
+    background task writes everything collected in one unordered bulk_write per
+    interval. `$max` keeps the newest timestamp when several workers flush.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._pending: dict[str, datetime] = {}
+        self._task = None
+
+    def record(self, user_id: str) -> None:
+        self._pending[str(user_id)] = datetime.utcnow()
+        self.start()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush lastLogin updates")
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        try:
+            await db.users.bulk_write(
+                [
+                    UpdateOne({"_id": ObjectId(uid)}, {"$max": {"lastLogin": ts}})
+                    for uid, ts in batch.items()
+                ],
+                ordered=False,
+            )
+        except Exception:
+            # Put the batch back (keeping newer timestamps) so the next tick retries it
+            for uid, ts in batch.items():
+                if uid not in self._pending or self._pending[uid] < ts:
+                    self._pending[uid] = ts
+            raise
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+last_login_buffer = LastLoginBuffer(interval=LAST_LOGIN_FLUSH_SECONDS)
@@ -1,15 +1,69 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 from dotenv import load_dotenv
+from app.core.settings import (
+    MONGO_COMPRESSORS,
+    MONGO_MAX_IDLE_TIME_MS,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_READ_PREFERENCE,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    MONGO_WRITE_CONCERN_JOURNAL,
+    MONGO_WRITE_CONCERN_TIMEOUT_MS,
+    MONGO_WRITE_CONCERN_W,
+    QUERY_MONITORING,
+)
+from app.db.monitoring import QueryCounter
 
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI")
 
-client = AsyncIOMotorClient(MONGO_URI)
+
+def client_options() -> dict:
+    """Pool, compression, read preference and write concern options from settings (only the ones set)."""
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "compressors": MONGO_COMPRESSORS or None,
+        "readPreference": MONGO_READ_PREFERENCE or None,
+        "wTimeoutMS": MONGO_WRITE_CONCERN_TIMEOUT_MS,
+    }
+
+    if MONGO_WRITE_CONCERN_W:
+        w = MONGO_WRITE_CONCERN_W
+        options["w"] = int(w) if w.isdigit() else w
+    if MONGO_WRITE_CONCERN_JOURNAL:
+        options["journal"] = MONGO_WRITE_CONCERN_JOURNAL.lower() in ("1", "true", "yes", "on")
+    if QUERY_MONITORING:
+        options["event_listeners"] = [QueryCounter()]
+
+    return {k: v for k, v in options.items() if v is not None}
+
+
+def create_client(uri: str = MONGO_URI, **overrides) -> AsyncIOMotorClient:
+    return AsyncIOMotorClient(uri, **{**client_options(), **overrides})
+
+
+# Created at import time because modules bind `db` / collections on import;
+# the app lifespan pings it on startup and closes it on shutdown.
+client = create_client()
 db = client["LMS"]
 
 
+async def ping_database() -> None:
+    """Fail fast on startup if MongoDB is unreachable."""
+    await client.admin.command("ping")
+
+
+def close_client() -> None:
+    client.close()
+
+
 # Tayyaba
 def get_courses_collection():
     return db["courses"]
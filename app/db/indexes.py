@@ -0,0 +1,199 @@
+"""
+Declarative index registry.
+
+Every hot filter/sort in the CRUD layer has its index listed in INDEXES. The
+registry is applied at startup (see the lifespan hook in app/main.py) and can be
+checked against a live database from the command line:
+
+    python -m app.db.indexes ensure    # create whatever is missing
+    python -m app.db.indexes report    # missing / extra / unused indexes
+"""
+
+import asyncio
+import logging
+import sys
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.db.database import db
+
+logger = logging.getLogger(__name__)
+
+
+INDEXES = {
+    # ------------------ Users & Roles ------------------
+    "users": [
+        IndexModel([("email", ASCENDING)]),  # login, signup duplicate checks
+    ],
+    "students": [
+        IndexModel([("userId", ASCENDING)]),  # auth, profile, progress
+        IndexModel([("tenantId", ASCENDING), ("enrolledCourses", ASCENDING)]),  # enrolled students, teacher stats
+    ],
+    "teachers": [
+        IndexModel([("userId", ASCENDING)]),
+        IndexModel([("tenantId", ASCENDING)]),  # admin dashboard
+    ],
+    "admins": [
+        IndexModel([("userId", ASCENDING)]),
+    ],
+    # ------------------ Tenants ------------------
+    "tenants": [
+        IndexModel([("tenantName", ASCENDING)]),  # duplicate name check
+    ],
+    "subscriptions": [
+        IndexModel([("tenantId", ASCENDING)]),
+    ],
+    # ------------------ Courses ------------------
+    "courses": [
+        IndexModel([("tenantId", ASCENDING), ("status", ASCENDING), ("category", ASCENDING)]),
+        IndexModel([("tenantId", ASCENDING), ("_id", ASCENDING)]),  # catalogue pages sorted by _id
+        IndexModel([("tenantId", ASCENDING), ("teacherId", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("teacherId", ASCENDING)]),  # teacher dashboards (no tenant filter)
+        IndexModel([("tenantId", ASCENDING), ("searchTokens", ASCENDING)]),  # course search (multikey)
+    ],
+    "student_progress": [
+        # equality on all three; studentId + tenantId also serves the "all my courses" query
+        IndexModel([("studentId", ASCENDING), ("tenantId", ASCENDING), ("courseId", ASCENDING)]),
+    ],
+    # ------------------ Quizzes ------------------
+    "quizzes": [
+        IndexModel([("tenantId", ASCENDING), ("courseId", ASCENDING), ("createdAt", DESCENDING)]),
+        IndexModel([("teacherId", ASCENDING), ("courseId", ASCENDING)]),
+    ],
+    "quizSubmissions": [
+        IndexModel([("quizId", ASCENDING), ("status", ASCENDING)]),  # quiz stats, pending counts
+        IndexModel([("studentId", ASCENDING), ("submittedAt", DESCENDING)]),  # student history
+        IndexModel([("studentId", ASCENDING), ("quizId", ASCENDING)]),  # duplicate submission check
+    ],
+    # ------------------ Assignments ------------------
+    "assignments": [
+        IndexModel([("tenantId", ASCENDING), ("courseId", ASCENDING)]),
+        IndexModel([("teacherId", ASCENDING)]),
+    ],
+    "assignmentSubmissions": [
+        IndexModel([("tenantId", ASCENDING), ("submittedAt", DESCENDING)]),
+        IndexModel([("studentId", ASCENDING), ("tenantId", ASCENDING), ("submittedAt", DESCENDING)]),
+        IndexModel([("assignmentId", ASCENDING), ("tenantId", ASCENDING), ("submittedAt", DESCENDING)]),
+    ],
+    # ------------------ Performance ------------------
+    "studentPerformance": [
+        IndexModel([("tenantId", ASCENDING), ("totalPoints", DESCENDING)]),  # tenant leaderboard
+        IndexModel([("totalPoints", DESCENDING)]),  # global leaderboard
+        IndexModel([("studentId", ASCENDING), ("tenantId", ASCENDING)]),
+        IndexModel([("tenantId", ASCENDING), ("pointsUpdatedAt", ASCENDING)]),  # leaderboard sync (tenant)
+        IndexModel([("pointsUpdatedAt", ASCENDING)]),  # leaderboard sync (global)
+    ],
+    "leaderboardSnapshots": [
+        IndexModel([("scope", ASCENDING), ("chunk", ASCENDING)]),
+    ],
+    "rewardOutbox": [
+        IndexModel([("status", ASCENDING), ("availableAt", ASCENDING)]),  # worker claims
+        IndexModel([("expiresAt", ASCENDING)], expireAfterSeconds=0),  # processed events
+    ],
+    # ------------------ Auth ------------------
+    "revokedTokens": [
+        # entries are useless once the tokens they cover have expired
+        IndexModel([("expiresAt", ASCENDING)], expireAfterSeconds=0),
+        IndexModel([("revokedAt", ASCENDING)]),  # incremental sync
+    ],
+}
+
+
+def _key(spec) -> tuple:
+    """Normalised key pattern, so indexes are compared by what they cover and not by name."""
+    return tuple(
+        (field, direction if isinstance(direction, str) else int(direction))
+        for field, direction in spec.items()
+    )
+
+
+async def _existing_indexes(collection) -> dict:
+    try:
+        info = await db[collection].index_information()
+    except OperationFailure:
+        # collection does not exist yet
+        return {}
+    return {name: _key(dict(index["key"])) for name, index in info.items()}
+
+
+async def ensure_indexes() -> dict:
+    """
+    Create every registered index that is missing. Safe to run on every startup:
+    indexes that already exist (under any name) are skipped.
+    Returns {collection: [created index names]}.
+    """
+    created = {}
+
+    for collection, models in INDEXES.items():
+        existing = set((await _existing_indexes(collection)).values())
+        missing = [m for m in models if _key(m.document["key"]) not in existing]
+        if not missing:
+            continue
+
+        try:
+            created[collection] = await db[collection].create_indexes(missing)
+        except OperationFailure:
+            logger.exception("Failed to create indexes on %s", collection)
+
+    return created
+
+
+async def index_report() -> dict:
+    """
+    Compare the registry with the live database.
+
+    missing: registered but not built
+    extra:   built but not registered (candidates for removal)
+    unused:  built but with zero accesses since the server last started ($indexStats)
+    """
+    report = {}
+
+    for collection in sorted(set(INDEXES) | set(await db.list_collection_names())):
+        existing = await _existing_indexes(collection)
+        registered = {_key(m.document["key"]): m.document["name"] for m in INDEXES.get(collection, [])}
+        built = set(existing.values())
+
+        usage = {}
+        if existing:
+            async for stat in db[collection].aggregate([{"$indexStats": {}}]):
+                usage[stat["name"]] = stat["accesses"]["ops"]
+
+        entry = {
+            "missing": [name for key, name in registered.items() if key not in built],
+            "extra": [name for name, key in existing.items() if name != "_id_" and key not in registered],
+            "unused": [name for name, ops in usage.items() if name != "_id_" and ops == 0],
+        }
+        if any(entry.values()):
+            report[collection] = entry
+
+    return report
+
+
+async def _main(command: str) -> int:
+    if command == "ensure":
+        created = await ensure_indexes()
+        for collection, names in created.items():
+            print(f"{collection}: created {', '.join(names)}")
+        if not created:
+            print("All registered indexes exist.")
+        return 0
+
+    report = await index_report()
+    for collection, entry in report.items():
+        print(collection)
+        for kind in ("missing", "extra", "unused"):
+            for name in entry[kind]:
+                print(f"  {kind:<8} {name}")
+    if not report:
+        print("Indexes match the registry and all are in use.")
+    # non-zero when something the app relies on is missing, so this can gate a deploy
+    return 1 if any(entry["missing"] for entry in report.values()) else 0
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "report"
+    if command not in ("ensure", "report"):
+        print("usage: python -m app.db.indexes [ensure|report]")
+        sys.exit(2)
+    sys.exit(asyncio.run(_main(command)))
@@ -0,0 +1,5 @@
+"""
+One-off data migrations. Each module is idempotent and runnable on its own:
+
+    python -m app.db.migrations.<name> [--dry-run]
+"""
@@ -0,0 +1,85 @@
+"""
+Backfill / repair the denormalised `instructor` sub-document on courses.
+
+Walks courses in _id order, `--batch-size` at a time. Per batch, it resolves
+teacher -> user names with two $in queries and writes the result with one
+unordered bulk_write, so it can run against a live database without long
+locks or unbounded memory. By default, only courses that are missing the
+sub-document or point at a different teacher are touched. `--all` re-checks
+every course (e.g. to repair names that drifted).
+
+    python -m app.db.migrations.backfill_course_instructors [--all] [--batch-size 500] [--dry-run]
+"""
+
+import argparse
+import asyncio
+
+from pymongo import UpdateOne
+
+from app.db.database import db
+
+STALE = {
+    "$or": [
+        {"instructor": {"$exists": False}},
+        {"$expr": {"$ne": ["$instructor.teacherId", "$teacherId"]}},
+    ]
+}
+
+
+async def _names_by_teacher(teacher_ids: set) -> dict:
+    teachers = await db.teachers.find(
+        {"_id": {"$in": list(teacher_ids)}}, {"userId": 1}
+    ).to_list(length=None)
+    users = await db.users.find(
+        {"_id": {"$in": [t["userId"] for t in teachers if t.get("userId")]}}, {"fullName": 1}
+    ).to_list(length=None)
+
+    user_names = {u["_id"]: u.get("fullName", "") for u in users}
+    return {t["_id"]: user_names.get(t.get("userId"), "") for t in teachers}
+
+
+async def backfill(repair_all: bool = False, batch_size: int = 500, dry_run: bool = False) -> dict:
+    base_query = {} if repair_all else STALE
+    stats = {"scanned": 0, "updated": 0, "batches": 0}
+    last_id = None
+
+    while True:
+        query = dict(base_query)
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+
+        courses = await db.courses.find(
+            query, {"teacherId": 1, "instructor": 1}
+        ).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+        if not courses:
+            break
+
+        last_id = courses[-1]["_id"]
+        stats["batches"] += 1
+        stats["scanned"] += len(courses)
+
+        names = await _names_by_teacher({c["teacherId"] for c in courses if c.get("teacherId")})
+        updates = []
+        for course in courses:
+            teacher_id = course.get("teacherId")
+            instructor = {"teacherId": teacher_id, "fullName": names.get(teacher_id, "")}
+            if course.get("instructor") != instructor:
+                updates.append(UpdateOne({"_id": course["_id"]}, {"$set": {"instructor": instructor}}))
+
+        if updates and not dry_run:
+            result = await db.courses.bulk_write(updates, ordered=False)
+            stats["updated"] += result.modified_count
+        elif dry_run:
+            stats["updated"] += len(updates)
+
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill courses.instructor")
+    parser.add_argument("--all", action="store_true", help="re-check every course, not only stale ones")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="count what would change")
+    args = parser.parse_args()
+
+    print(asyncio.run(backfill(repair_all=args.all, batch_size=args.batch_size, dry_run=args.dry_run)))
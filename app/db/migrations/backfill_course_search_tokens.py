@@ -0,0 +1,67 @@
+"""
+Backfill the `searchTokens` / `titleTokens` fields used by course search.
+
+Courses written before token search existed have no tokens and cannot be found
+by `search=` until this runs. Walks courses in _id order, `--batch-size` at a
+time, and writes each batch with one unordered bulk_write. By default, only
+courses without tokens are touched; `--all` recomputes every course (e.g. after
+changing the tokenizer in app/utils/search.py).
+
+    python -m app.db.migrations.backfill_course_search_tokens [--all] [--batch-size 500] [--dry-run]
+"""
+
+import argparse
+import asyncio
+
+from pymongo import UpdateOne
+
+from app.db.database import db
+from app.utils.search import SEARCH_FIELDS, course_search_fields
+
+MISSING = {"searchTokens": {"$exists": False}}
+
+
+async def backfill(recompute_all: bool = False, batch_size: int = 500, dry_run: bool = False) -> dict:
+    base_query = {} if recompute_all else MISSING
+    projection = {f: 1 for f in (*SEARCH_FIELDS, "searchTokens", "titleTokens")}
+    stats = {"scanned": 0, "updated": 0, "batches": 0}
+    last_id = None
+
+    while True:
+        query = dict(base_query)
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+
+        courses = await db.courses.find(
+            query, projection
+        ).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+        if not courses:
+            break
+
+        last_id = courses[-1]["_id"]
+        stats["batches"] += 1
+        stats["scanned"] += len(courses)
+
+        updates = []
+        for course in courses:
+            fields = course_search_fields(course)
+            if any(course.get(k) != v for k, v in fields.items()):
+                updates.append(UpdateOne({"_id": course["_id"]}, {"$set": fields}))
+
+        if updates and not dry_run:
+            result = await db.courses.bulk_write(updates, ordered=False)
+            stats["updated"] += result.modified_count
+        elif dry_run:
+            stats["updated"] += len(updates)
+
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill courses.searchTokens")
+    parser.add_argument("--all", action="store_true", help="recompute every course, not only those without tokens")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="count what would change")
+    args = parser.parse_args()
+
+    print(asyncio.run(backfill(recompute_all=args.all, batch_size=args.batch_size, dry_run=args.dry_run)))
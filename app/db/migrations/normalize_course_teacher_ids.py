@@ -0,0 +1,45 @@
+"""
+Normalise courses.teacherId to ObjectId.
+
+Courses created before teacherId was stored as an ObjectId still hold the hex
+string. Course queries and lookups now match ObjectIds only, so those courses
+would be missing from teacher filters and instructor names until converted.
+
+    python -m app.db.migrations.normalize_course_teacher_ids [--dry-run]
+"""
+
+import argparse
+import asyncio
+
+from app.db.database import db
+
+HEX_OBJECT_ID = "^[0-9a-fA-F]{24}$"
+
+
+async def migrate(dry_run: bool = False) -> dict:
+    convertible = {"teacherId": {"$type": "string", "$regex": HEX_OBJECT_ID}}
+    invalid = {"teacherId": {"$type": "string", "$not": {"$regex": HEX_OBJECT_ID}}}
+
+    result = {
+        "toConvert": await db.courses.count_documents(convertible),
+        # strings that are not ObjectIds cannot reference a teacher; reported, left untouched
+        "invalid": await db.courses.count_documents(invalid),
+        "converted": 0,
+    }
+
+    if not dry_run and result["toConvert"]:
+        # pipeline update: converts server-side in a single command
+        update = await db.courses.update_many(
+            convertible, [{"$set": {"teacherId": {"$toObjectId": "$teacherId"}}}]
+        )
+        result["converted"] = update.modified_count
+
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalise courses.teacherId to ObjectId")
+    parser.add_argument("--dry-run", action="store_true", help="only count affected courses")
+    args = parser.parse_args()
+
+    print(asyncio.run(migrate(dry_run=args.dry_run)))
@@ -0,0 +1,191 @@
+"""
+Mongo command monitoring, attributed per route.
+
+A pymongo CommandListener counts every command (with its duration and reply
+size) against the request that issued it. The request is found through a
+contextvar set by QueryMonitorMiddleware; Motor copies the context into its
+executor threads, so the listener sees it. Per-route histograms are kept per
+worker and exposed at GET /super-admin/db/query-stats.
+
+Query budgets cap the number of commands one request may issue, either
+globally (QUERY_BUDGET) or per endpoint with `Depends(query_budget(n))`.
+Over-budget requests are logged, or raise QueryBudgetExceeded when
+QUERY_BUDGET_MODE=raise (meant for tests).
+"""
+
+import logging
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Optional
+
+import bson
+from pymongo import monitoring
+
+from app.core.settings import QUERY_BUDGET, QUERY_BUDGET_MODE
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+class RequestQueryStats:
+    """Commands issued while serving one request."""
+
+    def __init__(self, budget: int = 0):
+        self.budget = budget
+        self.commands = 0
+        self.duration_ms = 0.0
+        self.bytes_returned = 0
+        self.by_command: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, command_name: str, duration_ms: float, size: int) -> None:
+        # listener callbacks run on Motor's executor threads, possibly concurrently
+        with self._lock:
+            self.commands += 1
+            self.duration_ms += duration_ms
+            self.bytes_returned += size
+            self.by_command[command_name] = self.by_command.get(command_name, 0) + 1
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    return _current_stats.get()
+
+
+class Histogram:
+    """Fixed-bucket histogram; bucket `le` values are inclusive upper bounds."""
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def to_dict(self) -> dict:
+        observations = sum(self.counts)
+        buckets = {f"le_{b}": c for b, c in zip(self.bounds, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {
+            "avg": round(self.total / observations, 2) if observations else 0.0,
+            "max": round(self.max, 2),
+            "buckets": buckets,
+        }
+
+
+COMMAND_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+DURATION_MS_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+BYTES_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class RouteQueryStats:
+    def __init__(self):
+        self.requests = 0
+        self.over_budget = 0
+        self.by_command: dict[str, int] = {}
+        self.commands = Histogram(COMMAND_BUCKETS)
+        self.duration_ms = Histogram(DURATION_MS_BUCKETS)
+        self.bytes_returned = Histogram(BYTES_BUCKETS)
+
+    def observe(self, stats: RequestQueryStats, over_budget: bool) -> None:
+        self.requests += 1
+        self.over_budget += over_budget
+        self.commands.observe(stats.commands)
+        self.duration_ms.observe(stats.duration_ms)
+        self.bytes_returned.observe(stats.bytes_returned)
+        for name, count in stats.by_command.items():
+            self.by_command[name] = self.by_command.get(name, 0) + count
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "overBudget": self.over_budget,
+            "commandsPerRequest": self.commands.to_dict(),
+            "dbTimeMsPerRequest": self.duration_ms.to_dict(),
+            "bytesPerRequest": self.bytes_returned.to_dict(),
+            "commandsByName": dict(self.by_command),
+        }
+
+
+_route_stats: dict[str, RouteQueryStats] = {}
+
+
+def route_query_stats() -> dict:
+    return {route: stats.to_dict() for route, stats in sorted(_route_stats.items())}
+
+
+def reset_route_query_stats() -> None:
+    _route_stats.clear()
+
+
+class QueryCounter(monitoring.CommandListener):
+    """Attributes each finished command to the request in the current context."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(event.command_name, event.duration_micros / 1000, len(bson.encode(event.reply)))
+
+    def failed(self, event):
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(event.command_name, event.duration_micros / 1000, 0)
+
+
+def query_budget(max_commands: int):
+    """Route dependency overriding QUERY_BUDGET for one endpoint: `Depends(query_budget(5))`."""
+
+    def set_budget():
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.budget = max_commands
+
+    return set_budget
+
+
+class QueryMonitorMiddleware:
+    """Pure ASGI middleware: scopes a RequestQueryStats to each HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(budget=QUERY_BUDGET)
+        token = _current_stats.set(stats)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_stats.reset(token)
+
+        # the router stores the matched route in the (shared) scope
+        route = scope.get("route")
+        key = f"{scope['method']} {route.path if route is not None else '<unmatched>'}"
+        over_budget = bool(stats.budget) and stats.commands > stats.budget
+
+        _route_stats.setdefault(key, RouteQueryStats()).observe(stats, over_budget)
+
+        if over_budget:
+            message = (
+                f"{key} issued {stats.commands} Mongo commands (budget {stats.budget}): "
+                f"{stats.by_command}, {stats.duration_ms:.1f} ms in Mongo"
+            )
+            if QUERY_BUDGET_MODE == "raise":
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
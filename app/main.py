@@ -1,5 +1,13 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.settings import ENSURE_INDEXES_ON_STARTUP, QUERY_MONITORING
+from app.crud.rewards import reward_outbox
+from app.crud.users import last_login_buffer
+from app.db.database import close_client, ping_database
+from app.db.indexes import ensure_indexes
+from app.db.monitoring import QueryMonitorMiddleware
 from app.routers.roles import admins, students, super_admin, teachers
 
 from app.routers import (
@@ -16,10 +24,33 @@ from app.routers import (
 from app.routers.auth import admin_auth, student_auth, teacher_auth, login
 from app.routers.dashboards import admin_dashboard
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await ping_database()
+
+    if ENSURE_INDEXES_ON_STARTUP:
+        try:
+            created = await ensure_indexes()
+            if created:
+                logging.getLogger(__name__).info("Created indexes: %s", created)
+        except Exception:
+            # The API still serves (slower) without them; `python -m app.db.indexes report` shows what is missing
+            logging.getLogger(__name__).exception("Index bootstrap failed")
+
+    reward_outbox.start()
+    yield
+    # Shutdown: write out buffered background work, then release the pool
+    await reward_outbox.stop()
+    await last_login_buffer.stop()
+    close_client()
+
+
 app = FastAPI(
     title="EduVerse AI Backend",
     description="Multi-Tenant E-Learning Platform API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
@@ -37,8 +68,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Total-Count", "X-Total-Count-Estimated", "X-Has-More"],
 )
 
+if QUERY_MONITORING:
+    app.add_middleware(QueryMonitorMiddleware)
+
 
 @app.get("/")
 def root():
@@ -68,7 +103,12 @@ app.include_router(student_performance.router)
 
 # Course Management
 # Student Progress Management (Directly on app to avoid router conflicts)
-from app.schemas.student_progress import MarkLessonCompleteRequest, CourseProgressResponse
+from app.schemas.student_progress import (
+    BatchProgressResponse,
+    CourseProgressResponse,
+    MarkLessonCompleteRequest,
+    MarkLessonsCompleteBatchRequest,
+)
 from app.crud.student_progress import progress_crud
 from app.auth.dependencies import require_role
 from typing import List
@@ -104,6 +144,22 @@ async def mark_lesson_complete_top(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/courses/progress/mark-complete/batch", response_model=BatchProgressResponse, tags=["Student Progress"])
+async def mark_lessons_complete_batch_top(
+    data: MarkLessonsCompleteBatchRequest,
+    current_user=Depends(require_role("student"))
+):
+    try:
+        student_id = current_user.get("user_id")
+        tenant_id = current_user.get("tenant_id")
+        return await progress_crud.mark_lessons_complete(
+            student_id, tenant_id, [(c.courseId, c.lessonId) for c in data.completions]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.get("/courses/progress/summary/all", response_model=List[CourseProgressResponse], tags=["Student Progress"])
 async def get_all_progress_top(
     tenantId: str = Query(..., alias="tenantId"),
@@ -54,6 +54,7 @@ async def get_all_assignments_route(
     order: int = -1,
     page: int = 1,
     limit: int = 10,
+    cursor: Optional[str] = None,
     current_user=Depends(require_role("teacher", "admin", "student")),
     _=Depends(require_tenant),  # Enforce tenant for listing
 ):
@@ -74,6 +75,7 @@ async def get_all_assignments_route(
         order=order,
         page=page,
         limit=limit,
+        cursor=cursor,
     )
 
 
@@ -1,10 +1,25 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from app.auth.auth_service import login_user
+from app.auth.auth_service import login_user, refresh_session, logout_user
+from app.auth.router import oauth2_scheme
+from app.schemas.users import RefreshTokenRequest
 
 router = APIRouter(prefix="/auth", tags=["Generate Token / Login"])
 
 
+def _token_response(result: dict) -> dict:
+    response = {
+        "access_token": result["access_token"],
+        "token_type": "bearer",
+        "user": result["user"],
+    }
+    # Only issued in stateless auth mode
+    if result.get("refresh_token"):
+        response["refresh_token"] = result["refresh_token"]
+    return response
+
+
 @router.post("/token")
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
 
@@ -13,8 +28,19 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     if not result:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    return {
-        "access_token": result["access_token"],
-        "token_type": "bearer",
-        "user": result["user"],
-    }
+    return _token_response(result)
+
+
+@router.post("/refresh")
+async def refresh_access_token(payload: RefreshTokenRequest):
+    result = await refresh_session(payload.refresh_token)
+    return _token_response(result)
+
+
+@router.post("/logout")
+async def logout(
+    payload: Optional[RefreshTokenRequest] = None,
+    token: str = Depends(oauth2_scheme),
+):
+    await logout_user(token, payload.refresh_token if payload else None)
+    return {"message": "Logged out successfully"}
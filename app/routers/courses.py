@@ -1,12 +1,13 @@
 
 
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
 from typing import List, Optional
 from app.schemas.courses import (
     CourseCreate, 
     CourseUpdate, 
     CourseResponse, 
     CourseEnrollment,
+    CourseBulkEnrollment,
     ReorderLessonsRequest,
     ReorderModulesRequest,
     PublishCourseRequest,
@@ -17,6 +18,7 @@ from app.crud.courses import course_crud
 from app.schemas.student_progress import MarkLessonCompleteRequest, CourseProgressResponse
 from app.crud.student_progress import progress_crud
 from app.auth.dependencies import get_current_user, require_role, require_tenant
+from app.utils.etag import not_modified
 
 router = APIRouter(prefix="/courses", tags=["courses"], dependencies=[Depends(get_current_user)])
 
@@ -44,13 +46,17 @@ async def create_course(course: CourseCreate):
 
 @router.get("/", response_model=List[CourseResponse])
 async def get_courses(
+    request: Request,
+    response: Response,
     tenantId: str = Query(..., description="Tenant ID (required)"),  
     teacher_id: Optional[str] = Query(None, description="Filter by teacher ID"),
     status: Optional[str] = Query(None, description="Filter by status (case-insensitive)"),
     category: Optional[str] = Query(None, description="Filter by category (case-insensitive)"),
     search: Optional[str] = Query(None, description="Search in title/description/category/courseCode"),
     skip: int = Query(0, ge=0, description="Number of courses to skip (pagination)"),
-    limit: int = Query(100, ge=1, le=100, description="Maximum courses to return")
+    limit: int = Query(100, ge=1, le=100, description="Maximum courses to return"),
+    total_mode: str = Query("exact", pattern="^(exact|estimated|none)$", description="exact, estimated (capped count) or none"),
+    cursor: Optional[str] = Query(None, description="Resume cursor from the X-Next-Cursor header (replaces skip)")
 ):
     """
     Get all courses with optional filters.
@@ -58,6 +64,16 @@ async def get_courses(
     tenantId is required as a query parameter.
     All text filters are case-insensitive.
     
+    The total is returned in the X-Total-Count header (with
+    X-Total-Count-Estimated when it hit the estimate cap). total_mode=none skips
+    counting for infinite-scroll clients; X-Has-More tells whether another page exists.
+    
+    X-Next-Cursor holds the `cursor` for the next page. Cursor pages seek straight
+    to their position (no skip) and are not counted again.
+    
+    Responses carry an ETag; send it back as If-None-Match to get a 304 when
+    the page is unchanged.
+    
     Returns:
     - 400: Invalid tenant ID or teacher ID format
     - 200: List of courses (can be empty)
@@ -69,17 +85,29 @@ async def get_courses(
         category=category,
         search=search,
         skip=skip,
-        limit=limit
+        limit=limit,
+        total_mode=total_mode,
+        cursor=cursor
     )
     
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result["message"])
     
-    return result["courses"]
+    if result["total"] is not None:
+        response.headers["X-Total-Count"] = str(result["total"])
+        if result["totalIsEstimate"]:
+            response.headers["X-Total-Count-Estimated"] = "true"
+    response.headers["X-Has-More"] = "true" if result["hasMore"] else "false"
+    if result["nextCursor"]:
+        response.headers["X-Next-Cursor"] = result["nextCursor"]
+    
+    return not_modified(request, response, result["etag"]) or result["courses"]
 
 
 @router.get("/{course_id}", response_model=CourseResponse)
 async def get_course(
+    request: Request,
+    response: Response,
     course_id: str,
     tenantId: str = Query(..., description="Tenant ID (required)") 
 ):
@@ -93,6 +121,7 @@ async def get_course(
     - 403: Course belongs to different tenant
     - 404: Course not found
     - 200: Course details
+    - 304: Unchanged since the ETag sent in If-None-Match
     """
     result = await course_crud.get_course_by_id(course_id, tenantId)
     
@@ -108,7 +137,7 @@ async def get_course(
         else:
             raise HTTPException(status_code=400, detail=message)
     
-    return result["course"]
+    return not_modified(request, response, result["etag"]) or result["course"]
 
 
 @router.put("/{course_id}", response_model=CourseResponse)
@@ -199,6 +228,37 @@ async def enroll_in_course(enrollment: CourseEnrollment):
     return result
 
 
+@router.post("/enroll/bulk", status_code=200)
+async def bulk_enroll_in_course(
+    enrollment: CourseBulkEnrollment,
+    current_user=Depends(require_role("admin", "teacher")),
+):
+    """
+    Enroll up to 1000 students in a course at once (class onboarding).
+    
+    Students that are already enrolled, missing or in another tenant are
+    skipped and listed in the response; the rest are enrolled.
+    
+    Returns:
+    - 400: Invalid course/tenant ID or course not in tenant
+    - 403: tenantId is not the caller's tenant
+    - 200: Counts and skipped IDs
+    """
+    if str(enrollment.tenantId) != str(current_user.get("tenant_id")):
+        raise HTTPException(status_code=403, detail="Cannot enroll students in another tenant's course")
+
+    result = await course_crud.bulk_enroll_students(
+        enrollment.courseId,
+        enrollment.studentIds,
+        enrollment.tenantId
+    )
+    
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["message"])
+    
+    return result
+
+
 @router.post("/unenroll", status_code=200)
 async def unenroll_from_course(enrollment: CourseEnrollment):
     """
@@ -226,19 +286,24 @@ async def unenroll_from_course(enrollment: CourseEnrollment):
 @router.get("/{course_id}/students")
 async def get_course_students(
     course_id: str,
-    tenantId: str = Query(..., description="Tenant ID (required)")
+    response: Response,
+    tenantId: str = Query(..., description="Tenant ID (required)"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size (all students when omitted)"),
+    after: Optional[str] = Query(None, description="Resume cursor from the X-Next-Cursor header")
 ):
     """
-    Get all students enrolled in a specific course.
+    Get the students enrolled in a specific course.
     
-    tenantId is required as a query parameter.
+    tenantId is required as a query parameter. With `limit`, results are paged:
+    the X-Next-Cursor response header holds the `after` value for the next page
+    and is absent on the last one.
     
     Returns:
     - 400: Invalid course ID or tenant ID format
     - 404: Course not found or belongs to different tenant
     - 200: List of enrolled students
     """
-    result = await course_crud.get_enrolled_students(course_id, tenantId)
+    result = await course_crud.get_enrolled_students(course_id, tenantId, limit, after)
     
     if not result["success"]:
         message = result["message"]
@@ -250,6 +315,9 @@ async def get_course_students(
         else:
             raise HTTPException(status_code=400, detail=message)
     
+    if result["nextCursor"]:
+        response.headers["X-Next-Cursor"] = result["nextCursor"]
+    
     return result["students"]
 
 
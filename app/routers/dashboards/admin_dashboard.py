@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
 from app.crud.dashboards import admin_dashboard as crud_admin
 from app.auth.dependencies import get_current_user, require_role
 
@@ -9,18 +10,44 @@ admin_roles = ["admin", "super-admin"]
 
 
 @router.get("/teachers")
-async def list_teachers(current_user=Depends(require_role(*admin_roles))):
-    teachers = await crud_admin.get_all_teachers(current_user["tenant_id"])
-    return {"total": len(teachers), "teachers": teachers}
+async def list_teachers(
+    page: int = Query(1, ge=1),
+    limit: int = Query(100, ge=1, le=500),
+    sort: Optional[str] = Query(None, description="createdAt, fullName or email; prefix '-' for desc"),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return"),
+    current_user=Depends(require_role(*admin_roles)),
+):
+    total, teachers = await crud_admin.get_all_teachers(
+        current_user["tenant_id"], page, limit, sort, fields
+    )
+    return {"total": total, "page": page, "limit": limit, "teachers": teachers}
 
 
 @router.get("/students")
-async def list_students(current_user=Depends(require_role(*admin_roles))):
-    students = await crud_admin.get_all_students(current_user["tenant_id"])
-    return {"total": len(students), "students": students}
+async def list_students(
+    page: int = Query(1, ge=1),
+    limit: int = Query(100, ge=1, le=500),
+    sort: Optional[str] = Query(None, description="createdAt, fullName or email; prefix '-' for desc"),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return"),
+    current_user=Depends(require_role(*admin_roles)),
+):
+    total, students = await crud_admin.get_all_students(
+        current_user["tenant_id"], page, limit, sort, fields
+    )
+    return {"total": total, "page": page, "limit": limit, "students": students}
 
 
 @router.get("/courses")
-async def list_courses(current_user=Depends(require_role(*admin_roles))):
-    courses = await crud_admin.get_all_courses(current_user["tenant_id"])
-    return {"total": len(courses), "courses": courses}
+async def list_courses(
+    page: int = Query(1, ge=1),
+    limit: int = Query(100, ge=1, le=500),
+    sort: Optional[str] = Query(
+        None, description="createdAt, title, status, category or enrolledStudents; prefix '-' for desc"
+    ),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return"),
+    current_user=Depends(require_role(*admin_roles)),
+):
+    total, courses = await crud_admin.get_all_courses(
+        current_user["tenant_id"], page, limit, sort, fields
+    )
+    return {"total": total, "page": page, "limit": limit, "courses": courses}
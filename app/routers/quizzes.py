@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Query, status, Depends
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status, Depends
 from bson import ObjectId
 from typing import Optional
 
@@ -13,6 +13,7 @@ from app.crud.quizzes import (
     has_quiz_submissions
 )
 from app.auth.dependencies import get_current_user
+from app.utils.etag import make_etag, not_modified
 
 router = APIRouter(
     prefix="/quizzes",
@@ -21,17 +22,18 @@ router = APIRouter(
 
 # ------------------ STUDENT SPECIFIC ------------------
 @router.get("/student/me", response_model=list[QuizResponse])
-async def get_my_quizzes(current_user=Depends(get_current_user)):
+async def get_my_quizzes(request: Request, response: Response, current_user=Depends(get_current_user)):
     """
     Fetch quizzes ONLY for courses the student is enrolled in.
     """
     if current_user["role"] != "student":
         raise HTTPException(status_code=403, detail="Only students can access this endpoint")
         
-    return await get_student_quizzes(
+    quizzes = await get_student_quizzes(
         user_id=current_user["user_id"],
         tenant_id=current_user["tenant_id"]
     )
+    return not_modified(request, response, make_etag(quizzes)) or quizzes
 
 
 # ------------------ VALIDATION ------------------
@@ -53,25 +55,28 @@ async def create_quiz_route(data: QuizCreate):
 
 # ------------------ GET QUIZ BY ID ------------------
 @router.get("/{quiz_id}", response_model=QuizResponse, summary="Get quiz by ID")
-async def get_one(quiz_id: str):
+async def get_one(quiz_id: str, request: Request, response: Response):
     _validate_objectid(quiz_id)
     quiz = await get_quiz(quiz_id)
     if not quiz:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
-    return quiz
+    return not_modified(request, response, make_etag(quiz)) or quiz
 
 
 # ------------------ LIST QUIZZES (FILTERING + SEARCH + PAGINATION) ------------------
 @router.get("/", response_model=list[QuizResponse],
             summary="List quizzes with filtering, searching, sorting, pagination")
 async def list_quizzes(
+    request: Request,
+    response: Response,
     tenant_id: Optional[str] = None,
     teacher_id: Optional[str] = None,
     course_id: Optional[str] = None,
     search: Optional[str] = Query(None, description="search in description"),
     sort: Optional[str] = Query("createdAt", description="Sort results: 'name' or 'createdAt or '-createdAt'"),
     page: int = Query(1, ge=1),
-    limit: int = Query(10, ge=1, le=100)
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Resume cursor from the X-Next-Cursor header (replaces page)")
 ):
 
     # Validate IDs only if provided
@@ -83,9 +88,12 @@ async def list_quizzes(
         _validate_objectid(course_id)
 
     # Forward to CRUD function
-    return await get_quizzes_filtered(
-        tenant_id, teacher_id, course_id, search, sort, page, limit
+    quizzes, next_cursor = await get_quizzes_filtered(
+        tenant_id, teacher_id, course_id, search, sort, page, limit, cursor
     )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return not_modified(request, response, make_etag([quizzes, next_cursor])) or quizzes
 
 # ------------------ UPDATE QUIZ ------------------
 @router.patch("/{quiz_id}", response_model=QuizResponse, summary="Update/Patch quiz by ID")
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, File, Query, UploadFile
 from bson import ObjectId
 from datetime import datetime
 from dotenv import load_dotenv
+from app.schemas.courses import CourseUpdate
 from app.schemas.teachers import TeacherUpdate
 from app.crud import admins as crud_admin
 from app.crud.students import delete_student as crud_delete_student
+from app.crud.students import import_students as crud_import_students
+from app.crud.courses import course_crud, invalidate_course_cache
+from app.utils.uploads import detect_format
 
 from app.crud.teachers import (
     delete_teacher as crud_delete_teacher,
@@ -18,6 +23,7 @@ from app.crud.admins import (
     change_admin_me_password,
 )
 from app.auth.dependencies import require_role
+from app.auth.auth_service import reissue_tokens
 
 load_dotenv()
 
@@ -41,7 +47,7 @@ async def update_me(
     return await update_admin_me(current_user, payload)
 
 
-@router.put("/me/password", status_code=status.HTTP_204_NO_CONTENT)
+@router.put("/me/password")
 async def change_password(
     payload: AdminUpdatePassword,
     current_user=Depends(get_current_user),
@@ -49,6 +55,9 @@ async def change_password(
     await change_admin_me_password(
         current_user, payload.oldPassword, payload.newPassword
     )
+    # the change revokes every existing token, including this one
+    tokens = await reissue_tokens(current_user["user_id"])
+    return {"message": "Password updated successfully", **tokens}
 
 
 # ------------------ Dashboard ------------------
@@ -69,14 +78,34 @@ async def list_students():
 
 
 @router.get("/courses")
-async def list_courses():
-    courses = await crud_admin.get_all_courses()
-    return {"total": len(courses), "courses": courses}
+async def list_courses(
+    page: int = Query(1, ge=1),
+    limit: int = Query(100, ge=1, le=500),
+    sort: Optional[str] = Query(
+        None, description="createdAt, title, status, category or enrolledStudents; prefix '-' for desc"
+    ),
+):
+    total, courses = await crud_admin.get_all_courses(page, limit, sort)
+    return {"total": total, "page": page, "limit": limit, "courses": courses}
 
 
 # ------------------ Students Endpoints ------------------
 
 
+@router.post("/students/import")
+async def import_students(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or jsonl; guessed from the file name if omitted"),
+    current_user=Depends(get_current_user),
+):
+    """
+    Bulk-create students in the admin's tenant from a CSV (with a header row)
+    or JSON-lines file with the StudentCreate fields. Returns a per-row report.
+    """
+    fmt = detect_format(file.filename, file.content_type, format)
+    return await crud_import_students(current_user["tenant_id"], file.file, fmt)
+
+
 @router.patch("/students/{student_id}")
 async def update_student(student_id: str, data: dict):
     student = await crud_admin.db.students.find_one({"_id": ObjectId(student_id)})
@@ -137,32 +166,32 @@ async def delete_teacher(teacher_id: str):
 
 
 @router.patch("/courses/{course_id}")
-async def update_course(course_id: str, data: dict):
-    course = await crud_admin.db.courses.find_one({"_id": ObjectId(course_id)})
+async def update_course(course_id: str, data: CourseUpdate):
+    course = await crud_admin.db.courses.find_one({"_id": ObjectId(course_id)}, {"tenantId": 1})
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
 
-    update_data = {k: v for k, v in data.items() if v is not None}
-    if update_data:
-        update_data["updatedAt"] = datetime.utcnow()
-        await crud_admin.db.courses.update_one(
-            {"_id": ObjectId(course_id)}, {"$set": update_data}
-        )
-
-    updated_course = await crud_admin.db.courses.find_one({"_id": ObjectId(course_id)})
+    # Shared update path: rebuilds the instructor, search tokens and lesson index
+    updated_course = await course_crud.update_course(course_id, str(course["tenantId"]), data)
+    if not updated_course:
+        raise HTTPException(status_code=404, detail="Course not found")
 
     return {
         "id": str(updated_course["_id"]),
         "title": updated_course.get("title", ""),
         "code": updated_course.get("courseCode", ""),
-        "instructor": updated_course.get("instructor", "N/A"),
+        "instructor": updated_course.get("instructorName") or "N/A",
         "status": updated_course.get("status", "Active"),
     }
 
 
 @router.delete("/courses/{course_id}")
 async def delete_course(course_id: str):
-    result = await crud_admin.db.courses.delete_one({"_id": ObjectId(course_id)})
-    if result.deleted_count == 0:
+    course = await crud_admin.db.courses.find_one_and_delete(
+        {"_id": ObjectId(course_id)}, projection={"tenantId": 1}
+    )
+    if not course:
         raise HTTPException(status_code=404, detail="Course not found")
+    if course.get("tenantId"):
+        await invalidate_course_cache(course["tenantId"], course_id)
     return {"message": "Course deleted successfully"}
@@ -8,6 +8,7 @@ from app.schemas.students import (
 from app.crud import students as crud_student
 from app.auth.dependencies import get_current_user, require_role
 from app.schemas.teachers import ChangePassword
+from app.auth.auth_service import reissue_tokens
 
 
 router = APIRouter(
@@ -40,6 +41,9 @@ async def change_password(
     await crud_student.change_student_me_password(
         current_user, payload.oldPassword, payload.newPassword
     )
+    # the change revokes every existing token, including this one
+    tokens = await reissue_tokens(current_user["user_id"])
+    return {"message": "Password updated successfully", **tokens}
 
 
 # -----------------------------------------------------
@@ -1,5 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.auth.dependencies import get_current_user, require_role
+from app.auth.principal_cache import principal_cache
+from app.crud.courses import course_cache
+from app.crud.leaderboards import leaderboards
+from app.crud.rewards import reward_outbox
+from app.db.monitoring import reset_route_query_stats, route_query_stats
 from app.schemas.super_admin import SuperAdminResponse, SuperAdminUpdate
 from app.crud.super_admin import get_superadmin_by_user, update_superadmin
 
@@ -33,3 +38,39 @@ async def update_my_profile(
         raise HTTPException(404, "Super Admin profile not found")
 
     return updated
+
+
+@router.get("/auth/principal-cache")
+async def principal_cache_stats():
+    # hit/miss counters for the per-worker principal cache used by get_current_user
+    return principal_cache.stats()
+
+
+@router.get("/cache/courses")
+async def course_cache_stats():
+    # hit/miss counters for the course catalogue response cache (this worker)
+    return course_cache.stats()
+
+
+@router.get("/rewards/outbox")
+async def reward_outbox_stats():
+    # reward queue depth by status, plus this worker's processed/retried/failed counters
+    return await reward_outbox.stats()
+
+
+@router.get("/leaderboards")
+async def leaderboard_stats():
+    # loaded leaderboard scopes on this worker: size, sync/rebuild age and watermark
+    return leaderboards.stats()
+
+
+@router.get("/db/query-stats")
+async def query_stats():
+    # per-route Mongo command histograms for this worker (requires QUERY_MONITORING)
+    return route_query_stats()
+
+
+@router.delete("/db/query-stats")
+async def clear_query_stats():
+    reset_route_query_stats()
+    return {"message": "Query stats cleared"}
@@ -20,6 +20,7 @@ from app.crud.teachers import (
     update_teacher_me,
 )
 from app.auth.dependencies import get_current_user, require_role
+from app.auth.auth_service import reissue_tokens
 
 router = APIRouter(
     prefix="/teachers",
@@ -51,6 +52,9 @@ async def change_password(
     await change_teacher_me_password(
         current_user, payload.oldPassword, payload.newPassword
     )
+    # the change revokes every existing token, including this one
+    tokens = await reissue_tokens(current_user["user_id"])
+    return {"message": "Password updated successfully", **tokens}
 
 
 # ------------------ Profile (Me) ------------------
@@ -1,52 +1,79 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from app.auth.dependencies import get_current_user
 from app.crud.student_performance import StudentPerformanceCRUD
+from app.utils.etag import make_etag, not_modified
 
 router = APIRouter(prefix="/studentPerformance", tags=["Student Performance"], dependencies=[Depends(get_current_user)])
 
 
+# GET responses carry an ETag; clients polling with If-None-Match get a 304
+# while the data is unchanged (see app/utils/etag.py).
+
+
 # -------------------- GLOBAL LEADERBOARDS --------------------
 @router.get("/leaderboard/global-full")
-async def global_full():
-    return await StudentPerformanceCRUD.global_full()
+async def global_full(request: Request, response: Response):
+    data = await StudentPerformanceCRUD.global_full()
+    return not_modified(request, response, make_etag(data)) or data
 
 
 @router.get("/leaderboard/global-top5")
-async def global_top5():
-    return await StudentPerformanceCRUD.global_top5()
+async def global_top5(request: Request, response: Response):
+    data = await StudentPerformanceCRUD.global_top5()
+    return not_modified(request, response, make_etag(data)) or data
 
 
 # -------------------- TENANT LEADERBOARDS --------------------
 @router.get("/{tenantId}/leaderboard")
-async def tenant_full(tenantId: str):
-    return await StudentPerformanceCRUD.tenant_full(tenantId)
+async def tenant_full(tenantId: str, request: Request, response: Response):
+    data = await StudentPerformanceCRUD.tenant_full(tenantId)
+    return not_modified(request, response, make_etag(data)) or data
 
 
 @router.get("/{tenantId}/leaderboard-top5")
-async def tenant_top5(tenantId: str):
-    return await StudentPerformanceCRUD.tenant_top5(tenantId)
+async def tenant_top5(tenantId: str, request: Request, response: Response):
+    data = await StudentPerformanceCRUD.tenant_top5(tenantId)
+    return not_modified(request, response, make_etag(data)) or data
+
+
+@router.get("/{tenantId}/leaderboard/around/{studentId}")
+async def tenant_around(
+    tenantId: str,
+    studentId: str,
+    request: Request,
+    response: Response,
+    neighbours: int = Query(5, ge=0, le=50),
+):
+    """A student's rank plus up to `neighbours` students above and below."""
+    data = await StudentPerformanceCRUD.tenant_around(studentId, tenantId, neighbours)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Student not found on this leaderboard")
+    return not_modified(request, response, make_etag(data)) or data
 
 
 # -------------------- TEACHER SPECIFIC --------------------
 @router.get("/teacher/{teacher_id}")
-async def get_teacher_student_performances(teacher_id: str, tenantId: str):
+async def get_teacher_student_performances(teacher_id: str, tenantId: str, request: Request, response: Response):
     """
     Get all student performances for a specific teacher's courses.
     Requires tenantId as query parameter.
     """
-    return await StudentPerformanceCRUD.get_teacher_performances(teacher_id, tenantId)
+    data = await StudentPerformanceCRUD.get_teacher_performances(teacher_id, tenantId)
+    return not_modified(request, response, make_etag(data)) or data
 
 
 # -------------------- STUDENT PERFORMANCE --------------------
 @router.get("/{tenantId}/{studentId}")
-async def get_student_performance(tenantId: str, studentId: str):
-    return await StudentPerformanceCRUD.get_student_performance(studentId, tenantId)
+async def get_student_performance(tenantId: str, studentId: str, request: Request, response: Response):
+    data = await StudentPerformanceCRUD.get_student_performance(studentId, tenantId)
+    return not_modified(request, response, make_etag(data)) or data
 
 
 # -------------------- BADGES --------------------
 @router.get("/{tenantId}/{studentId}/badges")
-async def get_badges(tenantId: str, studentId: str):
-    return await StudentPerformanceCRUD.view_badges(studentId, tenantId)
+async def get_badges(tenantId: str, studentId: str, request: Request, response: Response):
+    data = await StudentPerformanceCRUD.view_badges(studentId, tenantId)
+    return not_modified(request, response, make_etag(data)) or data
 
 
 @router.post("/{tenantId}/{studentId}/badges")
@@ -56,8 +83,9 @@ async def add_badge(tenantId: str, studentId: str, badge: dict):
 
 # -------------------- CERTIFICATES --------------------
 @router.get("/{tenantId}/{studentId}/certificates")
-async def get_certificates(tenantId: str, studentId: str):
-    return await StudentPerformanceCRUD.view_certificates(studentId, tenantId)
+async def get_certificates(tenantId: str, studentId: str, request: Request, response: Response):
+    data = await StudentPerformanceCRUD.view_certificates(studentId, tenantId)
+    return not_modified(request, response, make_etag(data)) or data
 
 
 @router.post("/{tenantId}/{studentId}/certificates")
@@ -67,8 +95,9 @@ async def add_certificate(tenantId: str, studentId: str, cert: dict):
 
 # -------------------- COURSE STATS --------------------
 @router.get("/{tenantId}/{studentId}/course-stats")
-async def course_stats(tenantId: str, studentId: str):
-    return await StudentPerformanceCRUD.get_course_stats(studentId, tenantId)
+async def course_stats(tenantId: str, studentId: str, request: Request, response: Response):
+    data = await StudentPerformanceCRUD.get_course_stats(studentId, tenantId)
+    return not_modified(request, response, make_etag(data)) or data
 
 
 @router.post("/{tenantId}/{studentId}/course-progress/{courseId}")
@@ -1,7 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List
 from app.auth.dependencies import get_current_user, require_role, require_tenant
-from app.schemas.student_progress import MarkLessonCompleteRequest, CourseProgressResponse
+from app.schemas.student_progress import (
+    BatchProgressResponse,
+    CourseProgressResponse,
+    MarkLessonCompleteRequest,
+    MarkLessonsCompleteBatchRequest,
+)
 from app.crud.student_progress import progress_crud
 
 router = APIRouter(tags=["Student Progress"])
@@ -40,6 +45,23 @@ async def mark_lesson_complete(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/mark-complete/batch", response_model=BatchProgressResponse)
+async def mark_lessons_complete_batch(
+    data: MarkLessonsCompleteBatchRequest,
+    current_user=Depends(require_role("student"))
+):
+    """Replay many lesson completions (offline / catch-up sync) in one request."""
+    try:
+        student_id = current_user.get("user_id")
+        tenant_id = current_user.get("tenant_id")
+        return await progress_crud.mark_lessons_complete(
+            student_id, tenant_id, [(c.courseId, c.lessonId) for c in data.completions]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/summary/all", response_model=List[CourseProgressResponse])
 async def get_all_progress(
     tenantId: str = Query(..., alias="tenantId"),
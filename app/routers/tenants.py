@@ -1,4 +1,4 @@
-from fastapi import HTTPException, status, APIRouter, Query, Depends
+from fastapi import HTTPException, status, APIRouter, Query, Depends, Response
 from app.auth.dependencies import require_role
 from bson import ObjectId
 from typing import Optional
@@ -35,13 +35,20 @@ def _validate_objectid(_id: str):
 # -------------------------
 @router.get("/", response_model=list[TenantResponse], summary="Get all tenants")
 async def get_all(
+    response: Response,
     skip: int = Query(0, ge=0, description="Items to skip for pagination"),
     limit: int = Query(10, ge=1, le=100, description="Max tenants to return"),
     status: Optional[str] = Query(None, description="Filter tenants by status"),
     search: Optional[str] = Query(None, description="Search tenants by tenant name or admin email"),
-    sort: Optional[str] = Query(None, description="Sort results: 'name' or 'createdAt or '-createdAt'")
+    sort: Optional[str] = Query(None, description="Sort results: 'name' or 'createdAt or '-createdAt'"),
+    cursor: Optional[str] = Query(None, description="Resume cursor from the X-Next-Cursor header (replaces skip)")
 ):
-    return await get_all_tenants(skip=skip, limit=limit, status=status, search=search, sort=sort)
+    tenants, next_cursor = await get_all_tenants(
+        skip=skip, limit=limit, status=status, search=search, sort=sort, cursor=cursor
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return tenants
 
 
 # -------------------------
@@ -93,3 +93,4 @@ class AssignmentListResponse(BaseModel):
     total: int
     totalPages: int
     results: list[AssignmentResponse]
+    nextCursor: Optional[str] = None
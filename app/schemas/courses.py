@@ -106,6 +106,12 @@ class CourseEnrollment(BaseModel):
     courseId: str
     tenantId: str  
 
+# Schema for enrolling a whole class at once
+class CourseBulkEnrollment(BaseModel):
+    courseId: str
+    tenantId: str
+    studentIds: List[str] = Field(..., min_length=1, max_length=1000)
+
 # Schema for course data including student progress tracking
 class CourseWithProgress(CourseResponse):
     progress: Optional[int] = 0  # Percentage (0-100)
@@ -32,3 +32,15 @@ class CourseProgressResponse(BaseModel):
     completedLessons: List[str]
     isCompleted: bool
     lastAccessedAt: datetime
+
+# Offline / catch-up sync: many completions in one request
+class MarkLessonsCompleteBatchRequest(BaseModel):
+    completions: List[MarkLessonCompleteRequest] = Field(..., min_length=1, max_length=1000)
+
+class CourseProgressError(BaseModel):
+    courseId: str
+    error: str
+
+class BatchProgressResponse(BaseModel):
+    courses: List[CourseProgressResponse]
+    errors: List[CourseProgressError] = []
@@ -43,3 +43,7 @@ class UserResponse(UserBase):
     updatedAt: datetime
     lastLogin: Optional[datetime] = None
     model_config = ConfigDict(from_attributes=True)
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
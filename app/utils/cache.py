@@ -0,0 +1,254 @@
+# app/utils/cache.py
+"""
+Tenant-scoped response cache with version stamps.
+
+Cached values are stored under keys that embed version stamps, e.g.
+
+    courses:<tenant>:<tenant stamp>.<list stamp>:<hash of the filter params>
+
+A write bumps the stamps it affects (`$inc` on a document in the
+`cacheVersions` collection), so every key built from the old stamp becomes
+unreachable; nothing has to be found and deleted, which also makes shared
+external stores safe. The writing worker sees its bump immediately, other
+workers re-read stamps at most every CACHE_VERSION_MAX_STALENESS_SECONDS,
+which bounds how long they can serve an outdated response.
+
+Backends are pluggable: the in-process LRU is the default, anything
+implementing CacheBackend (e.g. a Redis adapter) can be configured with
+`module.path:factory`. Cached values are shared between requests and must be
+treated as read-only.
+"""
+
+import hashlib
+import importlib
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Iterable, List, Optional
+
+from pymongo import ReturnDocument
+
+from app.core.settings import CACHE_VERSION_MAX_STALENESS_SECONDS
+from app.db.database import db
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------ Backends ------------------
+
+
+class CacheBackend(ABC):
+    """Storage interface for ResponseCache. Implementations may be shared across workers."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    def stats(self) -> dict:
+        return {}
+
+
+class LRUCacheBackend(CacheBackend):
+    """In-process LRU with per-entry expiry (one per worker)."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "maxSize": self.max_size, "evictions": self.evictions}
+
+
+def load_backend(spec: str, max_size: int) -> CacheBackend:
+    """"memory" for the in-process LRU, or "module.path:factory" for a custom backend."""
+    if spec == "memory":
+        return LRUCacheBackend(max_size)
+
+    module_name, _, attr = spec.partition(":")
+    factory = getattr(importlib.import_module(module_name), attr)
+    return factory()
+
+
+# ------------------ Version Stamps ------------------
+
+
+class VersionStamps:
+    """
+    Monotonic counters in the `cacheVersions` collection, read through a
+    per-worker copy that is trusted for `max_staleness` seconds.
+    """
+
+    def __init__(self, max_staleness: float):
+        self.collection = db.cacheVersions
+        self.max_staleness = max_staleness
+        self._local: dict[str, tuple[int, float]] = {}
+
+    async def get_many(self, names: List[str]) -> List[int]:
+        now = time.monotonic()
+        stale = [n for n in names if n not in self._local or now - self._local[n][1] >= self.max_staleness]
+        if stale:
+            found = {
+                d["_id"]: d["v"]
+                async for d in self.collection.find({"_id": {"$in": stale}}, {"v": 1})
+            }
+            for name in stale:
+                self._local[name] = (found.get(name, 0), now)
+        return [self._local[n][0] for n in names]
+
+    async def bump(self, names: Iterable[str]) -> None:
+        for name in set(names):
+            doc = await self.collection.find_one_and_update(
+                {"_id": name},
+                {"$inc": {"v": 1}, "$set": {"updatedAt": datetime.utcnow()}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            # this worker sees its own writes immediately
+            self._local[name] = (doc["v"], time.monotonic())
+
+
+# ------------------ Response Cache ------------------
+
+
+class ResponseCache:
+    """
+    Versioned cache of serialized responses for one resource type.
+
+    Each tenant has three stamps: `<ns>:<tenant>` (everything), `<ns>:<tenant>:list`
+    (list responses) and `<ns>:<tenant>:<item id>` (one item's detail responses).
+    """
+
+    def __init__(self, namespace: str, backend: Optional[CacheBackend], ttl: float, versions: VersionStamps):
+        self.namespace = namespace
+        self.backend = backend
+        self.ttl = ttl
+        self.versions = versions
+
+        # counters
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None and self.ttl > 0
+
+    def _stamps(self, tenant_id: str, item_id: Optional[str]) -> List[str]:
+        base = f"{self.namespace}:{tenant_id}"
+        return [base, f"{base}:{item_id}" if item_id else f"{base}:list"]
+
+    async def _key(self, tenant_id: str, item_id: Optional[str], params: Optional[dict]) -> str:
+        stamps = self._stamps(tenant_id, item_id)
+        versions = await self.versions.get_many(stamps)
+        digest = hashlib.sha1(json.dumps(params or {}, sort_keys=True, default=str).encode()).hexdigest()
+        return f"{stamps[-1]}:{'.'.join(map(str, versions))}:{digest}"
+
+    async def lookup(self, tenant_id: str, params: Optional[dict] = None, item_id: Optional[str] = None):
+        """
+        (key, cached value or None). Pass the key to `store` once the value is
+        computed: the key pins the stamps seen *before* the read, so a result
+        racing with a write is stored under the outdated key and never served.
+        """
+        if not self.enabled:
+            return None, None
+        try:
+            key = await self._key(tenant_id, item_id, params)
+            value = await self.backend.get(key)
+        except Exception:
+            # a cache failure must never fail the read
+            self.errors += 1
+            logger.exception("%s cache read failed", self.namespace)
+            return None, None
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return key, value
+
+    async def store(self, key: Optional[str], value: Any) -> None:
+        if key is None:
+            return
+        try:
+            await self.backend.set(key, value, self.ttl)
+        except Exception:
+            self.errors += 1
+            logger.exception("%s cache write failed", self.namespace)
+
+    async def invalidate(self, tenant_id, item_id=None, lists: bool = True) -> None:
+        """After a write: drop the tenant's lists and, with `item_id`, that item's detail."""
+        names = []
+        if lists:
+            names.append(f"{self.namespace}:{tenant_id}:list")
+        if item_id:
+            names.append(f"{self.namespace}:{tenant_id}:{item_id}")
+        await self._bump(names)
+
+    async def invalidate_tenant(self, tenant_id) -> None:
+        """After a write touching many items of a tenant: drop all of its entries."""
+        await self._bump([f"{self.namespace}:{tenant_id}"])
+
+    async def _bump(self, names: List[str]) -> None:
+        if not self.enabled or not names:
+            return
+        self.invalidations += 1
+        try:
+            await self.versions.bump(names)
+        except Exception:
+            # the write itself succeeded; entries expire after `ttl` at the latest
+            self.errors += 1
+            logger.exception("%s cache invalidation failed for %s", self.namespace, names)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "ttlSeconds": self.ttl,
+            "versionMaxStalenessSeconds": self.versions.max_staleness,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            **(self.backend.stats() if self.backend else {}),
+        }
+
+
+version_stamps = VersionStamps(max_staleness=CACHE_VERSION_MAX_STALENESS_SECONDS)
@@ -0,0 +1,54 @@
+# app/utils/etag.py
+"""
+ETag / If-None-Match support for polled GET endpoints.
+
+    @router.get("/{id}")
+    async def read(id: str, request: Request, response: Response):
+        data = await load(id)
+        return not_modified(request, response, make_etag(data)) or data
+
+The ETag is a weak validator over the response content (the JSON encoding is
+not guaranteed to be byte-identical between renders). Responses carry
+`Cache-Control: private, no-cache`: browsers keep the body but revalidate on
+every poll, and an unchanged resource comes back as an empty 304 without the
+response model being validated or rendered.
+"""
+
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# Headers describing the body that a 304 must not repeat
+_BODY_HEADERS = {"content-length", "content-type"}
+
+
+def make_etag(value: Any) -> str:
+    """Weak ETag for a JSON-compatible value (ObjectIds/datetimes are hashed as strings)."""
+    raw = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return f'W/"{hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison (RFC 9110 13.1.2) against an If-None-Match header."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Set the ETag on `response`; return a 304 to send instead when the client
+    already holds this version. Headers already set on `response` are kept.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+    if not etag_matches(request.headers.get("if-none-match"), etag):
+        return None
+    headers = {k: v for k, v in response.headers.items() if k.lower() not in _BODY_HEADERS}
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,211 @@
+# app/utils/outbox.py
+"""
+Durable in-process job queue backed by a MongoDB collection (transactional
+outbox pattern).
+
+    outbox = Outbox(db.rewardOutbox, handlers={"courseCompleted": apply_completions}, ...)
+    await outbox.enqueue("courseCompleted:<user>:<course>", "courseCompleted", {...})
+
+`enqueue` is one idempotent upsert keyed by the event id, so repeating it (a
+retried request, a double click) never queues the same work twice. Worker
+tasks claim up to `batch_size` ready events at a time and pass all events of
+one type to its handler in a single call. Handlers must be idempotent: an event
+is retried with exponential backoff when its handler raises, and a batch
+claimed by a worker that died is claimed again once its lock expires. After
+`max_attempts` an event is left with status "failed" for inspection; processed
+events expire through the TTL index on `expiresAt`.
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[List[dict]], Awaitable[None]]
+
+MAX_BACKOFF_SECONDS = 300
+
+
+class Outbox:
+    def __init__(
+        self,
+        collection,
+        handlers: Dict[str, Handler],
+        workers: int,
+        batch_size: int,
+        poll_interval: float,
+        lock_seconds: float,
+        max_attempts: int,
+        retention: timedelta,
+    ):
+        self.collection = collection
+        self.handlers = handlers
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lock_seconds = lock_seconds
+        self.max_attempts = max_attempts
+        self.retention = retention
+
+        self._tasks: List[asyncio.Task] = []
+        self._wake = asyncio.Event()
+        self._stopping = False
+
+        # counters
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+
+    # ------------------ Producer ------------------
+
+    async def enqueue(self, event_id: str, event_type: str, payload: dict) -> None:
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": event_id},
+            {"$setOnInsert": {
+                "type": event_type,
+                "payload": payload,
+                "status": "pending",
+                "attempts": 0,
+                "availableAt": now,
+                "createdAt": now,
+            }},
+            upsert=True,
+        )
+        self._wake.set()
+
+    # ------------------ Workers ------------------
+
+    def start(self) -> None:
+        if self._tasks or self.workers <= 0:
+            return
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 10) -> None:
+        """Let workers finish their current batch; unfinished batches are reclaimed after their lock expires."""
+        if not self._tasks:
+            return
+        self._stopping = True
+        self._wake.set()
+        _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                handled = await self.process_batch()
+            except Exception:
+                logger.exception("Outbox %s: batch failed", self.collection.name)
+                handled = 0
+
+            if handled == 0 and not self._stopping:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _ready(self, now: datetime) -> dict:
+        return {"$or": [
+            {"status": "pending", "availableAt": {"$lte": now}},
+            # claimed by a worker that never finished
+            {"status": "processing", "lockedUntil": {"$lte": now}},
+        ]}
+
+    async def claim(self) -> List[dict]:
+        """Atomically take up to `batch_size` ready events for this worker."""
+        now = datetime.utcnow()
+        ready = self._ready(now)
+        ids = [
+            d["_id"]
+            async for d in self.collection.find(ready, {"_id": 1}).sort("availableAt", 1).limit(self.batch_size)
+        ]
+        if not ids:
+            return []
+
+        token = uuid.uuid4().hex
+        await self.collection.update_many(
+            {"_id": {"$in": ids}, **ready},
+            {
+                "$set": {
+                    "status": "processing",
+                    "claim": token,
+                    "lockedUntil": now + timedelta(seconds=self.lock_seconds),
+                },
+                "$inc": {"attempts": 1},
+            },
+        )
+        # another worker may have won some of them between the find and the update
+        return await self.collection.find({"claim": token}).to_list(length=None)
+
+    async def process_batch(self) -> int:
+        """Claim and handle one batch. Returns the number of events handled."""
+        events = await self.claim()
+        if not events:
+            return 0
+
+        by_type: Dict[str, List[dict]] = {}
+        for event in events:
+            by_type.setdefault(event["type"], []).append(event)
+
+        for event_type, group in by_type.items():
+            handler = self.handlers.get(event_type)
+            try:
+                if handler is None:
+                    raise RuntimeError(f"No handler for event type {event_type!r}")
+                await handler(group)
+            except Exception as e:
+                logger.exception("Outbox %s: %d %s events failed", self.collection.name, len(group), event_type)
+                await self._retry(group, e)
+            else:
+                await self._done(group)
+
+        return len(events)
+
+    async def _done(self, events: List[dict]) -> None:
+        now = datetime.utcnow()
+        await self.collection.update_many(
+            {"_id": {"$in": [e["_id"] for e in events]}, "claim": events[0]["claim"]},
+            {
+                "$set": {"status": "done", "processedAt": now, "expiresAt": now + self.retention},
+                "$unset": {"claim": "", "lockedUntil": "", "lastError": ""},
+            },
+        )
+        self.processed += len(events)
+
+    async def _retry(self, events: List[dict], error: Exception) -> None:
+        now = datetime.utcnow()
+        for event in events:
+            attempts = event.get("attempts", 1)
+            if attempts >= self.max_attempts:
+                update = {"status": "failed", "failedAt": now}
+                self.failed += 1
+            else:
+                delay = min(2 ** attempts, MAX_BACKOFF_SECONDS)
+                update = {"status": "pending", "availableAt": now + timedelta(seconds=delay)}
+                self.retried += 1
+
+            await self.collection.update_one(
+                {"_id": event["_id"], "claim": event["claim"]},
+                {"$set": {**update, "lastError": str(error)[:500]}, "$unset": {"claim": "", "lockedUntil": ""}},
+            )
+
+    async def stats(self) -> dict:
+        counts = {
+            d["_id"]: d["count"]
+            async for d in self.collection.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}])
+        }
+        return {
+            "workers": len(self._tasks),
+            "processed": self.processed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "queue": counts,
+        }
@@ -0,0 +1,120 @@
+# app/utils/pagination.py
+"""
+Keyset (cursor) pagination.
+
+Offset pages (`skip` / `page`) make the server walk past every skipped row, so
+page 500 costs 500 times page one. A cursor instead records where the previous
+page ended (its sort key values plus `_id`) and the next page starts with a
+range condition on those keys, which an index seeks to directly.
+
+Cursors are opaque to clients: base64 JSON signed with HMAC-SHA256, bound to
+the sort and the filters they were issued for, so they cannot be edited or
+replayed against a different query.
+
+    keys = sort_keys("createdAt", -1)
+    query = apply_cursor(query, keys, cursor)            # cursor from the client, or None
+    docs = await coll.find(query).sort(keys).limit(limit + 1).to_list(limit + 1)
+    docs, next_cursor = page_with_cursor(docs, limit, keys, query_without_cursor)
+"""
+
+import base64
+import hashlib
+import hmac
+from typing import Any, List, Optional, Tuple
+
+from bson import json_util
+
+from app.core.settings import PAGINATION_CURSOR_SECRET
+from app.utils.exceptions import bad_request
+
+SortKeys = List[Tuple[str, int]]
+
+
+def sort_keys(field: str = "_id", direction: int = 1) -> SortKeys:
+    """The sort used for a keyset page: the requested field, then _id as tie-breaker."""
+    if field == "_id":
+        return [("_id", direction)]
+    return [(field, direction), ("_id", direction)]
+
+
+def _fingerprint(keys: SortKeys, scope: Any) -> str:
+    raw = json_util.dumps({"keys": keys, "scope": scope}, sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def _sign(payload: bytes) -> str:
+    digest = hmac.new(PAGINATION_CURSOR_SECRET.encode(), payload, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:16]).decode().rstrip("=")
+
+
+def _value(doc: dict, path: str):
+    for part in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+def encode_cursor(doc: dict, keys: SortKeys, scope: Any = None) -> str:
+    """Cursor pointing just after `doc` in a list sorted by `keys`."""
+    payload = json_util.dumps(
+        {"v": [_value(doc, field) for field, _ in keys], "f": _fingerprint(keys, scope)}
+    ).encode()
+    body = base64.urlsafe_b64encode(payload).decode().rstrip("=")
+    return f"{body}.{_sign(payload)}"
+
+
+def decode_cursor(cursor: str, keys: SortKeys, scope: Any = None) -> list:
+    """Sort key values stored in `cursor`; 400 when it was tampered with or issued for another query."""
+    try:
+        body, signature = cursor.split(".", 1)
+        payload = base64.urlsafe_b64decode(body + "=" * (-len(body) % 4))
+        if not hmac.compare_digest(signature, _sign(payload)):
+            raise ValueError("bad signature")
+        data = json_util.loads(payload)
+    except (ValueError, TypeError):
+        bad_request("Invalid cursor")
+
+    if data.get("f") != _fingerprint(keys, scope) or len(data.get("v", [])) != len(keys):
+        bad_request("Cursor does not match this query; start again without a cursor")
+    return data["v"]
+
+
+def _after(field: str, direction: int, value) -> Optional[dict]:
+    # Null / missing sorts before every other value, so it comes first ascending and last descending
+    if value is None:
+        return {field: {"$ne": None}} if direction == 1 else None
+    if direction == 1:
+        return {field: {"$gt": value}}
+    return {"$or": [{field: {"$lt": value}}, {field: None}]}
+
+
+def keyset_filter(keys: SortKeys, values: list) -> dict:
+    """Rows strictly after `values` in `keys` order: (k1 > v1) or (k1 = v1 and k2 > v2) or ..."""
+    branches = []
+    for i, (field, direction) in enumerate(keys):
+        after = _after(field, direction, values[i])
+        if after is None:
+            continue
+        equal = {f: v for (f, _), v in zip(keys[:i], values[:i])}
+        branches.append({**equal, **after})
+    return {"$or": branches} if branches else {"_id": {"$in": []}}
+
+
+def apply_cursor(query: dict, keys: SortKeys, cursor: Optional[str], scope: Any = None) -> dict:
+    """`query` restricted to the rows after `cursor` (unchanged when there is none).
+
+    `scope` defaults to `query` itself: the cursor is only valid for the same filters.
+    """
+    if not cursor:
+        return query
+    values = decode_cursor(cursor, keys, query if scope is None else scope)
+    return {**query, "$and": [*query.get("$and", []), keyset_filter(keys, values)]}
+
+
+def page_with_cursor(docs: list, limit: int, keys: SortKeys, scope: Any) -> Tuple[list, Optional[str]]:
+    """Trim a `limit + 1` fetch to `limit` rows, with the cursor for the next page if there is one."""
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    return docs, encode_cursor(docs[-1], keys, scope)
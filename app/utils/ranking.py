@@ -0,0 +1,129 @@
+# app/utils/ranking.py
+"""
+Order-statistic list: sorted unique keys with O(log n) insert, remove,
+rank-of-key and key-at-rank (an indexable skip list).
+
+    ranks = RankedList()
+    ranks.insert((-120, "s1")); ranks.insert((-300, "s2"))
+    ranks.rank((-120, "s1"))     # 1  (0-based position)
+    ranks[0]                     # (-300, "s2")
+    list(ranks.slice(0, 10))     # first ten keys in order
+
+Every node stores, per level, how many positions its link skips ("width"),
+so positions are summed while searching instead of counted by walking.
+"""
+
+import random
+from typing import Any, Iterator, List, Optional
+
+MAX_LEVELS = 32  # expected O(log n) up to ~2**32 keys
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key: Any, levels: int):
+        self.key = key
+        self.next: List[Optional["_Node"]] = [None] * levels
+        # positions skipped by next[i]; a missing next counts as the end of the list
+        self.width: List[int] = [1] * levels
+
+
+class RankedList:
+    def __init__(self):
+        self._head = _Node(None, MAX_LEVELS)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _random_levels() -> int:
+        levels = 1
+        while levels < MAX_LEVELS and random.random() < 0.5:
+            levels += 1
+        return levels
+
+    def _predecessors(self, key) -> tuple:
+        """Last node before `key` on every level, with its position (head = 0)."""
+        chain = [None] * MAX_LEVELS
+        positions = [0] * MAX_LEVELS
+        node, pos = self._head, 0
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                pos += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+            positions[level] = pos
+        return chain, positions
+
+    def insert(self, key) -> None:
+        chain, positions = self._predecessors(key)
+        nxt = chain[0].next[0]
+        if nxt is not None and nxt.key == key:
+            raise KeyError(f"{key!r} is already in the list")
+
+        pos = positions[0]
+        node = _Node(key, self._random_levels())
+        for level in range(len(node.next)):
+            prev = chain[level]
+            skipped = pos - positions[level]
+            node.next[level] = prev.next[level]
+            prev.next[level] = node
+            node.width[level] = prev.width[level] - skipped
+            prev.width[level] = skipped + 1
+        for level in range(len(node.next), MAX_LEVELS):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key) -> None:
+        chain, _ = self._predecessors(key)
+        node = chain[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+
+        for level in range(len(node.next)):
+            prev = chain[level]
+            prev.width[level] += node.width[level] - 1
+            prev.next[level] = node.next[level]
+        for level in range(len(node.next), MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def rank(self, key) -> int:
+        """0-based position of `key`; KeyError if absent."""
+        chain, positions = self._predecessors(key)
+        node = chain[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+        return positions[0]
+
+    def _node_at(self, index: int) -> _Node:
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        node, remaining = self._head, index + 1
+        for level in reversed(range(MAX_LEVELS)):
+            while node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+                if remaining == 0:
+                    return node
+        return node
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += self._size
+        return self._node_at(index).key
+
+    def slice(self, start: int, stop: int) -> Iterator:
+        """Keys at positions [start, stop), walking the bottom level from `start`."""
+        start, stop = max(start, 0), min(stop, self._size)
+        if start >= stop:
+            return
+        node = self._node_at(start)
+        for _ in range(stop - start):
+            yield node.key
+            node = node.next[0]
+
+    def __iter__(self) -> Iterator:
+        return self.slice(0, self._size)
@@ -0,0 +1,138 @@
+# app/utils/search.py
+"""
+Token search for courses.
+
+Each course stores the terms it can be found by, computed on write:
+
+    searchTokens  stems of title/description/category/courseCode words, plus
+                  their edge n-grams ("prog", "progr", ...) for prefix matching
+    titleTokens   the same for the title only, used to rank title hits first
+
+A query word matches a course when the word itself or its stem is one of the
+course's tokens, so "program", "programs", "programming" and "progr" all find
+"Programming Basics". Every query word must match. The (tenantId, searchTokens)
+multikey index turns a search into an index scan instead of the regex
+collection scan it replaces.
+"""
+
+import re
+from typing import Iterable, List
+
+# Fields a course can be searched by, and the title boost used in ranking
+SEARCH_FIELDS = ("title", "description", "category", "courseCode")
+TITLE_WEIGHT = 3
+
+MIN_PREFIX = 2
+MAX_PREFIX = 15
+# Long descriptions only contribute their first words (bounded document growth)
+MAX_WORDS_PER_FIELD = 200
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or the this to with".split()
+)
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# (suffix, replacement), longest first; a light English stemmer
+_SUFFIXES = (
+    ("ational", "ate"),
+    ("ization", "ize"),
+    ("fulness", "ful"),
+    ("iveness", "ive"),
+    ("ations", "ate"),
+    ("ation", "ate"),
+    ("ments", ""),
+    ("ingly", ""),
+    ("ement", ""),
+    ("ment", ""),
+    ("ness", ""),
+    ("ings", ""),
+    ("ing", ""),
+    ("ies", "y"),
+    ("ied", "y"),
+    ("edly", ""),
+    ("ed", ""),
+    ("ly", ""),
+    ("es", ""),
+    ("s", ""),
+)
+
+
+def words(text: str) -> List[str]:
+    return [w for w in _WORD.findall(str(text or "").lower()) if w not in STOPWORDS]
+
+
+def stem(word: str) -> str:
+    if len(word) <= 3 or word.isdigit():
+        return word
+    for suffix, replacement in _SUFFIXES:
+        # keep at least 3 letters of the word ("national" stays, "sings" -> "sing")
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[: len(word) - len(suffix)] + replacement
+            break
+    # "programm" -> "program", "runn" -> "run"
+    if len(word) > 3 and word[-1] == word[-2] and word[-1] not in "lsz":
+        word = word[:-1]
+    return word
+
+
+def _terms(word: str) -> set:
+    """A word's stem and the edge n-grams of both the word and its stem."""
+    terms = {stem(word)}
+    for base in (word, stem(word)):
+        for n in range(MIN_PREFIX, min(len(base), MAX_PREFIX) + 1):
+            terms.add(base[:n])
+    return terms
+
+
+def tokens_for(texts: Iterable[str]) -> List[str]:
+    tokens = set()
+    for text in texts:
+        for word in words(text)[:MAX_WORDS_PER_FIELD]:
+            tokens |= _terms(word)
+    return sorted(tokens)
+
+
+def course_search_fields(course: dict) -> dict:
+    """searchTokens / titleTokens for a course document (or the merged result of an update)."""
+    return {
+        "searchTokens": tokens_for(course.get(f) for f in SEARCH_FIELDS),
+        "titleTokens": tokens_for([course.get("title")]),
+    }
+
+
+def query_terms(search: str) -> List[List[str]]:
+    """Per query word, the tokens that count as a match (the word itself and its stem)."""
+    terms = []
+    for word in words(search):
+        variants = sorted({word[:MAX_PREFIX], stem(word)})
+        if variants not in terms:
+            terms.append(variants)
+    return terms
+
+
+def search_match(terms: List[List[str]]) -> dict:
+    """Every query word must match one of its variants."""
+    return {"$and": [{"searchTokens": {"$in": variants}} for variants in terms]}
+
+
+def search_score(terms: List[List[str]]) -> dict:
+    """Relevance: matched words, counting TITLE_WEIGHT times when they are in the title."""
+    matched = []
+    for variants in terms:
+        for field, weight in (("$searchTokens", 1), ("$titleTokens", TITLE_WEIGHT)):
+            matched.append(
+                {"$cond": [
+                    {"$gt": [{"$size": {"$setIntersection": [{"$ifNull": [field, []]}, variants]}}, 0]},
+                    weight,
+                    0,
+                ]}
+            )
+    return {"$add": matched}
+
+
+def strip_search_fields(doc: dict) -> dict:
+    doc.pop("searchTokens", None)
+    doc.pop("titleTokens", None)
+    doc.pop("searchScore", None)
+    return doc
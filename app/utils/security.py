@@ -1,9 +1,18 @@
+import asyncio
 import jwt
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from fastapi import HTTPException
 from dotenv import load_dotenv
 import os
 from passlib.context import CryptContext
+from app.core.settings import (
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_BULK_HASH_WORKERS,
+)
 
 load_dotenv()
 
@@ -15,14 +24,71 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+# ------------------ Async variants (use these inside request handlers) ------------------
+
+_hash_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_pending_hash_jobs = 0
+
+async def _run_hash_job(fn, *args):
+    global _pending_hash_jobs
+
+    # Bound the queue: shed load instead of letting a login storm pile up latency
+    if _pending_hash_jobs >= PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many concurrent password operations, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+    _pending_hash_jobs += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _pending_hash_jobs -= 1
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hash_job(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hash_job(verify_password, plain_password, hashed_password)
+
+# Bulk imports: a separate pool without the pending limit (the caller already
+# works in bounded chunks), so a large upload never makes logins queue or 503.
+_bulk_hash_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_BULK_HASH_WORKERS, thread_name_prefix="password-hash-bulk"
+)
+
+async def hash_passwords_async(passwords: list) -> list:
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(
+        *(loop.run_in_executor(_bulk_hash_executor, hash_password, p) for p in passwords)
+    )
+
 SECRET_KEY = os.getenv("JWT_SECRET", "secret123")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 1 day
 
-def create_access_token(data: dict):
+def create_access_token(data: dict, expires_minutes: int = ACCESS_TOKEN_EXPIRE_MINUTES):
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    expire = datetime.utcnow() + timedelta(minutes=expires_minutes)
+    # jti/iat let individual tokens (or everything issued before a point in time) be revoked
+    to_encode.update(
+        {"exp": expire, "iat": time.time(), "jti": uuid.uuid4().hex, "typ": "access"}
+    )
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+def create_refresh_token(user_id: str, expires_days: int):
+    expire = datetime.utcnow() + timedelta(days=expires_days)
+    to_encode = {
+        "user_id": user_id,
+        "exp": expire,
+        "iat": time.time(),
+        "jti": uuid.uuid4().hex,
+        "typ": "refresh",
+    }
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 def decode_token(token: str):
@@ -0,0 +1,100 @@
+# app/utils/uploads.py
+"""
+Streaming row readers for bulk uploads (CSV with a header row, or JSON lines).
+
+    async for chunk in read_row_chunks(upload.file, "csv", 500):
+        for row_no, data, error in chunk:
+            ...
+
+Rows are parsed lazily from the (already spooled) upload, one chunk at a time
+on the thread pool, so a large file is never decoded into memory at once and
+the event loop is not blocked by parsing. A row that cannot be parsed comes
+back with `data=None` and an `error` instead of failing the whole upload.
+"""
+
+import csv
+import io
+import json
+from itertools import islice
+from typing import AsyncIterator, BinaryIO, Iterator, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.utils.exceptions import bad_request
+
+Row = Tuple[int, Optional[dict], Optional[str]]
+
+FORMATS = ("csv", "jsonl")
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str], fmt: Optional[str] = None) -> str:
+    """Explicit `fmt`, else guessed from the file extension / content type."""
+    if fmt:
+        fmt = fmt.lower()
+        if fmt not in FORMATS:
+            bad_request(f"Unsupported format '{fmt}', expected one of: {', '.join(FORMATS)}")
+        return fmt
+
+    name = (filename or "").lower()
+    ctype = (content_type or "").lower()
+    if name.endswith(".csv") or "csv" in ctype:
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson")) or "ndjson" in ctype or "jsonl" in ctype:
+        return "jsonl"
+    bad_request("Cannot tell the upload format; send a .csv or .jsonl file or pass format")
+
+
+def _csv_rows(text: io.TextIOBase) -> Iterator[Row]:
+    reader = csv.DictReader(text)
+    if reader.fieldnames:
+        reader.fieldnames = [name.strip() for name in reader.fieldnames]
+
+    for row_no, record in enumerate(reader, start=1):
+        # Blank cells fall back to the schema defaults; surplus cells (key None) are dropped
+        data = {k: v.strip() for k, v in record.items() if k and isinstance(v, str) and v.strip()}
+        yield row_no, data, None
+
+
+def _jsonl_rows(text: io.TextIOBase) -> Iterator[Row]:
+    row_no = 0
+    for line in text:
+        if not line.strip():
+            continue
+        row_no += 1
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield row_no, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(data, dict):
+            yield row_no, None, "Each line must be a JSON object"
+            continue
+        yield row_no, data, None
+
+
+def iter_rows(fileobj: BinaryIO, fmt: str) -> Iterator[Row]:
+    """(row number, data, error) for each row of a binary upload, parsed lazily."""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    rows = _csv_rows(text) if fmt == "csv" else _jsonl_rows(text)
+    row_no = 0
+    try:
+        for row in rows:
+            row_no = row[0]
+            yield row
+    except UnicodeDecodeError:
+        yield row_no + 1, None, "File is not valid UTF-8; rows from here on were not read"
+    except csv.Error as e:
+        yield row_no + 1, None, f"Malformed CSV, rows from here on were not read: {e}"
+    finally:
+        # don't let the wrapper close the upload's file
+        text.detach()
+
+
+async def read_row_chunks(fileobj: BinaryIO, fmt: str, size: int) -> AsyncIterator[List[Row]]:
+    """`iter_rows` in lists of up to `size` rows, each parsed off the event loop."""
+    rows = iter_rows(fileobj, fmt)
+    while True:
+        chunk = await run_in_threadpool(lambda: list(islice(rows, size)))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,139 @@
+"""
+Course list benchmark: count_documents + aggregate vs a single $facet aggregation.
+
+Needs a MongoDB server (MONGO_URI). Courses, teachers and users are seeded into a
+scratch database (LMS_benchmark by default, dropped afterwards unless --keep) and
+each variant of CourseCRUD.get_all_courses' query is timed at a few page offsets,
+with and without a status filter.
+
+    python -m benchmarks.course_list_facet --courses 100000 --runs 30
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.crud.courses import CourseCRUD
+from app.db.database import create_client
+
+STATUSES = ["published", "draft", "archived"]
+CATEGORIES = ["math", "science", "history", "languages", "art", "programming"]
+
+
+async def seed(db, tenant_id: ObjectId, courses: int, teachers: int, batch: int = 5000):
+    user_ids = (await db.users.insert_many(
+        [{"fullName": f"Teacher {i}", "role": "teacher"} for i in range(teachers)]
+    )).inserted_ids
+    teacher_ids = (await db.teachers.insert_many(
+        [{"userId": uid, "tenantId": tenant_id} for uid in user_ids]
+    )).inserted_ids
+    instructors = [
+        {"teacherId": tid, "fullName": f"Teacher {i}"} for i, tid in enumerate(teacher_ids)
+    ]
+
+    now = datetime.utcnow()
+
+    def course(i: int) -> dict:
+        instructor = random.choice(instructors)
+        return {
+            "tenantId": tenant_id,
+            "teacherId": instructor["teacherId"],
+            "instructor": instructor,
+            "title": f"Course {i}",
+            "description": "Seeded for the course list benchmark",
+            "category": random.choice(CATEGORIES),
+            "status": random.choice(STATUSES),
+            "courseCode": f"C{i:06d}",
+            "enrolledStudents": 0,
+            "createdAt": now,
+            "updatedAt": now,
+        }
+
+    for start in range(0, courses, batch):
+        await db.courses.insert_many([course(i) for i in range(start, min(start + batch, courses))])
+
+    await db.courses.create_index([("tenantId", 1), ("status", 1), ("category", 1)])
+
+
+async def count_then_aggregate(crud: CourseCRUD, query: dict, skip: int, limit: int):
+    # The previous implementation: two round trips, the matches are scanned twice
+    total = await crud.collection.count_documents(query)
+    courses = await crud.collection.aggregate(
+        crud._get_courses_pipeline(query, skip, limit)
+    ).to_list(length=limit)
+    return total, courses
+
+
+def facet(total_mode: str):
+    async def run(crud: CourseCRUD, query: dict, skip: int, limit: int):
+        pipeline = crud._get_courses_page_pipeline(query, skip, limit, total_mode)
+        return await crud.collection.aggregate(pipeline).to_list(length=None)
+    return run
+
+
+VARIANTS = (
+    ("count + aggregate", count_then_aggregate),
+    ("$facet exact", facet("exact")),
+    ("$facet estimated", facet("estimated")),
+    ("no total", facet("none")),
+)
+
+
+async def time_variant(run, crud, query, skip, limit, runs):
+    await run(crud, query, skip, limit)  # warm up the cache
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await run(crud, query, skip, limit)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--courses", type=int, default=100_000)
+    parser.add_argument("--teachers", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--database", default="LMS_benchmark")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded database")
+    args = parser.parse_args()
+
+    client = create_client()
+    db = client[args.database]
+    tenant_id = ObjectId()
+
+    print(f"Seeding {args.courses} courses into {args.database} ...")
+    await db.client.drop_database(args.database)
+    await seed(db, tenant_id, args.courses, args.teachers)
+
+    crud = CourseCRUD()
+    crud.collection = db.courses
+
+    scenarios = {
+        "all courses": {"tenantId": tenant_id},
+        "status filter": {"tenantId": tenant_id, "status": {"$regex": "^published$", "$options": "i"}},
+    }
+    try:
+        for label, query in scenarios.items():
+            for skip in (0, 1_000, args.courses // 2):
+                print(f"\n{label}, skip={skip}, limit={args.limit}")
+                for name, run in VARIANTS:
+                    timings = await time_variant(run, crud, query, skip, args.limit, args.runs)
+                    print(
+                        f"  {name:<18} p50={statistics.median(timings):8.2f}ms  "
+                        f"p95={sorted(timings)[int(0.95 * (len(timings) - 1))]:8.2f}ms"
+                    )
+    finally:
+        if not args.keep:
+            await db.client.drop_database(args.database)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""
+Course search benchmark: unanchored $regex scan vs the token index.
+
+Needs a MongoDB server (MONGO_URI). Courses with generated titles and
+descriptions are seeded into a scratch database (LMS_benchmark by default,
+dropped afterwards unless --keep), the course indexes are created, and
+CourseCRUD.get_all_courses' search pipeline is timed for a few queries with
+both engines.
+
+    python -m benchmarks.course_search --courses 100000 --runs 20
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import IndexModel
+
+from app.crud.courses import CourseCRUD, regex_search_query
+from app.db.database import create_client
+from app.db.indexes import INDEXES
+from app.utils.search import course_search_fields, query_terms, search_match, search_score
+
+SUBJECTS = ["algebra", "biology", "chemistry", "history", "painting", "programming", "statistics", "writing"]
+LEVELS = ["introduction to", "advanced", "applied", "foundations of", "topics in"]
+FILLER = "students learn through weekly lectures projects and assessments".split()
+QUERIES = ["programming", "progr", "advanced statistics", "history painting", "zzz"]
+
+
+async def seed(db, tenant_id: ObjectId, courses: int, batch: int = 5000):
+    now = datetime.utcnow()
+
+    def course(i: int) -> dict:
+        subject = random.choice(SUBJECTS)
+        doc = {
+            "tenantId": tenant_id,
+            "teacherId": ObjectId(),
+            "title": f"{random.choice(LEVELS).title()} {subject.title()} {i}",
+            "description": " ".join(random.sample(FILLER, 5) + [random.choice(SUBJECTS)]),
+            "category": subject,
+            "status": "published",
+            "courseCode": f"{subject[:3].upper()}{i:06d}",
+            "createdAt": now,
+            "updatedAt": now,
+        }
+        doc.update(course_search_fields(doc))
+        return doc
+
+    for start in range(0, courses, batch):
+        await db.courses.insert_many([course(i) for i in range(start, min(start + batch, courses))])
+
+    await db.courses.create_indexes([IndexModel(m.document["key"]) for m in INDEXES["courses"]])
+
+
+def regex_engine(crud: CourseCRUD, tenant_id: ObjectId, search: str, limit: int):
+    query = {"tenantId": tenant_id, "$or": regex_search_query(search)}
+    return crud._get_courses_page_pipeline(query, 0, limit, "exact")
+
+
+def token_engine(crud: CourseCRUD, tenant_id: ObjectId, search: str, limit: int):
+    terms = query_terms(search)
+    query = {"tenantId": tenant_id, **search_match(terms)}
+    return crud._get_courses_page_pipeline(query, 0, limit, "exact", search_score(terms))
+
+
+ENGINES = (("$regex", regex_engine), ("tokens", token_engine))
+
+
+async def time_engine(crud, pipeline, runs):
+    await crud.collection.aggregate(pipeline).to_list(length=None)  # warm up the cache
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        results = await crud.collection.aggregate(pipeline).to_list(length=None)
+        timings.append((time.perf_counter() - started) * 1000)
+    total = results[0]["total"][0]["n"] if results and results[0]["total"] else 0
+    return timings, total
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--courses", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--database", default="LMS_benchmark")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded database")
+    args = parser.parse_args()
+
+    client = create_client()
+    db = client[args.database]
+    tenant_id = ObjectId()
+
+    print(f"Seeding {args.courses} courses into {args.database} ...")
+    await db.client.drop_database(args.database)
+    await seed(db, tenant_id, args.courses)
+
+    crud = CourseCRUD()
+    crud.collection = db.courses
+
+    try:
+        for search in QUERIES:
+            print(f"\nsearch={search!r}, limit={args.limit}")
+            for name, engine in ENGINES:
+                pipeline = engine(crud, tenant_id, search, args.limit)
+                timings, total = await time_engine(crud, pipeline, args.runs)
+                print(
+                    f"  {name:<8} matches={total:<7} p50={statistics.median(timings):8.2f}ms  "
+                    f"p95={sorted(timings)[int(0.95 * (len(timings) - 1))]:8.2f}ms"
+                )
+    finally:
+        if not args.keep:
+            await db.client.drop_database(args.database)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
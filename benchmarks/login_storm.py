@@ -0,0 +1,96 @@
+"""
+Login storm benchmark: latency of unrelated requests while logins are hashing.
+
+Runs entirely in-process (no Mongo needed). A burst of "logins" verifies a
+bcrypt hash while a probe issues a cheap unrelated request every few
+milliseconds; the probe latency is what every other endpoint would see on the
+same uvicorn worker.
+
+    python -m benchmarks.login_storm --logins 50 --concurrency 25
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.utils.security import hash_password, verify_password, verify_password_async
+
+
+async def unrelated_request():
+    # Stands in for a cheap endpoint that only needs the event loop (e.g. a cache hit)
+    await asyncio.sleep(0)
+
+
+async def probe(latencies: list, stop: asyncio.Event, interval: float):
+    # Latency is measured from when the request *should* have started, so time
+    # spent waiting for a blocked event loop is counted
+    due = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        await unrelated_request()
+        latencies.append((time.perf_counter() - due) * 1000)
+        due = max(due + interval, time.perf_counter())
+
+
+async def sync_login(hashed: str):
+    # What the handlers used to do: bcrypt directly on the event loop
+    verify_password("wrong-password", hashed)
+
+
+async def async_login(hashed: str):
+    await verify_password_async("wrong-password", hashed)
+
+
+async def run(login, hashed: str, logins: int, concurrency: int, interval: float):
+    latencies: list = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(latencies, stop, interval))
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one_login():
+        async with slots:
+            await login(hashed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe_task
+    return elapsed, latencies
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(name: str, elapsed: float, latencies: list, logins: int):
+    print(
+        f"{name:<22} logins/s={logins / elapsed:8.1f}  probes={len(latencies):5d}  "
+        f"p50={statistics.median(latencies) if latencies else 0:8.2f}ms  "
+        f"p99={percentile(latencies, 99):8.2f}ms  max={max(latencies, default=0):8.2f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=25)
+    parser.add_argument("--probe-interval-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    hashed = hash_password("benchmark-password")
+    interval = args.probe_interval_ms / 1000
+
+    for name, login in (("sync (event loop)", sync_login), ("async (hash pool)", async_login)):
+        elapsed, latencies = await run(login, hashed, args.logins, args.concurrency, interval)
+        report(name, elapsed, latencies, args.logins)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())